@@ -3,6 +3,7 @@ let latestDietPlan = {};
 let latestWorkoutPlan = {};
 let lastAIAdvice = "";
 let chatHistory = [];
+let chatSessionId = null; // server-side chat session (har turn par sirf naya message)
 let calorieTotal = 0; // Default 0
 let calorieChart = null;
 let goalCalories = 0;
@@ -734,6 +735,7 @@ async function fetchUserProfileFromDB() {
 
             if (Array.isArray(lastSession.chat_history) && chatMessages) {
                 chatHistory = lastSession.chat_history;
+                chatSessionId = lastSession.chat_session_id || null;
                 chatMessages.innerHTML = "";
                 chatHistory.forEach(msg => {
                     const role = msg.role === "assistant" ? "bot" : "user";
@@ -1161,6 +1163,64 @@ if (micBtn && SpeechRecognition) {
 }
 
 
+// ================== STREAMING (SSE) HELPER ================== //
+// POST + "text/event-stream" response. Har token par onToken(poora text ab tak).
+// Returns final text ("done" event), ya null agar stream shuru hi na ho paya.
+async function streamApi(path, payload, onToken) {
+  const token = localStorage.getItem("authToken");
+  const headers = { "Content-Type": "application/json", "Accept": "text/event-stream" };
+  if (token) headers["Authorization"] = "Bearer " + token;
+
+  let text = "";
+  try {
+    const res = await fetch(`${API_BASE}${path}`, {
+      method: "POST",
+      headers: headers,
+      body: JSON.stringify(payload || {}),
+    });
+    if (!res.ok || !res.body) return null;
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events "\n\n" se alag hote hain
+      let sep;
+      while ((sep = buffer.indexOf("\n\n")) !== -1) {
+        const raw = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+
+        let event = "message";
+        let data = "";
+        for (const line of raw.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+        const body = JSON.parse(data);
+
+        if (event === "token") {
+          text += body.text;
+          onToken(text);
+        } else if (event === "done") {
+          return body.text;
+        } else if (event === "error") {
+          console.error("Stream error:", body.detail);
+          return text ? text : null;
+        }
+      }
+    }
+  } catch (err) {
+    console.error("Stream failed:", err);
+  }
+  return text ? text : null;
+}
+
 // ================== AI COACH RECOMMENDATION ================== //
 
 const btnGetRecommendation = document.getElementById("btnGetRecommendation");
@@ -1178,11 +1238,17 @@ if (btnGetRecommendation) {
       last_calories: calorieTotal,
     };
 
-    const data = await callApi("/recommendation", payload);
-    if (!data) return;
+    // Tokens aate hi dikhao (SSE); stream na chale to normal API
+    let adviceText = await streamApi("/recommendation/stream", payload, (partial) => {
+      recText.innerHTML = renderMarkdown(partial);
+    });
+    if (adviceText === null) {
+      const data = await callApi("/recommendation", payload);
+      if (!data) return;
 
-    // Expect backend: { advice: "..." }
-    const adviceText = data.advice || JSON.stringify(data, null, 2);
+      // Expect backend: { advice: "..." }
+      adviceText = data.advice || JSON.stringify(data, null, 2);
+    }
 
     // show in pretty structured format
     recText.innerHTML = renderMarkdown(adviceText);
@@ -1228,6 +1294,14 @@ function appendMessage(text, role) {
   chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
+// Pehli baar session banao; pehle ki chat (e.g. last session) seed ho jaati hai
+async function ensureChatSession(seed) {
+  if (chatSessionId) return chatSessionId;
+  const data = await callApi("/chat/sessions", { messages: seed });
+  chatSessionId = data ? data.session_id : null;
+  return chatSessionId;
+}
+
 async function sendChat() {
   const text = (chatInput.value || "").trim();
   if (!text) return;
@@ -1239,14 +1313,38 @@ async function sendChat() {
   chatInput.value = "";
 
   appendMessage("Thinking...", "bot");
+  const thinking = chatMessages.lastElementChild;
+  const thinkingContent = thinking ? thinking.querySelector(".msg-content") : null;
 
-  const data = await callApi("/chat", { message: text, history: chatHistory });
-  if (!data) return;
+  const onToken = (partial) => {
+    if (thinkingContent) thinkingContent.innerHTML = renderMarkdown(partial);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+  };
+
+  // Server-side session: history server par, hum sirf naya message bhejte hain.
+  // Reply token-by-token usi bubble me; stream fail ho to non-stream.
+  let reply = null;
+  const sessionId = await ensureChatSession(chatHistory.slice(0, -1));
+  if (sessionId) {
+    const base = `/chat/sessions/${sessionId}/messages`;
+    reply = await streamApi(`${base}/stream`, { message: text }, onToken);
+    if (reply === null) {
+      const data = await callApi(base, { message: text });
+      if (data) reply = data.reply;
+      else chatSessionId = null; // expire / full → agle message par naya session
+    }
+  }
+
+  if (reply === null) {
+    // Purana endpoint (poori history body me)
+    const data = await callApi("/chat", { message: text, history: chatHistory.slice(0, -1) });
+    if (!data) return;
+    reply = data.reply;
+  }
 
-  const lastMsg = chatMessages.lastElementChild;
-  if (lastMsg) lastMsg.remove();
+  if (thinking) thinking.remove();
 
-  const reply = data.reply || "Sorry, I couldn't generate a response.";
+  reply = reply || "Sorry, I couldn't generate a response.";
   appendMessage(reply, "bot");
   chatHistory.push({ role: "assistant", content: reply });
   persistState();
@@ -1268,8 +1366,59 @@ if (chatInput) {
 // ================== RENDER HISTORY (EXPANDABLE + 3-DOT MENU) ================== //
 let _globalHistoryData = [];   // already at top, keep this
 
+let _historyNextCursor = null;
+
+// List API sirf summary (title/date/calories) deta hai.
+// Pura record (diet/workout/advice/chat) pehli baar khulne par lao.
+async function loadHistoryDetail(item) {
+    if (item._full) return item;
+    const data = await apiGet(`/history/${item._id}`);
+    if (data && data.record) {
+        Object.assign(item, data.record);
+        item._full = true;
+    }
+    return item;
+}
+
+function renderHistoryContent(item, content) {
+    if (content.dataset.loaded) return;
+    const dateStr = new Date(item.date).toLocaleString();
+    content.innerHTML = `
+                    <p><strong>Date:</strong> ${escapeHtml(dateStr)}</p>
+
+                    <h4 class="history-subtitle">🍽️ Diet Plan</h4>
+                    <div class="pretty-result">
+                        ${renderDietPlanPretty(item.diet_plan || {})}
+                    </div>
+
+                    <h4 class="history-subtitle">💪 Workout Plan</h4>
+                    <div class="pretty-result">
+                        ${renderWorkoutPlanPretty(item.workout_plan || {})}
+                    </div>
+
+                    <h4 class="history-subtitle">🤖 AI Advice</h4>
+                    <div class="history-advice-box">
+                        ${renderMarkdown(item.ai_advice || "No advice saved.")}
+                    </div>
+
+                    <h4 class="history-subtitle">💬 Chat History</h4>
+                    <div class="history-chat-box">
+                       ${renderChatHistoryPretty(item.chat_history || [])}
+                     </div>
+    `;
+    content.dataset.loaded = "1";
+}
+
+async function toggleHistoryContent(item, content) {
+    if (content.classList.contains("hidden")) {
+        await loadHistoryDetail(item);
+        renderHistoryContent(item, content);
+    }
+    content.classList.toggle("hidden");
+}
+
 // ================== RENDER HISTORY (FULL-WIDTH + CONTEXT MENU) ================== //
-async function renderHistory() {
+async function renderHistory(append = false) {
     const container = document.getElementById("historyList");
     if (!container) return;
 
@@ -1280,22 +1429,35 @@ async function renderHistory() {
     }
 
     try {
-        const res = await fetch(`${BASE_URL}/history/list`, {
+        let path = "/history/list?limit=20";
+        if (append && _historyNextCursor) {
+            path += `&cursor=${encodeURIComponent(_historyNextCursor)}`;
+        }
+        const res = await fetch(`${BASE_URL}${path}`, {
             method: "GET",
             headers: { "Authorization": "Bearer " + token }
         });
 
         const data = await res.json();
 
-        if (!data.history || data.history.length === 0) {
+        if (!append && (!data.history || data.history.length === 0)) {
             container.innerHTML = "<p style='color:#888;'>No saved history yet.</p>";
             return;
         }
 
-        _globalHistoryData = data.history;
-        container.innerHTML = "";
+        const offset = append ? _globalHistoryData.length : 0;
+        _globalHistoryData = append ? _globalHistoryData.concat(data.history || []) : (data.history || []);
+        _historyNextCursor = data.next_cursor || null;
+
+        if (append) {
+            const oldMore = document.getElementById("historyLoadMore");
+            if (oldMore) oldMore.remove();
+        } else {
+            container.innerHTML = "";
+        }
 
-        data.history.forEach((item, index) => {
+        (data.history || []).forEach((item, pageIndex) => {
+            const index = offset + pageIndex;
             const dateObj = new Date(item.date);
             const dateStr = dateObj.toLocaleString();
             const historyId = item._id;
@@ -1322,30 +1484,7 @@ async function renderHistory() {
                     </div>
                 </div>
 
-                <div class="history-content hidden">
-                    <p><strong>Date:</strong> ${escapeHtml(dateStr)}</p>
-
-                    <h4 class="history-subtitle">🍽️ Diet Plan</h4>
-                    <div class="pretty-result">
-                        ${renderDietPlanPretty(item.diet_plan || {})}
-                    </div>
-
-                    <h4 class="history-subtitle">💪 Workout Plan</h4>
-                    <div class="pretty-result">
-                        ${renderWorkoutPlanPretty(item.workout_plan || {})}
-                    </div>
-
-                    <h4 class="history-subtitle">🤖 AI Advice</h4>
-                    <div class="history-advice-box">
-                        ${renderMarkdown(item.ai_advice || "No advice saved.")}
-                    </div>
-
-                    <h4 class="history-subtitle">💬 Chat History</h4>
-                    <div class="history-chat-box">
-                       ${renderChatHistoryPretty(item.chat_history || [])}
-                     </div>
-
-                </div>
+                <div class="history-content hidden"></div>
 
                 <!-- Context Menu -->
                 <div class="history-menu-panel hidden">
@@ -1379,14 +1518,14 @@ async function renderHistory() {
             const titleEl = card.querySelector(".history-title");
 
             // ⭐ FIXED MENU ITEM HANDLER (PASTE EXACTLY HERE)
-menuPanel.querySelectorAll(".history-menu-item").forEach(item => {
-    item.addEventListener("click", (e) => {
+menuPanel.querySelectorAll(".history-menu-item").forEach(menuItem => {
+    menuItem.addEventListener("click", async (e) => {
 
         // Prevent card header click from triggering
         e.preventDefault();
         e.stopPropagation();
 
-        const action = item.dataset.action;
+        const action = menuItem.dataset.action;
 
         // Close menu
         menuPanel.classList.add("hidden");
@@ -1395,17 +1534,19 @@ menuPanel.querySelectorAll(".history-menu-item").forEach(item => {
         // ========== ACTION HANDLERS ==========
         if (action === "popup") {
             console.log("Opening popup…");
+            await loadHistoryDetail(item);
             openHistoryDetail(index);   // ⭐ POPUP FINALLY WORKS
             return;
         }
 
         if (action === "toggle") {
-            content.classList.toggle("hidden");
+            toggleHistoryContent(item, content);
             return;
         }
 
         if (action === "download") {
             // backend call (same as your existing logic)
+            await loadHistoryDetail(item);
             const payload = {
                 username: USER_PROFILE.name || "User",
                 calories: item.calories || 0,
@@ -1414,7 +1555,7 @@ menuPanel.querySelectorAll(".history-menu-item").forEach(item => {
                 ai_advice: item.ai_advice || "",
                 chat_history: item.chat_history || [],
             };
-            callApi("/export-summary", payload);
+            callApi("/export-summary?mode=job", payload);
             return;
         }
 
@@ -1446,7 +1587,7 @@ menuPanel.querySelectorAll(".history-menu-item").forEach(item => {
             header.addEventListener("click", (e) => {
                 // agar click menu button ya uske icon pe hua, to ignore
                 if (e.target.closest(".history-menu-btn")) return;
-                content.classList.toggle("hidden");
+                toggleHistoryContent(item, content);
             });
             // 2) MENU BUTTON → context menu open / close
 menuBtn.addEventListener("click", (e) => {
@@ -1479,6 +1620,18 @@ menuBtn.addEventListener("click", (e) => {
             container.appendChild(card);
         });
 
+        // 3) Aur sessions hain → "Load more" (cursor pagination)
+        if (_historyNextCursor) {
+            const more = document.createElement("button");
+            more.id = "historyLoadMore";
+            more.className = "primary-btn";
+            more.textContent = "Load more";
+            more.addEventListener("click", () => renderHistory(true));
+            container.appendChild(more);
+        }
+
+        if (append) return;
+
         // 4) GLOBAL CLICK → sab context menu band
         document.addEventListener("click", (ev) => {
           
@@ -1621,6 +1774,7 @@ function buildSummaryPayload() {
     workout_plan: latestWorkoutPlan,
     ai_advice: lastAIAdvice,
     chat_history: chatHistory,
+    chat_session_id: chatSessionId, // server session ho to chat wahin se
   };
 }
 
@@ -1639,7 +1793,7 @@ if (btnSaveSummary) {
         const payload = buildSummaryPayload();
         
         // 2. Call Backend
-        const res = await callApi("/export-summary", payload);
+        const res = await callApi("/export-summary?mode=job", payload);
 
         if (res && res.success) {
             showToast("Summary saved successfully!", "success");
@@ -1672,17 +1826,46 @@ if (btnDownloadPDF) {
     e.preventDefault();
     e.stopPropagation(); // ✅ Extra safety
 
+    // Popup blocker se bachne ke liye tab abhi (click ke andar) kholo,
+    // PDF aane par uska blob URL set karenge
+    const pdfTab = window.open("", "_blank");
+
     const payload = buildSummaryPayload();
-    const res = await callApi("/export-summary", payload);
+    const pdfUrl = await downloadSummaryPdf(payload);
 
-    if (res && res.pdf_url) {
-      window.open(res.pdf_url, "_blank");  // Current tab same hi rahega
+    if (pdfUrl) {
+      if (pdfTab) pdfTab.location = pdfUrl;  // Current tab same hi rahega
+      else window.open(pdfUrl, "_blank");
     } else {
+      if (pdfTab) pdfTab.close();
       showToast("Failed to generate PDF.", "error");
     }
   });
 }
 
+// Stream mode: PDF isi response me aata hai (na /static, na polling)
+async function downloadSummaryPdf(payload) {
+  const token = localStorage.getItem("authToken");
+  const headers = { "Content-Type": "application/json" };
+  if (token) headers["Authorization"] = "Bearer " + token;
+
+  try {
+    const res = await fetch(`${API_BASE}/export-summary?mode=stream`, {
+      method: "POST",
+      headers: headers,
+      body: JSON.stringify(payload || {}),
+    });
+    if (!res.ok) {
+      throw new Error(`PDF error ${res.status}: ${await res.text()}`);
+    }
+    const blob = await res.blob();
+    return URL.createObjectURL(blob);
+  } catch (err) {
+    console.error("PDF download failed:", err);
+    return null;
+  }
+}
+
 
 // ================== ON PAGE LOAD ================== //
 
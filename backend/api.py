@@ -1,32 +1,107 @@
-from database import users_col, progress_col, history_col, daily_logs_col
+import database
+from indexes import ensure_indexes, missing_indexes, describe as describe_indexes
+from database import users_col, progress_col, history_col, daily_logs_col, last_sessions_col
+import rollups
+import pdf_jobs
+import chat_sessions
 from fastapi import FastAPI ,Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 from typing import Any, Dict, List
-from auth import hash_password, verify_password, create_token, decode_token
+from auth import (
+    create_token, decode_token, needs_rehash,
+    hash_password_async, verify_password_async, HashPoolBusy, hash_pool_metrics,
+)
+import auth
 from database import users_col
 from fastapi import HTTPException
 from datetime import datetime, date
 from bson import ObjectId
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import Optional
 
 
 import os
+import json
+import asyncio
+import base64
 
 from utils.fitness_generator import (
     generate_workout_plan,
     generate_diet_plan,
     generate_advanced_fitness_plan,
 )
-from utils.calories import estimate_calories
-from utils.ai_recommender import get_ai_recommendation
-from utils.ai_chat import chat_with_coach
-from utils.exporter import create_summary_pdf
+from utils.calories import estimate_meal, estimate_meals_batch, format_meal_details
+from utils.ai_recommender import get_ai_recommendation, stream_ai_recommendation
+from utils.ai_chat import chat_with_coach, chat_with_coach_stream
+from utils.sse import llm_event_stream, SSE_HEADERS
+from utils import llm_client, rec_cache, chat_memory
+from utils.cache import TTLCache
+from utils.export_stream import stream_documents, iter_bytes
+from utils import analytics, pdf_cache, nutrition_db
+from config import (
+    USER_CACHE_TTL_SECONDS, USER_CACHE_SIZE, ENSURE_INDEXES_ON_STARTUP, EXPORTS_DIR, PDF_DELIVERY, PDF_WARMUP_ON_STARTUP,
+    NUTRITION_WARMUP_ON_STARTUP,
+    CHAT_SESSION_MAX_MESSAGES, CHAT_MAX_MESSAGE_CHARS, CHAT_MAX_HISTORY_CHARS, CHAT_MAX_HISTORY_MESSAGES,
+)
 
-app = FastAPI()
+# ------------------------
+# APP LIFECYCLE
+# ------------------------
+# Mongo client import par nahi, har worker process ke startup par banta hai
+# (gunicorn pre-fork safe) aur shutdown par band hota hai.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.connect()
+
+    # /history/range pipelines ko MongoDB 5.0+ chahiye; warna Python fallback
+    version = database.server_version()
+    if version is not None and not analytics.pipelines_supported(version):
+        print(f"⚠️ MongoDB {version[0]}.{version[1]} < 5.0: /history/range uses the slower Python fallback")
+
+    # Required indexes (idempotent). Fail hone par bhi app chalta rahe.
+    if ENSURE_INDEXES_ON_STARTUP:
+        try:
+            report = await ensure_indexes()
+            if report["created"]:
+                print("✅ Indexes created:", report["created"])
+            for fail in report["failed"]:
+                print(f"⚠️ Index {fail['index']} failed: {fail['error']}")
+        except Exception as e:
+            print(f"⚠️ Index bootstrap skipped: {e}")
+
+    # Nutrition table + matcher regex thread me (pehli /calories loop block na kare)
+    if NUTRITION_WARMUP_ON_STARTUP:
+        try:
+            table = await nutrition_db.warm_up()
+            print(f"✅ Nutrition table loaded: {len(table)} foods")
+        except Exception as e:
+            print(f"⚠️ Nutrition table warm-up failed: {e}")
+
+    # PDF pool workers pehle se spawn + fonts load (background me)
+    if PDF_WARMUP_ON_STARTUP:
+        pdf_jobs.start_warm_up()
+
+    # exports/ ko size/age limit me lao (baad me har render ke baad periodically)
+    try:
+        report = pdf_jobs.evict_exports()
+        if report["removed"]:
+            print(f"🧹 Evicted {report['removed']} old export(s)")
+    except OSError as e:
+        print(f"⚠️ Export eviction skipped: {e}")
+
+    yield
+    await llm_client.close()
+    pdf_jobs.shutdown()
+    database.close()
+
+app = FastAPI(lifespan=lifespan)
 security = HTTPBearer()
 
 # --- DATA SCHEMA FOR PROFILE UPDATE ---
@@ -41,6 +116,16 @@ class ProfileUpdateSchema(BaseModel):
     goal: Optional[str] = None
     activity_level: Optional[str] = None
 
+# --- DATA SCHEMA FOR BATCH CALORIE SYNC ---
+MAX_BATCH_MEALS = 500
+
+class MealLogItem(BaseModel):
+    food_text: str
+    time: Optional[datetime] = None     # Offline log ka time (optional)
+
+class CaloriesBatchSchema(BaseModel):
+    meals: List[MealLogItem]
+
 def serialize_user(user):
     user["_id"] = str(user["_id"])   # Convert ObjectId → string
     return user
@@ -51,7 +136,8 @@ def serialize_user(user):
 # "exports" folder ko /static URL ke through serve karna
 # PDF agar "exports/User_Fitness_Report.pdf" me banta hai,
 # to URL hoga: http://localhost:8000/static/User_Fitness_Report.pdf
-app.mount("/static", StaticFiles(directory="exports"), name="static")
+os.makedirs(EXPORTS_DIR, exist_ok=True)
+app.mount("/static", StaticFiles(directory=EXPORTS_DIR), name="static")
 
 
 
@@ -68,22 +154,34 @@ app.add_middleware(
 )
 
 @app.get("/db-test")
-def test_db():
+async def test_db():
     try:
-        count = users_col.count_documents({})
-        return {"status": "success", "users_in_db": count}
+        count = await users_col.count_documents({})
+        missing = describe_indexes(await missing_indexes())
+        return {"status": "success", "users_in_db": count, "missing_indexes": missing}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 
+def _hash_pool_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Too many login attempts right now, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/auth/register")
-def register(user: dict):
+async def register(user: dict):
     # Check if email exists
-    if users_col.find_one({"email": user["email"]}):
+    if await users_col.find_one({"email": user["email"]}, {"_id": 1}):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed = hash_password(user["password"])
+    # bcrypt apne dedicated pool me (default threadpool free rehta hai)
+    try:
+        hashed = await hash_password_async(user["password"])
+    except HashPoolBusy:
+        raise _hash_pool_busy()
 
     new_user = {
         "name": user["name"],
@@ -98,21 +196,33 @@ def register(user: dict):
         "created_at": datetime.utcnow()
     }
 
-    users_col.insert_one(new_user)
+    # email_unique index: do parallel registrations me se ek hi jeetega
+    try:
+        await users_col.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     return {"message": "User registered successfully"}
 
 
 
 @app.post("/auth/login")
-def login(data: dict):
-    user = users_col.find_one({"email": data["email"]})
+async def login(data: dict):
+    user = await users_col.find_one({"email": data["email"]}, {"password": 1})
 
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
 
-    if not verify_password(data["password"], user["password"]):
-        raise HTTPException(status_code=400, detail="Incorrect password")
+    try:
+        if not await verify_password_async(data["password"], user["password"]):
+            raise HTTPException(status_code=400, detail="Incorrect password")
+
+        # BCRYPT_ROUNDS badla hai → sahi password mil gaya hai, to naye cost se rehash
+        if needs_rehash(user["password"]):
+            new_hash = await hash_password_async(data["password"])
+            await users_col.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+    except HashPoolBusy:
+        raise _hash_pool_busy()
 
     token = create_token(str(user["_id"]))
 
@@ -129,30 +239,45 @@ from fastapi import Header, HTTPException
 # ==========================================
 # 1. SECURITY DEPENDENCY (The "Guard")
 # ==========================================
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Auth check ke liye password nahi chahiye. (last_session ab last_sessions
+# collection me hai; purane, bina-migrate documents ke liye exclude rakha hai.)
+USER_AUTH_PROJECTION = {"password": 0, "last_session": 0}
+
+# user_id (str) → user document. Profile / session change par invalidate_user().
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id):
+    user_cache.pop(str(user_id))
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     decoded = decode_token(token)
     
     if not decoded or "user_id" not in decoded:
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
-    try:
-        user_id = ObjectId(decoded["user_id"])
-        user = users_col.find_one({"_id": user_id})
-    except:
-        raise HTTPException(status_code=401, detail="Invalid user ID format")
+    user = user_cache.get(decoded["user_id"])
+    if user is None:
+        try:
+            user_id = ObjectId(decoded["user_id"])
+            user = await users_col.find_one({"_id": user_id}, USER_AUTH_PROJECTION)
+        except:
+            raise HTTPException(status_code=401, detail="Invalid user ID format")
 
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        user_cache.set(decoded["user_id"], user)
 
-    return serialize_user(user)
+    # Copy do — handlers response banate waqt dict modify karte hain
+    return serialize_user(dict(user))
 
 
 # ==========================================
 # 2. GET USER PROFILE (Uses Dependency)
 # ==========================================
 @app.get("/auth/me")
-def get_my_profile(current_user: dict = Depends(get_current_user)):
+async def get_my_profile(current_user: dict = Depends(get_current_user)):
     # 1. Profile Data lo
     current_user.pop("password", None)
     
@@ -161,7 +286,7 @@ def get_my_profile(current_user: dict = Depends(get_current_user)):
     user_id = current_user["_id"]
 
     # 3. Database check karo: Kya aaj ka koi data hai?
-    today_log = daily_logs_col.find_one({
+    today_log = await daily_logs_col.find_one({
         "user_id": ObjectId(user_id),
         "date": today_str
     })
@@ -173,7 +298,8 @@ def get_my_profile(current_user: dict = Depends(get_current_user)):
         # Future me workout status bhi yahan add kar sakte hain
     }
     # 5. Last session snapshot (diet/workout/advice/chat)
-    last_session = current_user.get("last_session", {})
+    # Apne collection se, sirf yahin (lazy) load hota hai
+    last_session = await load_last_session(user_id)
 
     return {
         "user": current_user,
@@ -183,11 +309,40 @@ def get_my_profile(current_user: dict = Depends(get_current_user)):
 
     
 
+# ------------------------
+# LAST SESSION (own collection)
+# ------------------------
+# Pehle poora session users.last_session me copy hota tha, aur har
+# authenticated request wo blob fetch karti thi. Ab last_sessions collection
+# me (_id = user_id) rehta hai aur sirf /auth/me isse padhta hai.
+LAST_SESSION_FIELDS = ("calories", "diet_plan", "workout_plan", "ai_advice", "chat_history")
+
+async def save_last_session(user_id, record, history_id):
+    session = {k: record[k] for k in LAST_SESSION_FIELDS}
+    session["history_id"] = history_id
+    if record.get("chat_session_id"):
+        session["chat_session_id"] = record["chat_session_id"]
+    session["saved_at"] = datetime.utcnow()
+    await last_sessions_col.replace_one({"_id": ObjectId(user_id)}, session, upsert=True)
+
+async def load_last_session(user_id):
+    session = await last_sessions_col.find_one({"_id": ObjectId(user_id)}, {"_id": 0})
+    if session is None:
+        # Migration (migrate_last_session.py) se pehle ke users
+        legacy = await users_col.find_one({"_id": ObjectId(user_id)}, {"last_session": 1}) or {}
+        session = legacy.get("last_session") or {}
+        session = {k: session[k] for k in LAST_SESSION_FIELDS + ("saved_at",) if k in session}
+
+    for key in ("history_id", "chat_session_id"):
+        if key in session:
+            session[key] = str(session[key])
+    return session
+
 # ==========================================
 # 3. SAVE PROFILE SECURELY (Uses Dependency)
 # ==========================================
 @app.post("/save-profile")
-def save_profile(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def save_profile(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
     """
     Ab ye function tabhi chalega jab token valid hoga.
     Hume frontend se User ID bhejne ki jarurat nahi, 
@@ -196,10 +351,11 @@ def save_profile(data: Dict[str, Any], current_user: dict = Depends(get_current_
     user_id = current_user["_id"]
 
     # Database update query
-    users_col.update_one(
+    await users_col.update_one(
         {"_id": ObjectId(user_id)},
         {"$set": data}
     )
+    invalidate_user(user_id)
 
     return {"status": "success", "message": "Profile saved to Database", "profile": data}
 
@@ -207,7 +363,7 @@ def save_profile(data: Dict[str, Any], current_user: dict = Depends(get_current_
 # 4. UPDATE PROFILE ROUTE (PUT) - NEW ADDITION
 # ==========================================
 @app.put("/auth/update-profile")
-def update_profile(profile_data: ProfileUpdateSchema, current_user: dict = Depends(get_current_user)):
+async def update_profile(profile_data: ProfileUpdateSchema, current_user: dict = Depends(get_current_user)):
     user_id = current_user["_id"]
 
     # 1. Pydantic model ko dict me convert karo (sirf jo values aayi hain unhe lo)
@@ -226,13 +382,14 @@ def update_profile(profile_data: ProfileUpdateSchema, current_user: dict = Depen
         return {"message": "No data provided to update"}
 
     # 3. MongoDB Update Query
-    users_col.update_one(
+    await users_col.update_one(
         {"_id": ObjectId(user_id)},
         {"$set": update_data}
     )
+    invalidate_user(user_id)
 
     # 4. Updated User ko wapas fetch karo (Confirmation ke liye)
-    updated_user = users_col.find_one({"_id": ObjectId(user_id)})
+    updated_user = await users_col.find_one({"_id": ObjectId(user_id)}, USER_AUTH_PROJECTION)
     
     # Password remove karo response se
     if updated_user:
@@ -247,31 +404,109 @@ def update_profile(profile_data: ProfileUpdateSchema, current_user: dict = Depen
 from datetime import timedelta
 
 @app.get("/history/weekly")
-def get_weekly_history(current_user: dict = Depends(get_current_user)):
+async def get_weekly_history(current_user: dict = Depends(get_current_user)):
     user_id = current_user["_id"]
     today = date.today()
     
-    # Pichle 7 din ka data store karne ke liye array (Mon-Sun)
+    # Is hafte (Mon-Sun) ka data store karne ke liye array
     # Default sab 0
     weekly_data = [0] * 7 
     
-    # Database se pichle 7 din ke logs nikalo
-    start_date = str(today - timedelta(days=7))
-    
-    logs = daily_logs_col.find({
-        "user_id": ObjectId(user_id),
-        "date": {"$gte": start_date} # Aaj se 7 din pehle tak
-    })
+    # Sirf is hafte ke Monday se aaj tak ke din.
+    # (Pehle "today - 7" tha → 8 din aate the aur pichle hafte ka same
+    #  weekday is hafte ki value overwrite kar deta tha.)
+    monday = today - timedelta(days=today.weekday())
+    days = [str(monday + timedelta(days=i)) for i in range(today.weekday() + 1)]
+
+    # user_rollups se ek hi document, sirf in dino ke fields
+    # (purane users ka rollup pehli baar yahin daily_logs se banta hai)
+    rollup = await rollups.load(user_id, {f"daily.{d}.calories": 1 for d in days})
+    daily = rollup.get("daily", {})
 
-    # Data ko array mein bharo
-    for log in logs:
-        log_date = datetime.strptime(log["date"], "%Y-%m-%d").date()
-        # Monday = 0, Sunday = 6
-        day_index = log_date.weekday()
-        weekly_data[day_index] = log["total_calories"]
+    # Data ko array mein bharo (Monday = 0, Sunday = 6)
+    for day_index, d in enumerate(days):
+        weekly_data[day_index] = daily.get(d, {}).get("calories", 0)
 
     return {"weekly_calories": weekly_data}
 
+@app.get("/history/totals")
+async def get_history_totals(current_user: dict = Depends(get_current_user)):
+    """Aaj / is hafte / is mahine ke totals — single rollup document se."""
+    today = date.today()
+    day_key, week_key, month_key = rollups.period_keys(today)
+
+    rollup = await rollups.load(
+        current_user["_id"],
+        {f"daily.{day_key}": 1, f"weekly.{week_key}": 1, f"monthly.{month_key}": 1},
+    )
+
+    empty = {f: 0 for f in rollups.FIELDS}
+    return {
+        "today": rollup.get("daily", {}).get(day_key, empty),
+        "week": rollup.get("weekly", {}).get(week_key, empty),
+        "month": rollup.get("monthly", {}).get(month_key, empty),
+    }
+
+# ==========================================
+# 6. CALORIE ANALYTICS (day / week / month)
+# ==========================================
+async def _history_range_rows(uid, start, end, granularity):
+    """
+    Returns (bucket rows, streak facet). MongoDB 5.0+ → dono pipelines parallel
+    (server par bucketing). Purana server / mongomock → range ke daily_logs
+    Python me (analytics fallback), pehle 500 aata tha.
+    """
+    if analytics.pipelines_supported(database.server_version()):
+        try:
+            return await asyncio.gather(
+                daily_logs_col.aggregate(analytics.buckets_pipeline(uid, start, end, granularity)).to_list(length=None),
+                daily_logs_col.aggregate(analytics.streaks_pipeline(uid, start, end)).to_list(length=None),
+            )
+        except OperationFailure as e:
+            print(f"⚠️ /history/range pipeline failed, using Python fallback: {e}")
+
+    logs = await daily_logs_col.find(analytics.logs_query(uid, start, end), analytics.LOG_FIELDS).to_list(length=None)
+    return analytics.buckets_from_logs(logs, granularity), analytics.streaks_from_logs(logs)
+
+
+@app.get("/history/range")
+async def get_history_range(
+    granularity: str = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    if granularity not in analytics.GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be day, week or month")
+
+    end = end or date.today()
+    start = start or end - timedelta(days=analytics.DEFAULT_SPAN_DAYS[granularity])
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    uid = ObjectId(current_user["_id"])
+    bucket_rows, streak_rows = await _history_range_rows(uid, start, end, granularity)
+
+    buckets = analytics.fill_buckets(bucket_rows, start, end, granularity)
+    total = sum(b["total_calories"] for b in buckets)
+    days_logged = sum(b["days_logged"] for b in buckets)
+
+    return {
+        "granularity": granularity,
+        "start": str(start),
+        "end": str(end),
+        "buckets": buckets,
+        "summary": {
+            "total_calories": total,
+            "days_logged": days_logged,
+            "avg_calories_per_logged_day": round(total / days_logged, 1) if days_logged else 0,
+            "protein": sum(b["protein"] for b in buckets),
+            "carbs": sum(b["carbs"] for b in buckets),
+            "fat": sum(b["fat"] for b in buckets),
+        },
+        "streaks": analytics.summarize_streaks(streak_rows, end),
+    }
+
 # ------------------------
 # ROOT / HEALTH CHECK
 # ------------------------
@@ -279,43 +514,114 @@ def get_weekly_history(current_user: dict = Depends(get_current_user)):
 def home() -> Dict[str, Any]:
     return {"status": "ok", "message": "AI Fitness FastAPI backend is running"}
 
-@app.get("/history/list")
-def get_history_list(current_user: dict = Depends(get_current_user)):
-    uid = ObjectId(current_user["_id"])
+# ------------------------
+# METRICS (pool / cache sizing)
+# ------------------------
+@app.get("/metrics")
+def metrics() -> Dict[str, Any]:
+    return {
+        "password_hashing": hash_pool_metrics(),
+        "user_cache": user_cache.stats(),
+        "token_cache": auth.token_cache.stats() if auth.token_cache else None,
+        "pdf_exports": pdf_jobs.metrics(),
+        "llm": llm_client.metrics(),
+        "recommendation_cache": rec_cache.metrics(),
+        "chat_memory": chat_memory.metrics(),
+        "chat_sessions": chat_sessions.metrics(),
+    }
 
-    records = list(history_col.find({"user_id": uid}).sort("date", -1))
+# ------------------------
+# HISTORY: LIST (paginated) + DETAIL
+# ------------------------
+# List view ke liye sirf halka summary; pura record GET /history/{id} se.
+HISTORY_SUMMARY_PROJECTION = {"title": 1, "date": 1, "calories": 1}
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
 
-    clean_records = []
-    for r in records:
-        r["_id"] = str(r.get("_id"))
-        r["user_id"] = str(r.get("user_id"))
+def _encode_history_cursor(doc):
+    d = doc.get("date")
+    payload = {"d": d.isoformat() if isinstance(d, datetime) else d, "i": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
 
-        # Convert date field
-        if "date" in r:
-            r["date"] = str(r["date"])
+def _decode_history_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        d = payload["d"]
+        if isinstance(d, str):
+            try:
+                d = datetime.fromisoformat(d)
+            except ValueError:
+                pass
+        return d, ObjectId(payload["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def serialize_history(r):
+    r["_id"] = str(r.get("_id"))
+    if "user_id" in r:
+        r["user_id"] = str(r["user_id"])
+    if "chat_session_id" in r:
+        r["chat_session_id"] = str(r["chat_session_id"])
+
+    # Convert date field
+    if "date" in r:
+        r["date"] = str(r["date"])
+
+    # Convert inside chat history
+    if "chat_history" in r:
+        for item in r["chat_history"]:
+            if "_id" in item:
+                item["_id"] = str(item["_id"])
+
+    return r
 
-        # Convert inside chat history
-        if "chat_history" in r:
-            for item in r["chat_history"]:
-                if "_id" in item:
-                    item["_id"] = str(item["_id"])
+@app.get("/history/list")
+async def get_history_list(
+    limit: int = HISTORY_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    uid = ObjectId(current_user["_id"])
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    # Keyset pagination on (date desc, _id desc) — offset/skip nahi
+    query = {"user_id": uid}
+    if cursor:
+        last_date, last_id = _decode_history_cursor(cursor)
+        query["$or"] = [
+            {"date": {"$lt": last_date}},
+            {"date": last_date, "_id": {"$lt": last_id}},
+        ]
+
+    # Ek extra doc fetch karke pata chalta hai ki agla page hai ya nahi
+    records = await (
+        history_col.find(query, HISTORY_SUMMARY_PROJECTION)
+        .sort([("date", -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
 
-        clean_records.append(r)
+    has_more = len(records) > limit
+    records = records[:limit]
+    next_cursor = _encode_history_cursor(records[-1]) if has_more else None
 
-    return {"history": clean_records}
+    return {
+        "history": [serialize_history(r) for r in records],
+        "next_cursor": next_cursor,
+    }
 
 
 from fastapi import Body
 
 @app.post("/history/rename")
-def rename_history(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def rename_history(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
     history_id = data.get("history_id")
     new_title = (data.get("title") or "").strip()
 
     if not history_id or not new_title:
         raise HTTPException(status_code=400, detail="history_id and title are required")
 
-    result = history_col.update_one(
+    result = await history_col.update_one(
         {"_id": ObjectId(history_id), "user_id": ObjectId(current_user["_id"])},
         {"$set": {"title": new_title}}
     )
@@ -323,17 +629,97 @@ def rename_history(data: Dict[str, Any], current_user: dict = Depends(get_curren
     return {"success": result.modified_count == 1}
 
 @app.post("/history/delete")
-def delete_history(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def delete_history(data: Dict[str, Any], current_user: dict = Depends(get_current_user)):
     history_id = data.get("history_id")
     if not history_id:
         raise HTTPException(status_code=400, detail="history_id is required")
 
-    result = history_col.delete_one(
+    result = await history_col.delete_one(
         {"_id": ObjectId(history_id), "user_id": ObjectId(current_user["_id"])}
     )
 
     return {"success": result.deleted_count == 1}
 
+# ------------------------
+# HISTORY EXPORT (streaming NDJSON / CSV)
+# ------------------------
+EXPORT_BATCH_SIZE = 500
+EXPORT_MAX_BATCH_SIZE = 5000
+
+@app.get("/history/export")
+async def export_history(
+    format: str = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include: str = "history,daily_logs",
+    batch_size: int = EXPORT_BATCH_SIZE,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    GDPR / analytics pull. Documents seedha Mongo cursor se stream hote hain
+    (poori list memory me kabhi nahi banti).
+    """
+    fmt = format.lower()
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    kinds = [k.strip() for k in include.split(",") if k.strip()]
+    if not kinds or any(k not in ("history", "daily_logs") for k in kinds):
+        raise HTTPException(status_code=400, detail="include must be history and/or daily_logs")
+
+    uid = ObjectId(current_user["_id"])
+    batch_size = max(1, min(batch_size, EXPORT_MAX_BATCH_SIZE))
+
+    cursors = []
+    if "history" in kinds:
+        # history.date datetime hai
+        query = {"user_id": uid}
+        date_range = {}
+        if start:
+            date_range["$gte"] = datetime.combine(start, datetime.min.time())
+        if end:
+            date_range["$lt"] = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        if date_range:
+            query["date"] = date_range
+        cursor = history_col.find(query).sort([("date", 1), ("_id", 1)]).batch_size(batch_size)
+        cursors.append(("history", cursor))
+
+    if "daily_logs" in kinds:
+        # daily_logs.date "YYYY-MM-DD" string hai
+        query = {"user_id": uid}
+        date_range = {}
+        if start:
+            date_range["$gte"] = str(start)
+        if end:
+            date_range["$lte"] = str(end)
+        if date_range:
+            query["date"] = date_range
+        cursor = daily_logs_col.find(query).sort("date", 1).batch_size(batch_size)
+        cursors.append(("daily_logs", cursor))
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"fitness_export_{current_user['_id']}.{fmt}"
+
+    return StreamingResponse(
+        stream_documents(cursors, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# NOTE: ye route baaki GET /history/* routes ke BAAD hi rehna chahiye
+@app.get("/history/{history_id}")
+async def get_history_detail(history_id: str, current_user: dict = Depends(get_current_user)):
+    if not ObjectId.is_valid(history_id):
+        raise HTTPException(status_code=400, detail="Invalid history_id")
+
+    record = await history_col.find_one(
+        {"_id": ObjectId(history_id), "user_id": ObjectId(current_user["_id"])}
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="History record not found")
+
+    return {"record": serialize_history(record)}
+
 
 # ------------------------
 # WORKOUT PLAN API
@@ -428,10 +814,12 @@ def advanced_plan_api(user: Dict[str, Any]) -> Dict[str, Any]:
 # CALORIES API
 # ------------------------
 @app.post("/calories")
-def calories_api(body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def calories_api(body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
     # 1. AI se Calories Estimate karo
     food_text = body.get("food_text", "")
-    estimated_total, details = estimate_calories(food_text)
+    await nutrition_db.warm_up()
+    meal = estimate_meal(food_text)
+    estimated_total, details = meal["calories"], format_meal_details(meal)
 
     # 2. Aaj ki Date aur User ID nikalo
     today_str = str(date.today())
@@ -439,13 +827,27 @@ def calories_api(body: Dict[str, Any], current_user: dict = Depends(get_current_
 
     # 3. Database Update Logic (Upsert)
     # Agar aaj ka record hai, to update karo. Agar nahi hai, to naya banao.
-    daily_logs_col.update_one(
+    # find_one_and_update updated doc bhi wapas deta hai (alag find_one nahi chahiye).
+    # Rollup ($inc) isi ke saath parallel jaata hai.
+    rollup_task = rollups.apply_rollup(user_id, {today_str: {
+        "calories": estimated_total,
+        "protein": meal["protein"],
+        "carbs": meal["carbs"],
+        "fat": meal["fat"],
+        "meals": 1,
+    }})
+    log_task = daily_logs_col.find_one_and_update(
         {
             "user_id": ObjectId(user_id),
             "date": today_str
         },
         {
-            "$inc": {"total_calories": estimated_total}, # Total me add karo
+            "$inc": { # Total (aur macros) me add karo
+                "total_calories": estimated_total,
+                "total_protein": meal["protein"],
+                "total_carbs": meal["carbs"],
+                "total_fat": meal["fat"],
+            },
             "$push": { # List me naya item jodo
                 "food_items": {
                     "item": food_text,
@@ -459,11 +861,13 @@ def calories_api(body: Dict[str, Any], current_user: dict = Depends(get_current_
                 "created_at": datetime.utcnow()
             }
         },
-        upsert=True # Magic Flag: Record nahi hoga to naya bana dega (24hr Reset Logic)
+        projection={"total_calories": 1},
+        upsert=True, # Magic Flag: Record nahi hoga to naya bana dega (24hr Reset Logic)
+        return_document=ReturnDocument.AFTER,
     )
+    updated_log, _ = await asyncio.gather(log_task, rollup_task)
 
     # 4. Updated Total wapas bhejo taaki UI turant update ho jaye
-    updated_log = daily_logs_col.find_one({"user_id": ObjectId(user_id), "date": today_str})
     
     return {
         "success": True, 
@@ -473,12 +877,110 @@ def calories_api(body: Dict[str, Any], current_user: dict = Depends(get_current_
     }
 
 
+# ------------------------
+# CALORIES BATCH API (offline sync)
+# ------------------------
+@app.post("/calories/batch")
+async def calories_batch_api(body: CaloriesBatchSchema, current_user: dict = Depends(get_current_user)):
+    meals = body.meals
+    if not meals:
+        raise HTTPException(status_code=400, detail="meals list is empty")
+    if len(meals) > MAX_BATCH_MEALS:
+        raise HTTPException(status_code=400, detail=f"Max {MAX_BATCH_MEALS} meals per batch")
+
+    user_id = ObjectId(current_user["_id"])
+    now = datetime.utcnow()
+
+    # 1. Saare meals ek saath estimate karo (single scan + NumPy sums)
+    await nutrition_db.warm_up()
+    estimates = estimate_meals_batch([m.food_text for m in meals])
+
+    # 2. (user, date) ke hisaab se group karo
+    per_date = {}
+    results = []
+    for meal, est in zip(meals, estimates):
+        logged_at = meal.time or now
+        day = str(meal.time.date()) if meal.time else str(date.today())
+
+        group = per_date.setdefault(day, {"calories": 0, "protein": 0, "carbs": 0, "fat": 0, "items": []})
+        group["calories"] += est["calories"]
+        group["protein"] += est["protein"]
+        group["carbs"] += est["carbs"]
+        group["fat"] += est["fat"]
+        group["items"].append({
+            "item": meal.food_text,
+            "calories": est["calories"],
+            "time": logged_at,
+        })
+
+        results.append({
+            "food_text": meal.food_text,
+            "date": day,
+            "calories": est["calories"],
+            "protein": est["protein"],
+            "carbs": est["carbs"],
+            "fat": est["fat"],
+            "items": est["items"],
+            "details": format_meal_details(est),
+        })
+
+    # 3. Ek hi bulk_write me saare daily logs update
+    ops = [
+        UpdateOne(
+            {"user_id": user_id, "date": day},
+            {
+                "$inc": {
+                    "total_calories": group["calories"],
+                    "total_protein": group["protein"],
+                    "total_carbs": group["carbs"],
+                    "total_fat": group["fat"],
+                },
+                "$push": {"food_items": {"$each": group["items"]}},
+                "$setOnInsert": {"user_id": user_id, "date": day, "created_at": now},
+            },
+            upsert=True,
+        )
+        for day, group in per_date.items()
+    ]
+    rollup_days = {
+        day: {
+            "calories": g["calories"], "protein": g["protein"],
+            "carbs": g["carbs"], "fat": g["fat"], "meals": len(g["items"]),
+        }
+        for day, g in per_date.items()
+    }
+    await asyncio.gather(
+        daily_logs_col.bulk_write(ops, ordered=False),
+        rollups.apply_rollup(user_id, rollup_days),
+    )
+
+    # 4. Naye daily totals (ek query)
+    logs = daily_logs_col.find(
+        {"user_id": user_id, "date": {"$in": list(per_date)}},
+        {"date": 1, "total_calories": 1},
+    )
+    daily_totals = {log["date"]: log["total_calories"] async for log in logs}
+
+    return {
+        "success": True,
+        "meals": results,
+        "daily_totals": daily_totals,
+        "message": f"{len(meals)} meals saved to Database",
+    }
+
+
 # ------------------------
 # AI RECOMMENDATION API
 # ------------------------
-@app.post("/recommendation")
-def recommendation_api(user: Dict[str, Any]) -> Dict[str, Any]:
+# LLM calls async hain (shared pooled client) — 1–5 s ke round trip me
+# koi threadpool worker block nahi hota
+def _llm_http_error(e):
+    if isinstance(e, llm_client.LLMBusy):
+        return HTTPException(status_code=503, detail="AI coach is busy, please retry", headers={"Retry-After": "2"})
+    return HTTPException(status_code=502, detail="AI service unavailable, please retry")
 
+
+def _recommendation_args(user):
     name = user.get("name") or "Friend"
     age = user.get("age") or 0
     weight = user.get("weight_kg") or 0
@@ -487,35 +989,192 @@ def recommendation_api(user: Dict[str, Any]) -> Dict[str, Any]:
     goal = user.get("goal") or "general fitness"
     activity = user.get("activity_level") or "moderate"
     latest_calories = user.get("last_calories") or 0
+    return name, age, weight, height, gender, goal, activity, latest_calories
 
-    advice = get_ai_recommendation(
-        name, age, weight, height, gender, goal, activity, latest_calories
-    )
+
+@app.post("/recommendation")
+async def recommendation_api(user: Dict[str, Any]) -> Dict[str, Any]:
+
+    try:
+        advice = await get_ai_recommendation(*_recommendation_args(user))
+    except llm_client.LLMError as e:
+        raise _llm_http_error(e)
 
     return {"success": True, "advice": advice}
 
 
+# Token-by-token (SSE). Aakhri "done" event me poora text — wahi
+# /save-summary ko ai_advice / chat_history me bhejo.
+@app.post("/recommendation/stream")
+async def recommendation_stream_api(request: Request, user: Dict[str, Any]):
+    pieces = stream_ai_recommendation(*_recommendation_args(user))
+    return StreamingResponse(llm_event_stream(request, pieces), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 # ------------------------
 # AI CHAT API
 # ------------------------
-@app.post("/chat")
-def chat_api(body: Dict[str, Any]) -> Dict[str, Any]:
-
+def _chat_history(body):
     message = body.get("message") or ""
     history = body.get("history") or []
-
+    if not isinstance(message, str) or not isinstance(history, list):
+        raise HTTPException(status_code=400, detail="message must be a string and history a list")
+
+    # Size limits: bina login ka endpoint hai — bade payload se memory / token
+    # counting par bojh na pade
+    if len(message) > CHAT_MAX_MESSAGE_CHARS:
+        raise HTTPException(status_code=413, detail="message is too long")
+    if len(history) > CHAT_MAX_HISTORY_MESSAGES:
+        raise HTTPException(status_code=413, detail="history has too many messages")
+    total = len(message)
+    for msg in history:
+        content = msg.get("content") if isinstance(msg, dict) else None
+        if not isinstance(content, str):
+            raise HTTPException(status_code=400, detail="history items need role and content")
+        if len(content) > CHAT_MAX_MESSAGE_CHARS:
+            raise HTTPException(status_code=413, detail="a history message is too long")
+        total += len(content)
+    if total > CHAT_MAX_HISTORY_CHARS:
+        raise HTTPException(status_code=413, detail="history is too long")
+
+    # Copy — client ka bheja list mutate nahi karte
+    history = list(history)
     if message:
         history.append({"role": "user", "content": message})
+    return history
 
-    reply = chat_with_coach(history)
+
+@app.post("/chat")
+async def chat_api(body: Dict[str, Any]) -> Dict[str, Any]:
+
+    history = _chat_history(body)
+
+    try:
+        reply = await chat_with_coach(history)
+    except llm_client.LLMError as e:
+        raise _llm_http_error(e)
 
     return {"success": True, "reply": reply}
 
 
+@app.post("/chat/stream")
+async def chat_stream_api(request: Request, body: Dict[str, Any]):
+    pieces = chat_with_coach_stream(_chat_history(body))
+    return StreamingResponse(llm_event_stream(request, pieces), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# ------------------------
+# CHAT SESSIONS (server-side history)
+# ------------------------
+# /chat har turn par poori history maangta hai. Session ke saath client ek
+# baar POST /chat/sessions karta hai, phir har turn par sirf naya message.
+@app.post("/chat/sessions")
+async def create_chat_session(body: Optional[Dict[str, Any]] = None, current_user: dict = Depends(get_current_user)):
+    # Optional seed: pehle ki chat (e.g. last_session.chat_history)
+    messages = (body or {}).get("messages") or []
+    try:
+        session_id = await chat_sessions.create(current_user["_id"], messages)
+    except chat_sessions.SessionTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"success": True, "session_id": session_id}
+
+
+@app.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str, current_user: dict = Depends(get_current_user)):
+    session = await chat_sessions.get(session_id, current_user["_id"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"session_id": session_id, "messages": session["messages"], "turns": session["n"]}
+
+
+async def _session_turn(session_id, body, user_id):
+    """Returns (naya user message, LLM ko jaane wali history)."""
+    message = (body.get("message") or "").strip()
+    if not message:
+        raise HTTPException(status_code=400, detail="message is required")
+    if len(message) > chat_sessions.MAX_MESSAGE_CHARS:
+        raise HTTPException(status_code=413, detail="message is too long")
+
+    session = await chat_sessions.get(session_id, user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    if session["n"] + 2 > CHAT_SESSION_MAX_MESSAGES:
+        raise HTTPException(status_code=409, detail="Chat session is full, start a new one")
+    if session["bytes"] + len(message.encode("utf-8")) > chat_sessions.MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Chat session is too large, start a new one")
+
+    turn = {"role": "user", "content": message}
+    return turn, session["messages"] + [turn]
+
+
+async def _save_turn(session_id, user_id, turn, reply):
+    """User message + reply ek saath (reply fail ho to turn save nahi hota)."""
+    try:
+        return await chat_sessions.append(session_id, user_id, [turn, {"role": "assistant", "content": reply}])
+    except (chat_sessions.SessionFull, chat_sessions.SessionTooLarge):
+        # Reply user tak ja chuka; turn bas session me nahi judta
+        return None
+
+
+@app.post("/chat/sessions/{session_id}/messages")
+async def chat_session_message(session_id: str, body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+    user_id = current_user["_id"]
+    turn, history = await _session_turn(session_id, body, user_id)
+
+    try:
+        reply = await chat_with_coach(history)
+    except llm_client.LLMError as e:
+        raise _llm_http_error(e)
+
+    turns = await _save_turn(session_id, user_id, turn, reply)
+    return {"success": True, "reply": reply, "session_id": session_id, "turns": turns}
+
+
+async def _session_stream(session_id, user_id, turn, history):
+    parts = []
+    pieces = chat_with_coach_stream(history)
+    try:
+        async for piece in pieces:
+            parts.append(piece)
+            yield piece
+    finally:
+        await pieces.aclose()
+    # Sirf poora reply (error / disconnect nahi) session me
+    await _save_turn(session_id, user_id, turn, "".join(parts))
+
+
+@app.post("/chat/sessions/{session_id}/messages/stream")
+async def chat_session_stream(
+    request: Request,
+    session_id: str,
+    body: Dict[str, Any],
+    current_user: dict = Depends(get_current_user),
+):
+    user_id = current_user["_id"]
+    turn, history = await _session_turn(session_id, body, user_id)
+    pieces = _session_stream(session_id, user_id, turn, history)
+    return StreamingResponse(llm_event_stream(request, pieces), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _summary_chat(body, user_id):
+    """
+    /save-summary, /export-summary: chat_session_id ho to chat server ke
+    session se (client ko poori chat bhejne ki zarurat nahi). Returns
+    (chat_history, session_id | None).
+    """
+    session_id = body.get("chat_session_id")
+    if session_id:
+        session = await chat_sessions.get(session_id, user_id)
+        if session is not None:
+            return list(session["messages"]), session_id
+    return body.get("chat_history", []), None
+
+
 @app.post("/save-summary")
-def save_summary_only(body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
+async def save_summary_only(body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
 
     user_id = current_user["_id"]
+    chat_history, chat_session_id = await _summary_chat(body, user_id)
 
     record = {
         "user_id": ObjectId(user_id),
@@ -525,17 +1184,18 @@ def save_summary_only(body: Dict[str, Any], current_user: dict = Depends(get_cur
         "diet_plan": body.get("diet_plan", {}),
         "workout_plan": body.get("workout_plan", {}),
         "ai_advice": body.get("ai_advice", ""),
-        "chat_history": body.get("chat_history", []),
+        "chat_history": chat_history,
     }
+    if chat_session_id:
+        record["chat_session_id"] = ObjectId(chat_session_id)
 
     # Save to DB
-    history_col.insert_one(record)
+    result = await history_col.insert_one(record)
+    if chat_session_id:
+        await chat_sessions.link_history(chat_session_id, user_id, result.inserted_id)
 
     # Update last session
-    users_col.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": {"last_session": record}}
-    )
+    await save_last_session(user_id, record, result.inserted_id)
 
     return {"success": True, "message": "Summary saved successfully"}
 
@@ -544,11 +1204,20 @@ def save_summary_only(body: Dict[str, Any], current_user: dict = Depends(get_cur
 # ------------------------
 
 @app.post("/export-summary")
-def export_summary(request: Request, body: Dict[str, Any], current_user: dict = Depends(get_current_user)):
-    
+async def export_summary(
+    request: Request,
+    body: Dict[str, Any],
+    mode: Optional[str] = None,          # "job" | "stream" (default: PDF_DELIVERY)
+    current_user: dict = Depends(get_current_user),
+):
+    mode = (mode or PDF_DELIVERY).lower()
+    if mode not in ("job", "stream"):
+        raise HTTPException(status_code=400, detail="mode must be 'job' or 'stream'")
+
     # 1. User ka data token se nikala (Secure)
     user_id = current_user["_id"]
     username = current_user["name"]
+    chat_history, chat_session_id = await _summary_chat(body, user_id)
 
     # 2. Data prepare kiya
     record = {
@@ -559,31 +1228,20 @@ def export_summary(request: Request, body: Dict[str, Any], current_user: dict =
         "diet_plan": body.get("diet_plan", {}),
         "workout_plan": body.get("workout_plan", {}),
         "ai_advice": body.get("ai_advice", ""),
-        "chat_history": body.get("chat_history", []),
+        "chat_history": chat_history,
     }
+    if chat_session_id:
+        record["chat_session_id"] = ObjectId(chat_session_id)
 
     # 3. MongoDB ke 'history' collection me save kiya
-    history_col.insert_one(record)
+    result = await history_col.insert_one(record)
+    if chat_session_id:
+        await chat_sessions.link_history(chat_session_id, user_id, result.inserted_id)
 
-    # 3B. 🔥 User document me "last_session" update karo
-    users_col.update_one(
-        {"_id": ObjectId(user_id)},
-        {
-            "$set": {
-                "last_session": {
-                    "calories": record["calories"],
-                    "diet_plan": record["diet_plan"],
-                    "workout_plan": record["workout_plan"],
-                    "ai_advice": record["ai_advice"],
-                    "chat_history": record["chat_history"],
-                    "saved_at": datetime.utcnow(),
-                }
-            }
-        }
-    )
+    # 3B. 🔥 "last_session" update karo (last_sessions collection)
+    await save_last_session(user_id, record, result.inserted_id)
 
-    # 4. PDF Generate kiya (Ye logic same rahega)
-    pdf_path = create_summary_pdf(
+    pdf_args = dict(
         username=username,
         calories=record["calories"],
         diet_plan=record["diet_plan"],
@@ -592,14 +1250,64 @@ def export_summary(request: Request, body: Dict[str, Any], current_user: dict =
         chat_history=record["chat_history"],
     )
 
-    filename = os.path.basename(pdf_path)
-    
-    # Auto-detect URL
-    base_url = str(request.base_url).rstrip("/")
+    # 4. PDF process pool me banta hai — request render ke dauraan block nahi hoti
+    try:
+        if mode == "stream":
+            # 4A. Memory me render → seedha response (na exports/, na doosri request)
+            pdf_bytes = await pdf_jobs.render_bytes(user_id, **pdf_args)
+        else:
+            # 4B. Background job → GET /exports/{job_id} se pdf_url
+            job_id, status = await pdf_jobs.submit(user_id, result.inserted_id, **pdf_args)
+    except pdf_jobs.ExportQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Saved, but PDF export queue is full, please retry",
+            headers={"Retry-After": "2"},
+        )
+    except pdf_jobs.TooManyUserExports:
+        raise HTTPException(
+            status_code=429,
+            detail="Saved, but you already have PDF exports in progress",
+            headers={"Retry-After": "2"},
+        )
+
+    if mode == "stream":
+        return StreamingResponse(
+            iter_bytes(pdf_bytes),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": pdf_cache.content_disposition(username),
+                "X-History-Id": str(result.inserted_id),
+            },
+        )
 
     return {
         "success": True,
-        "pdf_url": f"{base_url}/static/{filename}",
-        "message": "Saved to Database & PDF Generated"
+        "job_id": job_id,
+        "status": status,
+        "status_url": f"/exports/{job_id}",
+        "message": "Saved to Database, PDF is being generated"
     }
 
+
+# ------------------------
+# EXPORT JOB STATUS
+# ------------------------
+@app.get("/exports/{job_id}")
+async def export_status(request: Request, job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await pdf_jobs.get_job(job_id, current_user["_id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    response = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "done" and not os.path.exists(os.path.join(EXPORTS_DIR, job["filename"])):
+        # exports/ eviction ne file hata di → dobara export karo
+        response["status"] = "expired"
+    elif job["status"] == "done":
+        # Auto-detect URL
+        base_url = str(request.base_url).rstrip("/")
+        response["pdf_url"] = f"{base_url}/static/{job['filename']}"
+    elif job["status"] == "failed":
+        response["error"] = job.get("error")
+    return response
+
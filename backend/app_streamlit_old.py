@@ -7,6 +7,7 @@ from utils.exporter import create_summary_pdf
 from utils.ai_recommender import get_ai_recommendation
 from streamlit_mic_recorder import speech_to_text
 from utils.ai_chat import chat_with_coach
+from utils.llm_client import run_sync
 from utils.fitness_generator import generate_workout_plan, generate_diet_plan
 
 
@@ -429,7 +430,7 @@ if st.button("Send Question"):
         st.session_state["chat_history"].append({"role": "user", "content": user_msg})
 
         with st.spinner("Coach is thinking..."):
-            reply = chat_with_coach(st.session_state["chat_history"])
+            reply = run_sync(chat_with_coach(st.session_state["chat_history"], wait_summary=True))
 
         # Add assistant reply
         st.session_state["chat_history"].append({"role": "assistant", "content": reply})
@@ -452,7 +453,7 @@ if st.button("Get AI Recommendation"):
     last_cal = float(st.session_state.get("calorie_estimate", 0.0))
 
     with st.spinner("Analyzing health data..."):
-        advice = get_ai_recommendation(name, age, weight, height, gender, goal, activity, last_cal)
+        advice = run_sync(get_ai_recommendation(name, age, weight, height, gender, goal, activity, last_cal))
     st.session_state["ai_advice"] = advice
 
     st.markdown("### Your Personalized AI Advice:")
@@ -1,11 +1,21 @@
 # backend/auth.py
 
 import os
+import time
+import asyncio
+import hashlib
+import threading
 import bcrypt
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from dotenv import load_dotenv
-from database import users_col
+from utils.cache import TTLCache
+from config import (
+    TOKEN_CACHE_ENABLED, TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS,
+    BCRYPT_ROUNDS, HASH_POOL_WORKERS, HASH_QUEUE_SIZE,
+)
 
 load_dotenv()
 
@@ -17,12 +27,99 @@ TOKEN_EXPIRE_MINUTES = 7 * 24 * 60  # 7 days
 # Password Hashing
 # ------------------------
 def hash_password(password: str):
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
     return hashed.decode("utf-8")
 
 def verify_password(password: str, hashed: str):
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
+def needs_rehash(hashed: str):
+    """True if hash ka cost factor configured BCRYPT_ROUNDS se alag hai."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# ------------------------
+# Password Hashing Pool
+# ------------------------
+# bcrypt jaan-bujh kar slow hai. Isse Starlette ke default threadpool me
+# chalane se login storm ke waqt baaki endpoints queue ho jate the.
+# Ab hashing apne alag, bounded pool me chalti hai (bcrypt GIL release karta
+# hai). Queue full ho to HashPoolBusy → API 503 deti hai (backpressure).
+class HashPoolBusy(Exception):
+    pass
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+_hash_lock = threading.Lock()
+_hash_stats = {"pending": 0, "running": 0, "completed": 0, "rejected": 0}
+_hash_wait_ms = deque(maxlen=1000)
+_hash_run_ms = deque(maxlen=1000)
+
+def _timed(fn, queued_at, *args):
+    started = time.perf_counter()
+    with _hash_lock:
+        _hash_stats["running"] += 1
+    try:
+        return fn(*args)
+    finally:
+        done = time.perf_counter()
+        with _hash_lock:
+            _hash_stats["running"] -= 1
+            _hash_stats["completed"] += 1
+            _hash_wait_ms.append((started - queued_at) * 1000)
+            _hash_run_ms.append((done - started) * 1000)
+
+def _release_slot(_future=None):
+    with _hash_lock:
+        _hash_stats["pending"] -= 1
+
+async def _run_in_hash_pool(fn, *args):
+    with _hash_lock:
+        if _hash_stats["pending"] >= HASH_POOL_WORKERS + HASH_QUEUE_SIZE:
+            _hash_stats["rejected"] += 1
+            raise HashPoolBusy("Password hashing queue is full")
+        _hash_stats["pending"] += 1
+
+    try:
+        future = _hash_pool.submit(_timed, fn, time.perf_counter(), *args)
+    except BaseException:
+        _release_slot()
+        raise
+    # Slot executor job ke saath free hota hai, awaiting request ke saath nahi:
+    # client disconnect (cancel) par bhi bcrypt chalta rehta hai — tab tak slot
+    # bhara rehna chahiye. Queue me cancel hua job → callback turant.
+    future.add_done_callback(_release_slot)
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str):
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str):
+    return await _run_in_hash_pool(verify_password, password, hashed)
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+def hash_pool_metrics():
+    with _hash_lock:
+        stats = dict(_hash_stats)
+        wait, run = list(_hash_wait_ms), list(_hash_run_ms)
+    stats.update({
+        "workers": HASH_POOL_WORKERS,
+        "queue_limit": HASH_QUEUE_SIZE,
+        "queue_depth": max(0, stats["pending"] - stats["running"]),
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "wait_ms_p50": _percentile(wait, 0.5),
+        "wait_ms_p95": _percentile(wait, 0.95),
+        "hash_ms_p50": _percentile(run, 0.5),
+        "hash_ms_p95": _percentile(run, 0.95),
+    })
+    return stats
+
 # ------------------------
 # JWT Token Generation
 # ------------------------
@@ -31,8 +128,38 @@ def create_token(user_id: str):
     payload = {"user_id": user_id, "exp": expire}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-def decode_token(token: str):
+# ------------------------
+# Verified Token Cache
+# ------------------------
+# Client wahi token 7 din tak bhejta rehta hai, to har request pe HS256 verify
+# + JSON parse dobara karne ki zarurat nahi. Key = sha256(token) (raw token
+# memory me nahi rakhte), value = verified claims. Entry kabhi bhi token ke
+# "exp" ke baad zinda nahi rehti.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS) if TOKEN_CACHE_ENABLED else None
+
+def _verify_token(token: str):
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except:
         return None
+
+def decode_token(token: str):
+    if token_cache is None:
+        return _verify_token(token)
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        return dict(claims)
+
+    claims = _verify_token(token)
+    if claims is None:
+        return None
+
+    # exp tak hi cache karo
+    ttl = token_cache.ttl
+    if "exp" in claims:
+        ttl = min(ttl, float(claims["exp"]) - time.time())
+    token_cache.set(key, claims, ttl=ttl)
+
+    return dict(claims)
@@ -0,0 +1,202 @@
+# backend/batch_reports.py
+"""
+Nightly PDF reports for every active client — HTTP ke bina.
+
+Har user ke latest saved session (last_sessions collection) se report banti
+hai, process pool me parallel. Sirf PADHTA hai: history me naya record nahi,
+last_sessions / users update nahi (/export-summary ke side effects yahan nahi).
+
+    python batch_reports.py --out reports/2026-10-18
+    python batch_reports.py --zip reports/2026-10-18.zip --active-days 7
+    python batch_reports.py --out /tmp/r --user <id> --user <id> --workers 8
+
+Users Mongo se stream hote hain aur ek time par sirf workers * 2 renders
+in-flight rehte hain, to memory users ki ginti par depend nahi karti.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import database
+from database import users_col, last_sessions_col
+from config import PDF_WORKERS
+from utils import pdf_cache, font_registry
+from utils.exporter import create_summary_pdf, create_summary_pdf_bytes
+
+USER_BATCH = 200
+
+
+# ---------------------------------------------------
+# WORKER SIDE (child process)
+# ---------------------------------------------------
+def _init_worker():
+    try:
+        font_registry.warm_up()
+    except Exception as e:
+        print(f"⚠️ Worker warm-up failed: {e}")
+
+
+def _render(kwargs, filename, out_dir):
+    """out_dir ho to file likho, warna bytes lautao (zip ke liye). Returns (result, ms)."""
+    started = time.perf_counter()
+    if out_dir:
+        result = create_summary_pdf(**kwargs, filename=filename, directory=out_dir)
+    else:
+        result = create_summary_pdf_bytes(**kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+# ---------------------------------------------------
+# SOURCE: latest session per active user (read-only)
+# ---------------------------------------------------
+async def iter_sessions(user_ids=None, active_days=None, limit=None):
+    """Yields (user_id, username, session). Names USER_BATCH ke chunks me $in se."""
+    query = {}
+    if user_ids:
+        query["_id"] = {"$in": [ObjectId(u) for u in user_ids]}
+    if active_days:
+        query["saved_at"] = {"$gte": datetime.utcnow() - timedelta(days=active_days)}
+
+    cursor = last_sessions_col.find(query, {"history_id": 0}).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    async def with_names(batch):
+        names = {}
+        async for u in users_col.find({"_id": {"$in": [s["_id"] for s in batch]}}, {"name": 1}):
+            names[u["_id"]] = u.get("name") or "User"
+        return [(s["_id"], names.get(s["_id"], "User"), s) for s in batch]
+
+    batch = []
+    async for session in cursor:
+        batch.append(session)
+        if len(batch) >= USER_BATCH:
+            for item in await with_names(batch):
+                yield item
+            batch = []
+    if batch:
+        for item in await with_names(batch):
+            yield item
+
+
+def _pdf_args(username, session):
+    return dict(
+        username=username,
+        calories=session.get("calories", 0),
+        diet_plan=session.get("diet_plan", {}),
+        workout_plan=session.get("workout_plan", {}),
+        ai_advice=session.get("ai_advice", ""),
+        chat_history=session.get("chat_history", []),
+    )
+
+
+# ---------------------------------------------------
+# BATCH RUN
+# ---------------------------------------------------
+async def run(out_dir=None, zip_path=None, user_ids=None, active_days=None, limit=None, workers=PDF_WORKERS):
+    if bool(out_dir) == bool(zip_path):
+        raise ValueError("Give exactly one of out_dir / zip_path")
+
+    if zip_path:
+        os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+        # PDFs pehle se zlib-compressed hain → ZIP_STORED (dobara compress bekaar)
+        archive = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+        archive = None
+
+    report = {"users": 0, "rendered": 0, "failed": 0, "bytes": 0, "errors": []}
+    render_ms = []
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(workers * 2)
+    tasks = set()
+    started = time.perf_counter()
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+    async def render_one(user_id, username, session):
+        filename = pdf_cache.filename_for(username, str(user_id))
+        try:
+            result, ms = await loop.run_in_executor(
+                pool, _render, _pdf_args(username, session), filename, out_dir,
+            )
+            if archive is not None:
+                archive.writestr(filename, result)
+                report["bytes"] += len(result)
+            else:
+                report["bytes"] += os.path.getsize(result)
+            report["rendered"] += 1
+            render_ms.append(ms)
+        except Exception as e:
+            report["failed"] += 1
+            report["errors"].append({"user_id": str(user_id), "error": str(e)})
+        finally:
+            in_flight.release()
+
+    try:
+        async for user_id, username, session in iter_sessions(user_ids, active_days, limit):
+            report["users"] += 1
+            await in_flight.acquire()
+            task = asyncio.create_task(render_one(user_id, username, session))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        pool.shutdown(wait=True)
+        if archive is not None:
+            archive.close()
+
+    elapsed = time.perf_counter() - started
+    report.update({
+        "elapsed_s": round(elapsed, 2),
+        "reports_per_s": round(report["rendered"] / elapsed, 2) if elapsed else 0.0,
+        "render_ms_p50": round(statistics.median(render_ms), 1) if render_ms else 0.0,
+        "render_ms_p95": round(sorted(render_ms)[int(len(render_ms) * 0.95)] if render_ms else 0.0, 1),
+        "workers": workers,
+        "output": zip_path or out_dir,
+    })
+    return report
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Render PDF reports for many users (read-only)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="Folder jisme PDFs likhne hain")
+    target.add_argument("--zip", help="Saari PDFs ek .zip me")
+    parser.add_argument("--user", action="append", help="Sirf ye user_id (repeatable)")
+    parser.add_argument("--active-days", type=int, help="Sirf jinhone pichhle N din me session save kiya")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS)
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        report = await run(args.out, args.zip, args.user, args.active_days, args.limit, args.workers)
+    finally:
+        database.close()
+
+    print(f"✅ {report['rendered']}/{report['users']} reports in {report['elapsed_s']}s "
+          f"({report['reports_per_s']}/s, {report['workers']} workers) → {report['output']}")
+    print(f"   render ms p50={report['render_ms_p50']} p95={report['render_ms_p95']}, "
+          f"{report['bytes'] / 1024:.0f} KB")
+    for err in report["errors"][:20]:
+        print(f"❌ {err['user_id']}: {err['error']}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(_main()))
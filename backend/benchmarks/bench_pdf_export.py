@@ -0,0 +1,76 @@
+"""
+Benchmark: summary PDF rendering time for long chat histories.
+
+Run from the backend folder:
+    python benchmarks/bench_pdf_export.py --messages 200 --repeat 5
+
+Renders into memory (create_summary_pdf_bytes), so disk speed doesn't matter.
+Har message ka text alag hai. Pehla render "cold" hai; baaki re-exports
+(same chat dobara export) layout cache hit karte hain.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.exporter import create_summary_pdf_bytes  # noqa: E402
+
+COACH_REPLY = (
+    "### Your plan for this week\n"
+    "Great question! Here is what I suggest based on your **goal** and activity level:\n\n"
+    "- Keep protein around **1.6 g per kg** of body weight, spread over 4 meals through the day.\n"
+    "- Walk 8-10k steps daily; it helps recovery and keeps the calorie deficit sustainable.\n"
+    "* Sleep at least 7 hours, otherwise hunger hormones make the diet much harder to follow.\n\n"
+    "1. Monday: upper body strength, 45 minutes, finish with 10 minutes of light cardio.\n"
+    "2. Wednesday: lower body, focus on squats and Romanian deadlifts with controlled tempo.\n"
+    "3. Friday: full body circuit plus core work.\n\n"
+    "Remember, consistency beats intensity. **You've got this!** "
+    "If anything feels off (pain, dizziness, unusual fatigue) take a rest day and check in again."
+)
+
+
+def build_payload(messages):
+    chat = []
+    for i in range(messages):
+        if i % 2 == 0:
+            chat.append({"role": "user", "content": f"Question {i}: how should I adjust my diet and training this week?"})
+        else:
+            chat.append({"role": "assistant", "content": COACH_REPLY + f" (reply {i})"})
+    return {
+        "username": "Bench User",
+        "calories": 2200,
+        "diet_plan": {"Breakfast": "Oats, milk, banana", "Lunch": "Dal, rice, salad", "Dinner": "Paneer, roti"},
+        "workout_plan": {"Day 1": ["Squats", "Push-ups"], "Day 2": ["Deadlift", "Rows"]},
+        "ai_advice": COACH_REPLY,
+        "chat_history": chat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_payload(args.messages)
+    t0 = time.perf_counter()
+    create_summary_pdf_bytes(**payload)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    timings, size = [], 0
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        size = len(create_summary_pdf_bytes(**payload))
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(f"messages={args.messages} repeat={args.repeat} pdf_bytes={size}")
+    print(f"cold render ms: {cold_ms:.1f}")
+    print(f"re-export ms: median={statistics.median(timings):.1f} min={min(timings):.1f} max={max(timings):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: auth.decode_token with and without the verified-token cache.
+
+Run from the backend folder:
+    python benchmarks/bench_token_cache.py --threads 16 --requests 20000 --tokens 500
+
+Each simulated request picks one of --tokens distinct client tokens (real
+clients resend the same token for days), so after warm-up almost every call
+is a cache hit.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+from utils.cache import TTLCache  # noqa: E402
+
+
+def run(tokens, threads, requests):
+    per_thread = requests // threads
+    latencies = []
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        local = []
+        for _ in range(per_thread):
+            token = rnd.choice(tokens)
+            t0 = time.perf_counter()
+            claims = auth.decode_token(token)
+            local.append(time.perf_counter() - t0)
+            assert claims and "user_id" in claims
+        return local
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for local in pool.map(worker, range(threads)):
+            latencies.extend(local)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=500)
+    args = parser.parse_args()
+
+    tokens = [auth.create_token(f"user-{i}") for i in range(args.tokens)]
+
+    auth.token_cache = None
+    uncached = run(tokens, args.threads, args.requests)
+
+    auth.token_cache = TTLCache(maxsize=args.tokens * 2, ttl=900)
+    cached = run(tokens, args.threads, args.requests)
+
+    print(f"{'mode':<10}{'calls':>8}{'req/s':>12}{'p50 µs':>10}{'p99 µs':>10}")
+    for name, r in (("uncached", uncached), ("cached", cached)):
+        print(f"{name:<10}{r['calls']:>8}{r['throughput']:>12.0f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}")
+    print(f"speedup: {cached['throughput'] / uncached['throughput']:.1f}x  "
+          f"(cache {auth.token_cache.stats()})")
+
+
+if __name__ == "__main__":
+    main()
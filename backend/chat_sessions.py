@@ -0,0 +1,207 @@
+# backend/chat_sessions.py
+"""
+Server-side chat sessions (collection: chat_sessions).
+
+Pehle /chat har turn par poori history body me leta tha — payload conversation
+ke saath linearly badhta tha aur har turn par poora array parse hota tha.
+Ab client ek baar session banata hai aur har turn par sirf naya message bhejta
+hai; history server par rehti hai.
+
+Session document:
+    {
+        "_id": ObjectId,                    # session_id
+        "user_id": ObjectId,
+        "messages": [{"role": "user" | "assistant", "content": str, "at": datetime}],
+        "n": int,                           # len(messages) — optimistic version
+        "bytes": int,                       # messages content ka UTF-8 size (≤ CHAT_SESSION_MAX_BYTES)
+        "history_ids": [ObjectId],          # /save-summary, /export-summary records
+        "created_at", "updated_at": datetime,
+    }
+
+Hot cache: har process me recent sessions ka messages list (TTLCache), to
+har turn par Mongo se poora document nahi aata. get() phir bhi har baar sirf
+"n" Mongo se padhta hai (chhota projection): kisi aur worker ne beech me
+append kiya ho to n match nahi hota → messages dobara load. Warna LLM ko
+purani conversation jaati.
+
+Size: Mongo document 16 MB se bada ho to DocumentTooLarge (→ 500). Isliye
+seed aur har append CHAT_SESSION_MAX_BYTES ke andar rakhe jaate hain
+(SessionTooLarge → 413).
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from config import (
+    CHAT_SESSION_CACHE_SIZE, CHAT_SESSION_CACHE_TTL_SECONDS, CHAT_SESSION_MAX_MESSAGES,
+    CHAT_SESSION_MAX_BYTES, CHAT_MAX_MESSAGE_CHARS,
+)
+from database import chat_sessions_col
+from utils.cache import TTLCache
+
+MAX_MESSAGE_CHARS = CHAT_MAX_MESSAGE_CHARS
+MAX_BYTES = CHAT_SESSION_MAX_BYTES
+
+_cache = TTLCache(maxsize=CHAT_SESSION_CACHE_SIZE, ttl=CHAT_SESSION_CACHE_TTL_SECONDS)
+
+
+class SessionFull(Exception):
+    """Session CHAT_SESSION_MAX_MESSAGES tak pahunch gaya (→ naya session banao)."""
+
+
+class SessionTooLarge(Exception):
+    """Messages CHAT_SESSION_MAX_BYTES se upar ho jaate (seed ya append)."""
+
+
+def _oid(value):
+    try:
+        return ObjectId(value)
+    except Exception:
+        return None
+
+
+def clean_messages(messages):
+    """Client se aaye seed messages → sirf user/assistant text."""
+    out = []
+    for msg in messages or []:
+        if not isinstance(msg, dict):
+            continue
+        content = msg.get("content")
+        if msg.get("role") in ("user", "assistant") and isinstance(content, str) and content.strip():
+            out.append({"role": msg["role"], "content": content[:MAX_MESSAGE_CHARS]})
+    return out[-CHAT_SESSION_MAX_MESSAGES:]
+
+
+def size_of(messages):
+    """Messages ka UTF-8 size (content) — 3-byte chars bhi sahi gine jaate hain."""
+    return sum(len(m["content"].encode("utf-8")) for m in messages)
+
+
+def _entry(doc):
+    return {
+        "user_id": str(doc["user_id"]),
+        "n": doc.get("n", len(doc["messages"])),
+        "bytes": doc["bytes"] if "bytes" in doc else size_of(doc["messages"]),
+        "messages": [{"role": m["role"], "content": m["content"]} for m in doc["messages"]],
+    }
+
+
+async def create(user_id, messages=None):
+    """
+    Naya session (optional seed: pehle ki chat, e.g. last_session se). Returns session_id.
+    Raises SessionTooLarge.
+    """
+    now = datetime.utcnow()
+    seed = [dict(m, at=now) for m in clean_messages(messages)]
+    size = size_of(seed)
+    if size > MAX_BYTES:
+        raise SessionTooLarge("Chat history is too large")
+    doc = {
+        "_id": ObjectId(),
+        "user_id": ObjectId(user_id),
+        "messages": seed,
+        "n": len(seed),
+        "bytes": size,
+        "history_ids": [],
+        "created_at": now,
+        "updated_at": now,
+    }
+    await chat_sessions_col.insert_one(doc)
+    _cache.set(str(doc["_id"]), _entry(doc))
+    return str(doc["_id"])
+
+
+async def get(session_id, user_id):
+    """
+    Owner ka session → {"user_id", "n", "messages"} (cache se ho sakta hai —
+    modify mat karo). Galat / kisi aur ka id → None.
+    """
+    oid = _oid(session_id)
+    if oid is None:
+        return None
+
+    entry = _cache.get(str(session_id))
+    if entry is not None:
+        if entry["user_id"] != str(user_id):
+            return None
+        # Sirf version check — dusre worker ka append yahan pakda jaata hai
+        current = await chat_sessions_col.find_one({"_id": oid}, {"n": 1})
+        if current is None:
+            _cache.pop(str(session_id))
+            return None
+        if current.get("n") == entry["n"]:
+            return entry
+        _cache.pop(str(session_id))
+
+    doc = await chat_sessions_col.find_one({"_id": oid}, {"user_id": 1, "messages": 1, "n": 1, "bytes": 1})
+    if doc is None:
+        return None
+    entry = _entry(doc)
+    _cache.set(str(session_id), entry)
+
+    if entry["user_id"] != str(user_id):
+        return None
+    return entry
+
+
+async def append(session_id, user_id, messages):
+    """
+    Turn ke messages (user + assistant) ek hi update me. Returns naya n.
+    Raises SessionFull / SessionTooLarge. Session gayab ho (TTL) → None.
+    """
+    now = datetime.utcnow()
+    new = [{"role": m["role"], "content": m["content"], "at": now} for m in messages]
+    size = size_of(new)
+    doc = await chat_sessions_col.find_one_and_update(
+        {
+            "_id": ObjectId(session_id),
+            "user_id": ObjectId(user_id),
+            "n": {"$lte": CHAT_SESSION_MAX_MESSAGES - len(new)},
+            # "bytes" ke bina purane sessions: unka size pehli baar yahan nahi pata
+            "$or": [{"bytes": {"$lte": MAX_BYTES - size}}, {"bytes": {"$exists": False}}],
+        },
+        {
+            "$push": {"messages": {"$each": new}},
+            "$inc": {"n": len(new), "bytes": size},
+            "$set": {"updated_at": now},
+        },
+        projection={"n": 1, "bytes": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        _cache.pop(str(session_id))
+        current = await chat_sessions_col.find_one(
+            {"_id": ObjectId(session_id), "user_id": ObjectId(user_id)}, {"n": 1}
+        )
+        if current is None:
+            return None
+        if current.get("n", 0) + len(new) > CHAT_SESSION_MAX_MESSAGES:
+            raise SessionFull("Chat session is full, start a new one")
+        raise SessionTooLarge("Chat session is too large, start a new one")
+
+    entry = _cache.get(str(session_id))
+    if entry is not None and entry["n"] + len(new) == doc["n"]:
+        # Cache list copy-on-write: jo request purani list padh rahi hai usko farq nahi
+        _cache.set(str(session_id), {
+            "user_id": entry["user_id"],
+            "n": doc["n"],
+            "bytes": doc["bytes"],
+            "messages": entry["messages"] + [{"role": m["role"], "content": m["content"]} for m in new],
+        })
+    else:
+        _cache.pop(str(session_id))
+    return doc["n"]
+
+
+async def link_history(session_id, user_id, history_id):
+    """Saved history record ↔ session (dono taraf se dhoondh sako)."""
+    await chat_sessions_col.update_one(
+        {"_id": ObjectId(session_id), "user_id": ObjectId(user_id)},
+        {"$addToSet": {"history_ids": history_id}},
+    )
+
+
+def metrics():
+    return _cache.stats()
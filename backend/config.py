@@ -1,2 +1,96 @@
 import os
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Nutrition table (CSV / SQLite / Parquet)
+NUTRITION_DB_PATH = os.getenv(
+    "NUTRITION_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "foods.csv"),
+)
+NUTRITION_RELOAD_SECONDS = float(os.getenv("NUTRITION_RELOAD_SECONDS", "30"))
+# Startup par table load + regex compile (thread me) — pehli /calories request slow na ho
+NUTRITION_WARMUP_ON_STARTUP = os.getenv("NUTRITION_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Authenticated user cache (get_current_user)
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+# Verified JWT cache (auth.decode_token)
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "50000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "900"))
+
+# Password hashing (bcrypt) pool
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", "4"))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "64"))
+
+# MongoDB index bootstrap (indexes.py)
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Background PDF export jobs (pdf_jobs.py)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_MAX_PENDING = int(os.getenv("PDF_MAX_PENDING", "16"))
+PDF_MAX_PENDING_PER_USER = int(os.getenv("PDF_MAX_PENDING_PER_USER", "2"))
+PDF_JOB_TTL_SECONDS = int(os.getenv("PDF_JOB_TTL_SECONDS", str(24 * 3600)))
+# /export-summary default delivery: "job" (exports/ + /static) ya "stream"
+# (memory me render, seedha response me — shared exports/ ki zarurat nahi)
+PDF_DELIVERY = os.getenv("PDF_DELIVERY", "job").lower()
+
+# exports/ directory (PDFs served via /static) — eviction limits
+EXPORTS_DIR = os.getenv("EXPORTS_DIR", "exports")
+EXPORTS_MAX_BYTES = int(os.getenv("EXPORTS_MAX_BYTES", str(512 * 1024 * 1024)))
+EXPORTS_MAX_AGE_SECONDS = int(os.getenv("EXPORTS_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+EXPORTS_EVICT_INTERVAL_SECONDS = float(os.getenv("EXPORTS_EVICT_INTERVAL_SECONDS", "300"))
+
+# PDF fonts (utils/font_registry.py). Relative paths → backend/ folder se.
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH", "utils/fonts/NotoSans-Regular.ttf")
+PDF_BOLD_FONT_PATH = os.getenv("PDF_BOLD_FONT_PATH", "utils/fonts/NotoSans-Bold.ttf")
+PDF_WARMUP_ON_STARTUP = os.getenv("PDF_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# LLM provider (utils/llm_client.py) — OpenAI-compatible chat completions API.
+# Local stub: LLM_BASE_URL=http://127.0.0.1:9100/v1 (llm_stub_server.py)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+LLM_API_KEY = os.getenv("LLM_API_KEY") or GROQ_API_KEY
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+
+# AI recommendation cache (utils/rec_cache.py): "memory" | "sqlite" | "redis" | "off"
+# sqlite / redis saare workers me share hote hain; redis package optional hai.
+REC_CACHE_BACKEND = os.getenv("REC_CACHE_BACKEND", "memory").lower()
+REC_CACHE_TTL_SECONDS = float(os.getenv("REC_CACHE_TTL_SECONDS", "86400"))
+REC_CACHE_SIZE = int(os.getenv("REC_CACHE_SIZE", "5000"))
+REC_CACHE_SQLITE_PATH = os.getenv(
+    "REC_CACHE_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "rec_cache.sqlite3"),
+)
+REC_CACHE_REDIS_URL = os.getenv("REC_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Chat coach memory (utils/chat_memory.py): history ka token budget, baaki
+# purane turns rolling summary me (CHUNK turns ek saath girte hain)
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "200"))
+CHAT_SUMMARY_CHUNK_TURNS = int(os.getenv("CHAT_SUMMARY_CHUNK_TURNS", "4"))
+CHAT_SUMMARY_CACHE_SIZE = int(os.getenv("CHAT_SUMMARY_CACHE_SIZE", "10000"))
+CHAT_SUMMARY_TTL_SECONDS = float(os.getenv("CHAT_SUMMARY_TTL_SECONDS", "21600"))
+# /chat request limits (upar → 413): ek message, poori history (chars + count)
+CHAT_MAX_MESSAGE_CHARS = int(os.getenv("CHAT_MAX_MESSAGE_CHARS", "8000"))
+CHAT_MAX_HISTORY_CHARS = int(os.getenv("CHAT_MAX_HISTORY_CHARS", "100000"))
+CHAT_MAX_HISTORY_MESSAGES = int(os.getenv("CHAT_MAX_HISTORY_MESSAGES", "200"))
+
+# Server-side chat sessions (chat_sessions.py)
+CHAT_SESSION_CACHE_SIZE = int(os.getenv("CHAT_SESSION_CACHE_SIZE", "2000"))
+CHAT_SESSION_CACHE_TTL_SECONDS = float(os.getenv("CHAT_SESSION_CACHE_TTL_SECONDS", "600"))
+CHAT_SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "1000"))
+# Session ke saare messages ka UTF-8 size (Mongo document limit 16 MB; upar → 413)
+CHAT_SESSION_MAX_BYTES = int(os.getenv("CHAT_SESSION_MAX_BYTES", str(4 * 1024 * 1024)))
+# Itne time se untouched sessions Mongo TTL index se delete
+CHAT_SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# user_rollups.daily map kitne din rakhna hai (weekly / monthly hamesha)
+ROLLUP_DAILY_RETENTION_DAYS = int(os.getenv("ROLLUP_DAILY_RETENTION_DAYS", "90"))
@@ -2,7 +2,7 @@
 
 import os
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 
 # Load environment variables
 load_dotenv()
@@ -10,19 +10,136 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("MONGODB_DB_NAME", "fitness_app")
 
-if not MONGO_URI:
-    raise Exception("❌ MONGODB_URI missing in .env file")
+# Pool / timeout / read preference (env se tune karo)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "10000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
 
-# MongoDB client
-client = MongoClient(MONGO_URI)
+# "mongomock://" → in-memory stand-in (tests / benchmarks, no server needed)
+MOCK_URI_PREFIX = "mongomock://"
 
-# Select database
-db = client[DB_NAME]
+# ---------------------------------------------------
+# LAZY, PER-PROCESS CLIENT
+# ---------------------------------------------------
+# Import par ab koi connection nahi banta. Client pehli baar use hone par
+# (ya FastAPI startup par connect() se) banta hai, aur process ki PID ke saath
+# yaad rakha jata hai — gunicorn fork ke baad child process apna naya client
+# banata hai, parent ka socket pool share nahi hota.
+_client = None
+_client_pid = None
+_collections = {}
+_server_version = None      # (major, minor) — connect() ke ping ke baad
 
-# Collections
-users_col = db["users"]
-progress_col = db["daily_progress"]
-history_col = db["history"]
-daily_logs_col = db["daily_logs"]
 
-print("✅ MongoDB connected successfully!")
+def _create_client():
+    if not MONGO_URI:
+        raise RuntimeError("❌ MONGODB_URI missing in .env file")
+
+    if MONGO_URI.startswith(MOCK_URI_PREFIX):
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+
+    # MongoDB async client (Motor) — endpoints "await" karte hain,
+    # koi threadpool worker Mongo ke liye block nahi hota
+    return AsyncIOMotorClient(
+        MONGO_URI,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        readPreference=MONGO_READ_PREFERENCE,
+    )
+
+
+def use_client(client):
+    """Tests / benchmarks ke liye koi bhi (e.g. mongomock) client inject karo."""
+    global _client, _client_pid
+    _client = client
+    _client_pid = os.getpid()
+    _collections.clear()
+
+
+def get_client():
+    if _client is None or _client_pid != os.getpid():
+        use_client(_create_client())
+    return _client
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+def get_collection(name):
+    if _client is None or _client_pid != os.getpid():
+        get_client()
+    col = _collections.get(name)
+    if col is None:
+        col = _collections[name] = get_db()[name]
+    return col
+
+
+async def connect():
+    """FastAPI startup: is process ka client banao aur ek ping se pool warm karo."""
+    global _server_version
+    client = get_client()
+    if MONGO_URI.startswith(MOCK_URI_PREFIX):
+        print("✅ Using in-memory MongoDB (mongomock)")
+        return
+
+    try:
+        await client.admin.command("ping")
+        info = await client.admin.command("buildInfo")
+        _server_version = tuple(info.get("versionArray", [0, 0])[:2])
+        print(f"✅ MongoDB connected successfully! (server {info.get('version')})")
+    except Exception as e:
+        # Startup mat roko — driver har request par dobara try karega
+        print(f"⚠️ MongoDB ping failed: {e}")
+
+
+def server_version():
+    """(major, minor) ya None (mongomock / ping fail hua)."""
+    return _server_version
+
+
+def close():
+    """FastAPI shutdown: sockets band karo."""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+    _client_pid = None
+    _collections.clear()
+
+
+# ---------------------------------------------------
+# COLLECTIONS
+# ---------------------------------------------------
+class _LazyCollection:
+    """
+    Module-level handle jo har attribute access par current process ka
+    collection resolve karta hai — `users_col.find_one(...)` jaise call
+    sites waise hi chalte hain.
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self._name), attr)
+
+    def __repr__(self):
+        return f"<LazyCollection {DB_NAME}.{self._name}>"
+
+
+users_col = _LazyCollection("users")
+progress_col = _LazyCollection("daily_progress")
+history_col = _LazyCollection("history")
+daily_logs_col = _LazyCollection("daily_logs")
+rollups_col = _LazyCollection("user_rollups")
+last_sessions_col = _LazyCollection("last_sessions")
+export_jobs_col = _LazyCollection("export_jobs")
+chat_sessions_col = _LazyCollection("chat_sessions")
@@ -0,0 +1,108 @@
+# backend/indexes.py
+"""
+Index management.
+
+api.py ki queries in fields par filter/sort karti hain:
+- users.email                      (/auth/register, /auth/login)
+- daily_logs.(user_id, date)       (/calories, /auth/me, /history/weekly)
+- history.(user_id, date desc, _id desc)  (/history/list keyset pages)
+- export_jobs.created_at           (TTL: purane PDF job records khud delete)
+- chat_sessions.updated_at         (TTL: untouched chat sessions khud delete)
+
+Bina index ke ye sab collection scans hain. ensure_indexes() startup par
+chalta hai aur idempotent hai (jo index pehle se hai use dobara nahi banata).
+
+CLI:
+    python indexes.py           # missing indexes banao
+    python indexes.py --check   # sirf report karo
+"""
+
+import asyncio
+import sys
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from config import PDF_JOB_TTL_SECONDS, CHAT_SESSION_TTL_SECONDS
+from database import get_db
+
+REQUIRED_INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "daily_logs": [
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], name="user_date_unique", unique=True),
+    ],
+    "history": [
+        IndexModel(
+            [("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+            name="user_date_id_desc",
+        ),
+    ],
+    "export_jobs": [
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=PDF_JOB_TTL_SECONDS),
+    ],
+    "chat_sessions": [
+        IndexModel([("updated_at", ASCENDING)], name="updated_at_ttl", expireAfterSeconds=CHAT_SESSION_TTL_SECONDS),
+    ],
+}
+
+
+def _signature(key, unique):
+    return tuple((field, int(direction)) for field, direction in key), bool(unique)
+
+
+async def missing_indexes(db=None):
+    """Returns [(collection, IndexModel)] for every required index not present.
+    Naam se nahi, key spec + unique se match hota hai."""
+    db = db if db is not None else get_db()
+    missing = []
+
+    for col_name, models in REQUIRED_INDEXES.items():
+        existing = await db[col_name].index_information()
+        have = {_signature(info["key"], info.get("unique")) for info in existing.values()}
+
+        for model in models:
+            doc = model.document
+            if _signature(doc["key"].items(), doc.get("unique")) not in have:
+                missing.append((col_name, model))
+
+    return missing
+
+
+async def ensure_indexes(db=None):
+    """Creates missing indexes. Returns {"created": [...], "failed": [...]}."""
+    db = db if db is not None else get_db()
+    report = {"created": [], "failed": []}
+
+    for col_name, model in await missing_indexes(db):
+        label = f"{col_name}.{model.document['name']}"
+        try:
+            await db[col_name].create_indexes([model])
+            report["created"].append(label)
+        except OperationFailure as e:
+            # e.g. unique index par purane duplicate documents
+            report["failed"].append({"index": label, "error": str(e)})
+
+    return report
+
+
+def describe(missing):
+    return [f"{col}.{model.document['name']}" for col, model in missing]
+
+
+async def _main(check_only):
+    if check_only:
+        missing = describe(await missing_indexes())
+        print("Missing indexes:", missing or "none")
+        return 1 if missing else 0
+
+    report = await ensure_indexes()
+    print("Created:", report["created"] or "none")
+    for fail in report["failed"]:
+        print(f"❌ {fail['index']}: {fail['error']}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main("--check" in sys.argv)))
@@ -0,0 +1,98 @@
+# backend/llm_stub_server.py
+"""
+Local stand-in for the LLM provider (OpenAI-compatible /chat/completions).
+Network / API key ke bina /chat aur /recommendation test karne ke liye.
+
+    python llm_stub_server.py --port 9100 --latency 0.8 --fail-rate 0.2
+    LLM_BASE_URL=http://127.0.0.1:9100/v1 LLM_API_KEY=stub uvicorn api:app
+
+"stream": true ho to reply SSE chunks me (--token-delay har word ke beech).
+--fail-rate ke hisaab se random 503 / 429 (Retry-After ke saath) deta hai,
+to retry / backoff path bhi exercise hota hai. GET /stats = request counts.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SETTINGS = {"latency": 0.5, "jitter": 0.2, "fail_rate": 0.0, "token_delay": 0.02}
+STATS = {"requests": 0, "failed": 0, "in_flight": 0, "max_in_flight": 0}
+
+app = FastAPI()
+
+
+def _reply_text(messages):
+    last = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    return (
+        "### 🥗 Diet Advice\n- Stub reply: eat more protein.\n\n"
+        "### 🏋️ Workout Suggestion\n- Walk 30 minutes.\n\n"
+        f"### 💡 Motivation\n- You said: {str(last)[:80]}"
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    STATS["requests"] += 1
+    STATS["in_flight"] += 1
+    STATS["max_in_flight"] = max(STATS["max_in_flight"], STATS["in_flight"])
+    try:
+        await asyncio.sleep(max(0.0, SETTINGS["latency"] + random.uniform(-1, 1) * SETTINGS["jitter"]))
+
+        if random.random() < SETTINGS["fail_rate"]:
+            STATS["failed"] += 1
+            if random.random() < 0.5:
+                return JSONResponse({"error": {"message": "rate limited"}}, status_code=429, headers={"Retry-After": "0.2"})
+            return JSONResponse({"error": {"message": "overloaded"}}, status_code=503)
+
+        text = _reply_text(body.get("messages") or [])
+        if body.get("stream"):
+            return StreamingResponse(_stream_chunks(text, body.get("model", "stub")), media_type="text/event-stream")
+        return {
+            "id": f"stub-{STATS['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+    finally:
+        STATS["in_flight"] -= 1
+
+
+async def _stream_chunks(text, model):
+    """OpenAI-style SSE: har word ek chunk, beech me --token-delay."""
+    STATS["streams"] = STATS.get("streams", 0) + 1
+    for i, word in enumerate(text.split(" ")):
+        piece = word if i == 0 else " " + word
+        chunk = {"object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(SETTINGS["token_delay"])
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/stats")
+def stats():
+    return STATS
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stub LLM provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=SETTINGS["latency"])
+    parser.add_argument("--jitter", type=float, default=SETTINGS["jitter"])
+    parser.add_argument("--fail-rate", type=float, default=SETTINGS["fail_rate"])
+    parser.add_argument("--token-delay", type=float, default=SETTINGS["token_delay"])
+    args = parser.parse_args()
+
+    SETTINGS.update(latency=args.latency, jitter=args.jitter, fail_rate=args.fail_rate, token_delay=args.token_delay)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,65 @@
+# backend/migrate_last_session.py
+"""
+One-time migration: users.last_session → last_sessions collection.
+
+    python migrate_last_session.py            # migrate + users se field hatao
+    python migrate_last_session.py --dry-run  # sirf count batao
+
+Agar user ka last_sessions document pehle se hai (naya save ho chuka hai) to
+use overwrite nahi karte — sirf users se purana blob $unset hota hai.
+Dobara chalana safe hai.
+"""
+
+import argparse
+import asyncio
+
+import database
+from database import users_col, last_sessions_col
+
+FIELDS = ("calories", "diet_plan", "workout_plan", "ai_advice", "chat_history", "saved_at")
+
+
+async def migrate(dry_run=False, batch_size=200):
+    cursor = users_col.find(
+        {"last_session": {"$exists": True}},
+        {"last_session": 1},
+    ).batch_size(batch_size)
+
+    moved = 0
+    async for user in cursor:
+        moved += 1
+        if dry_run:
+            continue
+
+        old = user.get("last_session") or {}
+        session = {k: old[k] for k in FIELDS if k in old}
+        if "saved_at" not in session and "date" in old:
+            session["saved_at"] = old["date"]
+
+        if session:
+            await last_sessions_col.update_one(
+                {"_id": user["_id"]},
+                {"$setOnInsert": session},
+                upsert=True,
+            )
+        await users_col.update_one({"_id": user["_id"]}, {"$unset": {"last_session": ""}})
+
+    return moved
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Move users.last_session into last_sessions")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        count = await migrate(dry_run=args.dry_run)
+        action = "would migrate" if args.dry_run else "migrated"
+        print(f"✅ {action} {count} user(s)")
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,381 @@
+# backend/pdf_jobs.py
+"""
+Background PDF rendering for /export-summary.
+
+reportlab rendering CPU-bound hai (lambi chat history = sau-do-sau ms), to
+request ke andar nahi chalti. Endpoint job enqueue karke turant job_id
+lautata hai; render ek alag process pool me hota hai aur status
+export_jobs collection me rehta hai — isliye GET /exports/{job_id} kisi bhi
+worker process se answer ho sakta hai.
+
+Job document:
+    {
+        "_id": ObjectId,            # job_id
+        "user_id": ObjectId,
+        "history_id": ObjectId,
+        "status": "queued" | "done" | "failed",
+        "filename": str,            # exports/ ke andar (content hash)
+        "error": str | None,
+        "created_at", "finished_at": datetime,
+    }
+
+Same inputs ka PDF pehle se exports/ me ho to job turant "done" (cache hit,
+koi render nahi); same file abhi ban rahi ho to naya job usi render ka wait
+karta hai. exports/ periodically evict hota hai (size + age limit).
+
+Stream mode (render_bytes): wahi pool aur limits, par PDF memory me banta hai
+aur bytes seedha response me jaate hain — na disk, na job document.
+
+Worker mar jaye (OOM kill, reportlab segfault) to pool "broken" ho jata hai:
+us waqt chal rahe jobs "failed" hote hain, aur pool band karke naya banta
+hai — agli export normal chalti hai (API restart ki zarurat nahi).
+
+Backpressure: har process me PDF_MAX_PENDING se zyada (aur ek user ke
+PDF_MAX_PENDING_PER_USER se zyada) jobs in-flight nahi — burst me API
+ko CPU ke liye starve nahi hone dete.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from bson import ObjectId
+
+from config import (
+    PDF_WORKERS, PDF_MAX_PENDING, PDF_MAX_PENDING_PER_USER,
+    EXPORTS_DIR, EXPORTS_MAX_BYTES, EXPORTS_MAX_AGE_SECONDS, EXPORTS_EVICT_INTERVAL_SECONDS,
+)
+from database import export_jobs_col
+from utils.exporter import create_summary_pdf, create_summary_pdf_bytes
+from utils import pdf_cache, font_registry
+
+
+class ExportQueueFull(Exception):
+    """Process ki saari PDF slots busy hain (→ 503)."""
+
+
+class TooManyUserExports(Exception):
+    """Is user ke pehle se kaafi exports chal rahe hain (→ 429)."""
+
+
+# ---------------------------------------------------
+# PROCESS POOL (lazy, per-PID)
+# ---------------------------------------------------
+# "spawn" context: server process me threads (Motor, bcrypt pool) hote hain,
+# unke saath fork karna safe nahi.
+_pool = None
+_pool_pid = None
+_lock = threading.Lock()
+_stats = {
+    "pending": 0, "completed": 0, "failed": 0, "rejected": 0,
+    "cache_hits": 0, "deduped": 0, "evicted_files": 0, "streamed": 0,
+    "pool_restarts": 0,
+}
+_per_user = {}
+_render_ms = deque(maxlen=500)
+_tasks = set()
+_inflight = {}      # filename → render future (same content, ek hi render)
+_worker_fonts = None
+_last_evict = 0.0
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def _discard_pool(pool):
+    """Broken pool hatao; agla _get_pool() naya banata hai. Identity check —
+    kisi aur request ne pehle hi naya pool bana diya ho to use mat chhedo."""
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is pool:
+            _pool = None
+            _pool_pid = None
+            _stats["pool_restarts"] += 1
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _check_broken(future, pool):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        print("⚠️ PDF worker died — restarting the process pool")
+        _discard_pool(pool)
+
+
+def _submit(fn, *args):
+    """
+    Pool me fn chalao → asyncio future. Pool pehle se broken ho to submit hi
+    fail hota hai → naya pool, ek baar phir try. Chalte hue worker mare to
+    future BrokenProcessPool deta hai aur pool discard (agli call naya pool).
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        future = loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        pool = _get_pool()
+        future = loop.run_in_executor(pool, fn, *args)
+    future.add_done_callback(lambda f, pool=pool: _check_broken(f, pool))
+    return future
+
+
+def _init_worker():
+    """Har pool worker start hote hi fonts load + warm-up render (pehli export fast)."""
+    try:
+        font_registry.warm_up()
+    except Exception as e:
+        # Warm-up fail ho to bhi worker chale — asli render lazy load kar lega
+        print(f"⚠️ PDF worker warm-up failed: {e}")
+
+
+def _worker_info():
+    return font_registry.font_info()
+
+
+async def warm_up():
+    """
+    Startup par saare workers abhi spawn karwao (initializer unhe warm karta
+    hai), taaki pehli export ko process spawn + TTF parse ka wait na ho.
+    """
+    global _worker_fonts
+    infos = await asyncio.gather(*[_submit(_worker_info) for _ in range(PDF_WORKERS)])
+    _worker_fonts = infos[0] if infos else None
+    return _worker_fonts
+
+
+def start_warm_up():
+    """Background me warm_up() — startup block nahi hota."""
+    async def _run():
+        try:
+            info = await warm_up()
+            print(f"✅ PDF workers ready (font: {info.get('regular')})")
+        except Exception as e:
+            print(f"⚠️ PDF warm-up skipped: {e}")
+
+    task = asyncio.create_task(_run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def shutdown():
+    """FastAPI shutdown: chal rahe renders khatam hone do, naye nahi."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
+    _pool_pid = None
+
+
+def _render(filename, kwargs):
+    """Child process me chalta hai. Returns render_ms."""
+    started = time.perf_counter()
+    create_summary_pdf(**kwargs, filename=filename)
+    return (time.perf_counter() - started) * 1000
+
+
+def _render_bytes(kwargs):
+    """Child process me chalta hai. Returns (pdf_bytes, render_ms)."""
+    started = time.perf_counter()
+    data = create_summary_pdf_bytes(**kwargs)
+    return data, (time.perf_counter() - started) * 1000
+
+
+# ---------------------------------------------------
+# exports/ EVICTION
+# ---------------------------------------------------
+def evict_exports():
+    report = pdf_cache.evict(EXPORTS_DIR, EXPORTS_MAX_BYTES, EXPORTS_MAX_AGE_SECONDS)
+    with _lock:
+        _stats["evicted_files"] += report["removed"]
+    return report
+
+
+async def _maybe_evict():
+    global _last_evict
+    now = time.monotonic()
+    if now - _last_evict < EXPORTS_EVICT_INTERVAL_SECONDS:
+        return
+    _last_evict = now
+    # Directory scan / unlink blocking IO hai → default threadpool
+    await asyncio.get_running_loop().run_in_executor(None, evict_exports)
+
+
+# ---------------------------------------------------
+# SUBMIT + RUN
+# ---------------------------------------------------
+def _reserve(user_key):
+    with _lock:
+        if _stats["pending"] >= PDF_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise ExportQueueFull("PDF export queue is full")
+        if _per_user.get(user_key, 0) >= PDF_MAX_PENDING_PER_USER:
+            _stats["rejected"] += 1
+            raise TooManyUserExports("Too many exports in progress for this user")
+        _stats["pending"] += 1
+        _per_user[user_key] = _per_user.get(user_key, 0) + 1
+
+
+def _release(user_key):
+    with _lock:
+        _stats["pending"] -= 1
+        left = _per_user.get(user_key, 1) - 1
+        if left > 0:
+            _per_user[user_key] = left
+        else:
+            _per_user.pop(user_key, None)
+
+
+async def _set_status(job_id, status, **fields):
+    fields["status"] = status
+    await export_jobs_col.update_one({"_id": job_id}, {"$set": fields})
+
+
+async def _run(job_id, user_key, filename, kwargs):
+    future = None
+    try:
+        future = _inflight.get(filename)
+        if future is None:
+            future = _submit(_render, filename, kwargs)
+            _inflight[filename] = future
+            future.add_done_callback(lambda _, name=filename: _inflight.pop(name, None))
+            owner = True
+        else:
+            owner = False
+            with _lock:
+                _stats["deduped"] += 1
+
+        render_ms = await asyncio.shield(future)
+        with _lock:
+            _stats["completed"] += 1
+            if owner:
+                _render_ms.append(render_ms)
+        await _set_status(job_id, "done", finished_at=datetime.utcnow())
+        if owner:
+            await _maybe_evict()
+    except Exception as e:
+        with _lock:
+            _stats["failed"] += 1
+        if isinstance(e, BrokenProcessPool):
+            # Done callback ne pool discard kar diya; entry bhi pakka hatao
+            # taaki same file ka agla job naya render kare
+            if _inflight.get(filename) is future:
+                _inflight.pop(filename, None)
+            e = "PDF worker crashed, please retry"
+        print(f"⚠️ PDF job {job_id} failed: {e}")
+        await _set_status(job_id, "failed", error=str(e), finished_at=datetime.utcnow())
+    finally:
+        _release(user_key)
+
+
+async def submit(user_id, history_id, **kwargs):
+    """
+    kwargs = create_summary_pdf ke arguments (username, calories, ...).
+    Returns (job_id, status). Raises ExportQueueFull / TooManyUserExports.
+    """
+    filename = pdf_cache.filename_for(kwargs["username"], pdf_cache.cache_key(**kwargs))
+    job = {
+        "_id": ObjectId(),
+        "user_id": ObjectId(user_id),
+        "history_id": history_id,
+        "status": "queued",
+        "filename": filename,
+        "error": None,
+        "created_at": datetime.utcnow(),
+    }
+
+    # Cache hit → render hi nahi, queue slot bhi nahi
+    if filename not in _inflight and pdf_cache.lookup(EXPORTS_DIR, filename):
+        with _lock:
+            _stats["cache_hits"] += 1
+        job.update(status="done", finished_at=job["created_at"], cached=True)
+        await export_jobs_col.insert_one(job)
+        return str(job["_id"]), "done"
+
+    user_key = str(user_id)
+    _reserve(user_key)
+
+    try:
+        await export_jobs_col.insert_one(job)
+    except Exception:
+        _release(user_key)
+        raise
+    job_id = job["_id"]
+
+    # Task ka reference rakhna zaroori hai, warna GC beech me hi utha leta hai
+    task = asyncio.create_task(_run(job_id, user_key, filename, kwargs))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return str(job_id), "queued"
+
+
+async def render_bytes(user_id, **kwargs):
+    """
+    Stream mode: PDF bytes lautata hai (disk / job document nahi).
+    Same backpressure: ExportQueueFull / TooManyUserExports.
+    """
+    user_key = str(user_id)
+    _reserve(user_key)
+    try:
+        try:
+            data, render_ms = await _submit(_render_bytes, kwargs)
+        except BrokenProcessPool:
+            # Stream mode me user wait kar raha hai — fresh pool par ek baar aur
+            data, render_ms = await _submit(_render_bytes, kwargs)
+        with _lock:
+            _stats["completed"] += 1
+            _stats["streamed"] += 1
+            _render_ms.append(render_ms)
+        return data
+    except Exception:
+        with _lock:
+            _stats["failed"] += 1
+        raise
+    finally:
+        _release(user_key)
+
+
+async def get_job(job_id, user_id):
+    """Sirf owner ko dikhta hai; galat / kisi aur ka id → None."""
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        return None
+    return await export_jobs_col.find_one({"_id": oid, "user_id": ObjectId(user_id)})
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+
+def metrics():
+    with _lock:
+        stats = dict(_stats)
+        samples = list(_render_ms)
+    stats.update({
+        "workers": PDF_WORKERS,
+        "max_pending": PDF_MAX_PENDING,
+        "max_pending_per_user": PDF_MAX_PENDING_PER_USER,
+        "inflight_renders": len(_inflight),
+        "worker_fonts": _worker_fonts,
+        "queue_depth": max(0, stats["pending"] - PDF_WORKERS),
+        "render_ms_p50": _percentile(samples, 0.5),
+        "render_ms_p95": _percentile(samples, 0.95),
+    })
+    return stats
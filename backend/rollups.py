@@ -0,0 +1,222 @@
+# backend/rollups.py
+"""
+Materialized per-user calorie rollups (collection: user_rollups).
+
+Ek user = ek document:
+    {
+        "_id": user_id,
+        "daily":   {"2026-10-18": {"calories", "protein", "carbs", "fat", "meals"}},
+        "weekly":  {"2026-W42":   {...same fields...}},
+        "monthly": {"2026-10":    {...same fields...}},
+        "daily_oldest": "2026-07-20",       # sabse purani daily key (prune ke liye)
+        "backfilled": True,                 # daily_logs se poora bana hai
+        "rev": int,                         # har write par +1 (rebuild ka optimistic check)
+        "updated_at": datetime,
+    }
+
+/calories aur /calories/batch daily_logs ke $inc ke saath hi yahan bhi $inc
+karte hain, to dashboard reads (e.g. /history/weekly) ek single-document
+lookup ban jaate hain — daily_logs scan nahi.
+
+"daily" map sirf ROLLUP_DAILY_RETENTION_DAYS tak rakha jata hai (weekly /
+monthly hamesha); write par daily_oldest cutoff se purana ho to purani keys
+hat jaati hain — document bina limit ke nahi badhta.
+
+Purane users (rollups se pehle ka data): read par load() dekhta hai ki doc
+"backfilled" nahi hai → us user ka rollup daily_logs se wahin ban jata hai.
+Rebuild doc tabhi replace karta hai jab "rev" uske padhne ke baad se nahi
+badla — beech me /calories ka $inc aaya ho to daily_logs dobara padh kar
+retry, warna wo $inc replace me kho jaata (aur backfilled doc dobara kabhi
+rebuild nahi hota).
+Sab users ek saath backfill karne ke liye:
+    python rollups.py rebuild                 # saare users
+    python rollups.py rebuild --user <id>     # ek user
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import database
+from config import ROLLUP_DAILY_RETENTION_DAYS
+from database import daily_logs_col, rollups_col
+
+FIELDS = ("calories", "protein", "carbs", "fat", "meals")
+REBUILD_ATTEMPTS = 5
+
+
+def period_keys(day):
+    """"YYYY-MM-DD" → (daily key, ISO week key, month key)"""
+    d = date.fromisoformat(day) if isinstance(day, str) else day
+    iso_year, iso_week, _ = d.isocalendar()
+    return str(d), f"{iso_year}-W{iso_week:02d}", f"{d.year}-{d.month:02d}"
+
+
+def rollup_increments(per_day):
+    """
+    per_day: {"YYYY-MM-DD": {"calories": .., "protein": .., "carbs": .., "fat": .., "meals": ..}}
+    Returns a single $inc dict covering daily / weekly / monthly buckets.
+    """
+    inc = {}
+    for day, values in per_day.items():
+        for scope, key in zip(("daily", "weekly", "monthly"), period_keys(day)):
+            for field in FIELDS:
+                value = values.get(field, 0)
+                if value:
+                    path = f"{scope}.{key}.{field}"
+                    inc[path] = inc.get(path, 0) + value
+    return inc
+
+
+def daily_cutoff(today=None):
+    """Is se purani daily keys nahi rakhte ("YYYY-MM-DD", string compare)."""
+    return str((today or date.today()) - timedelta(days=ROLLUP_DAILY_RETENTION_DAYS))
+
+
+async def apply_rollup(user_id, per_day):
+    inc = rollup_increments(per_day)
+    if not inc:
+        return
+    inc["rev"] = 1
+    oldest = min(str(period_keys(day)[0]) for day in per_day)
+    doc = await rollups_col.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}, "$min": {"daily_oldest": oldest}},
+        upsert=True,
+        projection={"daily_oldest": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc and doc.get("daily_oldest", oldest) < daily_cutoff():
+        await prune_daily(user_id)
+
+
+async def prune_daily(user_id, cutoff=None):
+    """Retention se purani daily keys $unset; daily_oldest aage badhao."""
+    cutoff = cutoff or daily_cutoff()
+    oid = ObjectId(user_id)
+    doc = await rollups_col.find_one({"_id": oid}, {"daily": 1}) or {}
+    keys = sorted(doc.get("daily", {}))
+    old = [k for k in keys if k < cutoff]
+    keep = [k for k in keys if k >= cutoff]
+
+    update = {"$set": {"daily_oldest": keep[0]}} if keep else {"$unset": {"daily_oldest": ""}}
+    if old:
+        update.setdefault("$unset", {}).update({f"daily.{k}": "" for k in old})
+    await rollups_col.update_one({"_id": oid}, update)
+    return len(old)
+
+
+async def load(user_id, projection):
+    """
+    Read paths ke liye: rollup doc (sirf projection fields). Doc na ho ya
+    daily_logs se backfill na hua ho (rollups se pehle ke users) → abhi
+    rebuild(user_id), phir padho. Har user ke liye ek hi baar hota hai.
+    """
+    oid = ObjectId(user_id)
+    projection = dict(projection, backfilled=1)
+    doc = await rollups_col.find_one({"_id": oid}, projection)
+    if doc is None or not doc.get("backfilled"):
+        await rebuild(user_id)
+        doc = await rollups_col.find_one({"_id": oid}, projection)
+    return doc or {}
+
+
+# ---------------------------------------------------
+# BACKFILL / REBUILD FROM daily_logs
+# ---------------------------------------------------
+def _log_values(log):
+    return {
+        "calories": log.get("total_calories", 0) or 0,
+        "protein": log.get("total_protein", 0) or 0,
+        "carbs": log.get("total_carbs", 0) or 0,
+        "fat": log.get("total_fat", 0) or 0,
+        "meals": len(log.get("food_items") or []),
+    }
+
+
+def _build_doc(user_id, logs_by_day):
+    doc = {
+        "_id": user_id, "daily": {}, "weekly": {}, "monthly": {},
+        "backfilled": True, "updated_at": datetime.utcnow(),
+    }
+    cutoff = daily_cutoff()
+    for day, values in logs_by_day.items():
+        for scope, key in zip(("daily", "weekly", "monthly"), period_keys(day)):
+            if scope == "daily" and key < cutoff:
+                continue
+            bucket = doc[scope].setdefault(key, {f: 0 for f in FIELDS})
+            for field in FIELDS:
+                bucket[field] += values[field]
+    if doc["daily"]:
+        doc["daily_oldest"] = min(doc["daily"])
+    return doc
+
+
+async def _user_logs(user_id):
+    """Ek user ke daily_logs → {"YYYY-MM-DD": values} ((user_id, date) index)."""
+    cursor = daily_logs_col.find(
+        {"user_id": user_id},
+        {"date": 1, "total_calories": 1, "total_protein": 1,
+         "total_carbs": 1, "total_fat": 1, "food_items.calories": 1},
+    ).sort("date", 1)
+    return {log["date"]: _log_values(log) async for log in cursor}
+
+
+async def _rebuild_user(user_id):
+    """
+    rev padho → daily_logs padho → doc replace sirf agar rev wahi hai.
+    Beech me $inc aaya → retry. Returns True jab doc likh gaya.
+    """
+    for _ in range(REBUILD_ATTEMPTS):
+        current = await rollups_col.find_one({"_id": user_id}, {"rev": 1})
+        doc = _build_doc(user_id, await _user_logs(user_id))
+        try:
+            if current is None:
+                doc["rev"] = 1
+                await rollups_col.insert_one(doc)
+                return True
+            doc["rev"] = (current.get("rev") or 0) + 1
+            result = await rollups_col.replace_one({"_id": user_id, "rev": current.get("rev")}, doc)
+            if result.matched_count:
+                return True
+        except DuplicateKeyError:
+            pass    # pehla $inc upsert ne doc bana diya — dobara padho
+    print(f"⚠️ Rollup rebuild for {user_id} kept racing with writes, will retry on next read")
+    return False
+
+
+async def rebuild(user_id=None):
+    """
+    Har user (ya sirf user_id) ka rollup document daily_logs se dobara banata
+    hai. Memory me ek time par sirf ek user ka data. Returns users rebuilt.
+    """
+    if user_id:
+        # Koi log na ho to bhi khaali (par backfilled) doc, taaki load() baar-baar rebuild na kare
+        return int(await _rebuild_user(ObjectId(user_id)))
+
+    users = 0
+    async for row in daily_logs_col.aggregate([{"$group": {"_id": "$user_id"}}]):
+        users += await _rebuild_user(row["_id"])
+    return users
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Rebuild user_rollups from daily_logs")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Sirf is user_id ka rollup")
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        count = await rebuild(args.user)
+        print(f"✅ Rebuilt rollups for {count} user(s)")
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
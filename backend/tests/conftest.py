@@ -0,0 +1,40 @@
+# backend/tests/conftest.py
+"""
+Tests backend/ folder se chalte hain:  cd backend && python -m pytest -q
+In-memory Mongo (mongomock), koi server / LLM key nahi chahiye.
+"""
+
+import os
+import sys
+import uuid
+
+os.environ["MONGODB_URI"] = "mongomock://"
+os.environ.setdefault("LLM_API_KEY", "test")
+os.environ.setdefault("PDF_WARMUP_ON_STARTUP", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    import api
+    with TestClient(api.app) as c:
+        yield c
+
+
+@pytest.fixture
+def make_user(client):
+    """name → Authorization headers (har call par naya user)."""
+    def _make(name="Test User"):
+        email = f"{uuid.uuid4().hex}@test.local"
+        r = client.post("/auth/register", json=dict(
+            name=name, email=email, password="pw123456", age=30, gender="male",
+            height=170, weight=70, goal="maintenance",
+        ))
+        assert r.status_code == 200, r.text
+        token = client.post("/auth/login", json={"email": email, "password": "pw123456"}).json()["token"]
+        return {"Authorization": f"Bearer {token}"}
+    return _make
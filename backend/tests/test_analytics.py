@@ -0,0 +1,70 @@
+# backend/tests/test_analytics.py
+import asyncio
+from datetime import date, datetime, timedelta
+
+from bson import ObjectId
+
+from database import daily_logs_col
+from utils import analytics
+
+
+def _log(day, calories, meals=1):
+    return {
+        "date": str(day), "total_calories": calories, "total_protein": 10,
+        "total_carbs": 20, "total_fat": 5, "food_items": [{"calories": calories}] * meals,
+    }
+
+
+def test_fill_buckets_adds_empty_weeks():
+    rows = [{"bucket": "2026-10-12", "total_calories": 900, "avg_calories": 450.0, "max_calories": 500,
+             "days_logged": 2, "meals": 3, "protein": 20, "carbs": 40, "fat": 10}]
+    buckets = analytics.fill_buckets(rows, date(2026, 10, 1), date(2026, 10, 18), "week")
+    assert [b["bucket"] for b in buckets] == ["2026-09-28", "2026-10-05", "2026-10-12"]
+    assert buckets[2] is rows[0]
+    assert buckets[0]["total_calories"] == 0 and buckets[0]["days_logged"] == 0
+
+
+def test_summarize_streaks():
+    end = date(2026, 10, 18)
+    facet = [{
+        "longest": [{"length": 5, "start": datetime(2026, 9, 1), "end": datetime(2026, 9, 5)}],
+        "latest": [{"length": 2, "start": datetime(2026, 10, 16), "end": datetime(2026, 10, 17)}],
+    }]
+    assert analytics.summarize_streaks(facet, end) == {
+        "current": 2, "longest": 5, "longest_start": "2026-09-01", "longest_end": "2026-09-05",
+    }
+    # Latest run parso khatam hua → current streak toot gaya
+    facet[0]["latest"][0]["end"] = datetime(2026, 10, 15)
+    assert analytics.summarize_streaks(facet, end)["current"] == 0
+    assert analytics.summarize_streaks([{"longest": [], "latest": []}], end)["longest"] == 0
+
+
+def test_python_fallback_matches_pipeline_shape():
+    logs = [_log(date(2026, 10, d), c) for d, c in ((4, 400), (5, 600), (6, 0), (7, 300), (8, 300), (9, 300))]
+    rows = analytics.buckets_from_logs(logs, "week")
+    assert [r["bucket"] for r in rows] == ["2026-09-28", "2026-10-05"]
+    assert rows[1]["total_calories"] == 1500 and rows[1]["days_logged"] == 5
+    assert rows[1]["avg_calories"] == 300.0 and rows[1]["max_calories"] == 600
+
+    # 6 Oct ko 0 calories → streak wahan tootti hai
+    streaks = analytics.summarize_streaks(analytics.streaks_from_logs(logs), date(2026, 10, 10))
+    assert streaks == {"current": 3, "longest": 3, "longest_start": "2026-10-07", "longest_end": "2026-10-09"}
+
+
+def test_history_range_endpoint_on_mongomock(client, make_user):
+    headers = make_user()
+    user_id = ObjectId(client.get("/auth/me", headers=headers).json()["user"]["_id"])
+    today = date.today()
+
+    async def seed():
+        await daily_logs_col.insert_many([
+            dict(_log(today - timedelta(days=i), 500), user_id=user_id) for i in range(3)
+        ])
+    asyncio.run(seed())
+
+    r = client.get("/history/range?granularity=day", headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert len(body["buckets"]) == analytics.DEFAULT_SPAN_DAYS["day"] + 1
+    assert body["summary"]["total_calories"] == 1500
+    assert body["streaks"]["current"] == 3
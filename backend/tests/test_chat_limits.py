@@ -0,0 +1,26 @@
+# backend/tests/test_chat_limits.py
+from config import CHAT_MAX_MESSAGE_CHARS, CHAT_MAX_HISTORY_CHARS, CHAT_MAX_HISTORY_MESSAGES
+from utils import chat_memory
+
+
+def test_chat_rejects_oversized_message(client):
+    r = client.post("/chat", json={"message": "x" * (CHAT_MAX_MESSAGE_CHARS + 1)})
+    assert r.status_code == 413
+
+
+def test_chat_rejects_oversized_history(client):
+    chunk = "y" * CHAT_MAX_MESSAGE_CHARS
+    history = [{"role": "user", "content": chunk}] * (CHAT_MAX_HISTORY_CHARS // CHAT_MAX_MESSAGE_CHARS + 1)
+    assert client.post("/chat", json={"message": "hi", "history": history}).status_code == 413
+    assert client.post("/chat/stream", json={"message": "hi", "history": history}).status_code == 413
+
+    many = [{"role": "user", "content": "a"}] * (CHAT_MAX_HISTORY_MESSAGES + 1)
+    assert client.post("/chat", json={"message": "hi", "history": many}).status_code == 413
+
+
+def test_token_count_cache_does_not_keep_text():
+    text = "protein " * 5000
+    assert chat_memory.count_tokens(text) == chat_memory._count(text)
+    for key in list(chat_memory._token_counts._data):
+        assert not any(isinstance(part, str) for part in key)
+    assert chat_memory._count(chat_memory.truncate_to_tokens(text, 100)) <= 100
@@ -0,0 +1,53 @@
+# backend/tests/test_chat_sessions.py
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+import chat_sessions
+from database import chat_sessions_col
+from config import CHAT_MAX_MESSAGE_CHARS, CHAT_SESSION_MAX_MESSAGES
+
+
+def test_oversized_seed_is_rejected(client, make_user):
+    headers = make_user()
+    # 1000 x 8000 "ह" (3 bytes each) ≈ 24 MB — pehle DocumentTooLarge → 500
+    seed = [{"role": "user", "content": "ह" * CHAT_MAX_MESSAGE_CHARS}] * CHAT_SESSION_MAX_MESSAGES
+    r = client.post("/chat/sessions", json={"messages": seed}, headers=headers)
+    assert r.status_code == 413
+
+    r = client.post("/chat/sessions", json={"messages": seed[:2]}, headers=headers)
+    assert r.status_code == 200
+
+
+def test_append_stays_under_byte_cap(monkeypatch):
+    monkeypatch.setattr(chat_sessions, "MAX_BYTES", 30)
+    user_id = str(ObjectId())
+
+    async def run():
+        session_id = await chat_sessions.create(user_id, [{"role": "user", "content": "ह" * 5}])
+        assert await chat_sessions.append(session_id, user_id, [{"role": "assistant", "content": "ok"}]) == 2
+        with pytest.raises(chat_sessions.SessionTooLarge):
+            await chat_sessions.append(session_id, user_id, [{"role": "user", "content": "x" * 14}])
+        session = await chat_sessions.get(session_id, user_id)
+        assert (session["n"], session["bytes"]) == (2, 17)
+    asyncio.run(run())
+
+
+def test_get_sees_appends_from_another_worker():
+    user_id = str(ObjectId())
+
+    async def run():
+        session_id = await chat_sessions.create(user_id, [{"role": "user", "content": "hi"}])
+        assert (await chat_sessions.get(session_id, user_id))["n"] == 1
+
+        # Dusra worker: seedha collection me append (is process ka cache wahi purana)
+        await chat_sessions_col.update_one(
+            {"_id": ObjectId(session_id)},
+            {"$push": {"messages": {"role": "assistant", "content": "hello"}}, "$inc": {"n": 1, "bytes": 5}},
+        )
+        session = await chat_sessions.get(session_id, user_id)
+        assert session["n"] == 2
+        assert session["messages"][-1]["content"] == "hello"
+        assert await chat_sessions.get(session_id, str(ObjectId())) is None
+    asyncio.run(run())
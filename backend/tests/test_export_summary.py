@@ -0,0 +1,16 @@
+# backend/tests/test_export_summary.py
+from urllib.parse import unquote
+
+
+def test_stream_export_non_ascii_username(client, make_user):
+    headers = make_user("राजन Kumar")
+    r = client.post("/export-summary?mode=stream", json={"calories": 1800, "ai_advice": "### Hi\n- eat"}, headers=headers)
+
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/pdf"
+    assert r.content.startswith(b"%PDF")
+
+    disposition = r.headers["content-disposition"]
+    disposition.encode("ascii")
+    assert 'filename="Kumar_Fitness_Report.pdf"' in disposition
+    assert unquote(disposition.split("filename*=UTF-8''")[1]) == "राजन_Kumar_Fitness_Report.pdf"
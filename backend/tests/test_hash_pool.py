@@ -0,0 +1,48 @@
+# backend/tests/test_hash_pool.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+import auth
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_cancelled_waiters_keep_their_slot_until_bcrypt_finishes(monkeypatch):
+    monkeypatch.setattr(auth, "HASH_QUEUE_SIZE", 2)
+    workers = auth.HASH_POOL_WORKERS
+    gate = threading.Event()
+
+    async def run():
+        # Saare workers busy + queue bhari, phir clients disconnect (cancel)
+        tasks = [asyncio.create_task(auth._run_in_hash_pool(gate.wait)) for _ in range(workers + 2)]
+        await asyncio.sleep(0.2)
+        assert auth.hash_pool_metrics()["running"] == workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Queue wale jobs sach me cancel hue; chal rahe bcrypt ke slots abhi bhi bhare
+        stats = auth.hash_pool_metrics()
+        assert stats["pending"] == stats["running"] == workers
+
+        more = [asyncio.create_task(auth._run_in_hash_pool(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(auth.HashPoolBusy):
+            await auth._run_in_hash_pool(gate.wait)
+
+        gate.set()
+        await asyncio.gather(*more)
+
+    try:
+        asyncio.run(run())
+    finally:
+        gate.set()
+    _wait_for(lambda: auth.hash_pool_metrics()["pending"] == 0)
@@ -0,0 +1,46 @@
+# backend/tests/test_nutrition_db.py
+import asyncio
+import threading
+
+from utils import nutrition_db
+
+
+def test_startup_loads_table(client):
+    assert nutrition_db._table is not None
+
+
+def test_cold_load_runs_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(nutrition_db, "_table", None)
+    threads = []
+    real_load = nutrition_db.load_table
+
+    def load(path):
+        threads.append(threading.current_thread())
+        return real_load(path)
+    monkeypatch.setattr(nutrition_db, "load_table", load)
+
+    table = asyncio.run(nutrition_db.warm_up())
+    assert len(table) > 0
+    assert threads and threads[0] is not threading.main_thread()
+
+    # Already loaded → dobara load nahi
+    asyncio.run(nutrition_db.warm_up())
+    assert len(threads) == 1
+
+
+def test_failed_reload_is_logged_and_backed_off(tmp_path, monkeypatch, capsys):
+    good = nutrition_db.get_table()
+    bad = tmp_path / "foods.csv"
+    bad.write_text("name,cal,protein,carbs,fat\nrice,not-a-number,1,1,1\n")
+    monkeypatch.setattr(nutrition_db, "_last_check", 0.0)
+
+    nutrition_db._reloading = True
+    nutrition_db._reload_in_background(str(bad))
+
+    assert "Nutrition table reload failed" in capsys.readouterr().out
+    assert nutrition_db._reloading is False
+    # Source "badla hua" dikhe tab bhi turant dobara reload thread nahi —
+    # NUTRITION_RELOAD_SECONDS ka wait
+    monkeypatch.setattr(nutrition_db, "_mtime", -1)
+    assert nutrition_db.get_table() is good
+    assert nutrition_db._reloading is False
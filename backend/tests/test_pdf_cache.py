@@ -0,0 +1,31 @@
+# backend/tests/test_pdf_cache.py
+import os
+import time
+
+import pytest
+
+from utils import exporter, pdf_cache
+
+
+def test_failed_render_leaves_no_tmp_file(tmp_path, monkeypatch):
+    def broken(target, *args):
+        with open(target, "wb") as f:
+            f.write(b"%PDF half")
+        raise RuntimeError("font missing")
+    monkeypatch.setattr(exporter, "render_summary_pdf", broken)
+
+    with pytest.raises(RuntimeError):
+        exporter.create_summary_pdf("u", 1800, "", "", "", [], filename="u.pdf", directory=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_removes_stale_tmp_files(tmp_path):
+    now = time.time()
+    for name, age in (("old.pdf.123.tmp", 7200), ("rendering.pdf.456.tmp", 5), ("keep.pdf", 5)):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (now - age, now - age))
+
+    report = pdf_cache.evict(str(tmp_path), max_bytes=10_000, max_age_seconds=3600, now=now)
+    assert sorted(os.listdir(tmp_path)) == ["keep.pdf", "rendering.pdf.456.tmp"]
+    assert report == {"removed": 1, "freed_bytes": 10, "kept": 1, "bytes": 10}
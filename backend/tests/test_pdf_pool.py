@@ -0,0 +1,49 @@
+# backend/tests/test_pdf_pool.py
+import time
+
+import pdf_jobs
+
+
+def _wait_job(client, headers, status_url):
+    for _ in range(300):
+        job = client.get(status_url, headers=headers).json()
+        if job["status"] != "queued":
+            return job
+        time.sleep(0.1)
+    raise AssertionError("export job never finished")
+
+
+def _kill_workers():
+    pool = pdf_jobs._pool
+    assert pool is not None
+    for process in list(pool._processes.values()):
+        process.kill()
+    # Pool ka management thread worker ki maut dekh kar pool ko broken mark karta hai
+    for _ in range(100):
+        if pool._broken:
+            return pool
+        time.sleep(0.05)
+    raise AssertionError("pool was not marked broken")
+
+
+def test_export_recovers_after_worker_death(client, make_user):
+    headers = make_user("Pool Tester")
+    r = client.post("/export-summary?mode=stream", json={"calories": 1, "ai_advice": "warm"}, headers=headers)
+    assert r.status_code == 200
+
+    broken = _kill_workers()
+    restarts = pdf_jobs.metrics()["pool_restarts"]
+
+    # Stream mode: broken pool → naya pool, export chal jaati hai
+    r = client.post("/export-summary?mode=stream", json={"calories": 2, "ai_advice": "after crash"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.content.startswith(b"%PDF")
+    assert pdf_jobs._pool is not broken
+    assert pdf_jobs.metrics()["pool_restarts"] == restarts + 1
+
+    # Job mode bhi (naya pool phir se maaro)
+    _kill_workers()
+    ex = client.post("/export-summary?mode=job", json={"calories": 3, "ai_advice": "job after crash"}, headers=headers).json()
+    job = _wait_job(client, headers, ex["status_url"])
+    assert job["status"] == "done", job
+    assert not pdf_jobs._inflight
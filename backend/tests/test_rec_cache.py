@@ -0,0 +1,56 @@
+# backend/tests/test_rec_cache.py
+import asyncio
+
+from utils import ai_recommender, rec_cache
+
+
+def test_bucket_prompt_never_contains_name():
+    prompt = ai_recommender.build_bucket_prompt(
+        rec_cache.profile_bucket(31, 80, 180, "male", "weight loss", "moderately active", 2100)
+    )
+    assert "Rajan" not in prompt
+    assert rec_cache.NAME_SLOT in prompt
+
+
+def test_cached_reply_is_not_shared_with_names(monkeypatch):
+    prompts = []
+
+    async def fake_completion(messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return "Hi {{name}}! Hope you keep going."
+
+    monkeypatch.setattr(ai_recommender, "chat_completion", fake_completion)
+    args = (31, 80, 180, "male", "weight loss", "moderately active", 2100)
+
+    async def run():
+        first = await ai_recommender.get_ai_recommendation("Rajan Kumar", *args)
+        second = await ai_recommender.get_ai_recommendation("Hope", *args)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == "Hi Rajan Kumar! Hope you keep going."
+    assert second == "Hi Hope! Hope you keep going."
+    assert len(prompts) == 1 and "Rajan" not in prompts[0]
+
+
+def test_slot_filler_handles_split_placeholder():
+    filler = rec_cache.SlotFiller("Asha")
+    out = "".join(filler.feed(p) for p in ("Hi {", "{na", "me}}", "! {x")) + filler.flush()
+    assert out == "Hi Asha! {x"
+
+
+def test_sqlite_hit_only_touches_stale_last_used(tmp_path):
+    backend = rec_cache.SQLiteBackend(str(tmp_path / "rec.db"), maxsize=10, ttl=3600)
+    backend.set("k", "v")
+    conn = backend._conn()
+
+    # Taaza entry → hit par koi write (aur write lock) nahi
+    writes = conn.total_changes
+    assert backend.get("k") == "v"
+    assert conn.total_changes == writes
+
+    conn.execute("UPDATE rec_cache SET last_used = last_used - 3600")
+    conn.commit()
+    writes = conn.total_changes
+    assert backend.get("k") == "v"
+    assert conn.total_changes == writes + 1
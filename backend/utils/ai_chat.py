@@ -1,29 +1,32 @@
-from groq import Groq
-import os
+from utils.llm_client import chat_completion, stream_chat_completion
+from utils.chat_memory import build_messages
 
-# Direct key OR environment variable
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+CHAT_MAX_TOKENS = 350
 
-def chat_with_coach(history):
+
+async def _prepare(history, wait_summary=False):
+    # Token budget me naye turns + purane turns ki rolling summary
+    # (pehle history[-5:] — context khota tha, lambe messages phir bhi 413)
+    return await build_messages(history, wait=wait_summary)
+
+
+async def chat_with_coach(history, wait_summary=False):
     """
     history = list of dicts like:
     [{"role": "user", "content": "Hello"}]
-    """
 
-    # Format conversation
-    formatted = []
-    for msg in history:
-        formatted.append({"role": msg["role"], "content": msg["content"]})
-
-    # Call Groq working model
-    # Limit history size (fixes token overflow 413 error)
-    safe_history = history[-5:] if len(history) > 5 else history
-
-    response = client.chat.completions.create(
-    model="llama-3.1-8b-instant",
-    messages=safe_history,
-    max_tokens=350
-    )
+    wait_summary=True: short-lived loop (run_sync) — background summary
+    task loop ke saath mar jaata, isliye uska wait.
+    """
+    # Shared async client (pooled connections, timeout, retries)
+    return await chat_completion(await _prepare(history, wait_summary), max_tokens=CHAT_MAX_TOKENS)
 
-    return response.choices[0].message.content
 
+async def chat_with_coach_stream(history):
+    """Same as chat_with_coach, par reply ke pieces aate hi (async generator)."""
+    pieces = stream_chat_completion(await _prepare(history), max_tokens=CHAT_MAX_TOKENS)
+    try:
+        async for piece in pieces:
+            yield piece
+    finally:
+        await pieces.aclose()
@@ -1,25 +1,14 @@
-from groq import Groq
-from config import GROQ_API_KEY
+from utils.llm_client import chat_completion, stream_chat_completion
+from utils import rec_cache
 
 
-client = Groq(api_key=GROQ_API_KEY)
-
-def get_ai_recommendation(name, age, weight, height, gender, goal, activity, latest_calories):
-
-    prompt = f"""
+PROMPT_TEMPLATE = """
 You are a friendly fitness and diet expert. 
 Write your answer in **Markdown** with clear sections.
 
 User:
-- Name: {name}
-- Age: {age}
-- Weight: {weight} kg
-- Height: {height} cm
-- Gender: {gender}
-- Goal: {goal}
-- Activity Level: {activity}
-- Latest Estimated Calories: {latest_calories}
-
+{profile}
+{rules}
 Return the answer in EXACTLY this format:
 
 ### 🥗 Diet Advice
@@ -32,11 +21,98 @@ Return the answer in EXACTLY this format:
 - (1–2 short motivational lines)
 """
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=300,
-        temperature=0.7,
-    )
+# Cache wale (bucket) jawab kai users ko dikhte hain: naam prompt me nahi jaata,
+# model sirf placeholder likhta hai (rec_cache naam baad me bharta hai)
+BUCKET_RULES = (
+    "This advice is shared by many users with a similar profile. "
+    f"Do not use any personal name. To address the user, write exactly {rec_cache.NAME_SLOT} "
+    "or do not address them by name at all. "
+    "Do not mention exact numbers for weight, height or age.\n"
+)
+
+
+def _render_prompt(profile, rules=""):
+    lines = "\n".join(f"- {label}: {value}" for label, value in profile)
+    return PROMPT_TEMPLATE.format(profile=lines, rules=rules)
+
+
+def build_prompt(name, age, weight, height, gender, goal, activity, latest_calories):
+    return _render_prompt((
+        ("Name", name),
+        ("Age", age),
+        ("Weight", f"{weight} kg"),
+        ("Height", f"{height} cm"),
+        ("Gender", gender),
+        ("Goal", goal),
+        ("Activity Level", activity),
+        ("Latest Estimated Calories", latest_calories),
+    ))
+
+
+def build_bucket_prompt(bucket):
+    """
+    Cache ke saath: exact numbers ki jagah bucket, aur naam bilkul nahi —
+    jawab poore bucket par sahi baithe aur kisi ka naam doosre ko na dikhe.
+    """
+    return _render_prompt((
+        ("Age group", bucket["age"]),
+        ("Gender", bucket["gender"]),
+        ("Body type", bucket["bmi"]),
+        ("Goal", bucket["goal"]),
+        ("Activity Level", bucket["activity"]),
+        ("Latest Estimated Calories", bucket["calories"]),
+    ), rules=BUCKET_RULES)
+
+
+def _messages(prompt):
+    return [{"role": "user", "content": prompt}]
+
+
+async def get_ai_recommendation(name, age, weight, height, gender, goal, activity, latest_calories):
+    if not rec_cache.enabled():
+        prompt = build_prompt(name, age, weight, height, gender, goal, activity, latest_calories)
+        return await chat_completion(_messages(prompt), max_tokens=300, temperature=0.7)
+
+    # Same bucket ka jawab cache se (naam baad me bhara jata hai)
+    bucket = rec_cache.profile_bucket(age, weight, height, gender, goal, activity, latest_calories)
+
+    async def create():
+        prompt = build_bucket_prompt(bucket)
+        return await chat_completion(_messages(prompt), max_tokens=300, temperature=0.7)
+
+    return await rec_cache.get_or_create(rec_cache.signature(bucket), name, create)
+
+
+async def _cached_stream(key, name, bucket):
+    text = await rec_cache.lookup(key, name)
+    if text is not None:
+        # Hit → poora jawab ek hi token event me
+        yield text
+        return
+
+    parts = []
+    filler = rec_cache.SlotFiller(name)
+    pieces = stream_chat_completion(_messages(build_bucket_prompt(bucket)), max_tokens=300, temperature=0.7)
+    try:
+        async for piece in pieces:
+            parts.append(piece)
+            out = filler.feed(piece)
+            if out:
+                yield out
+    finally:
+        await pieces.aclose()
+    tail = filler.flush()
+    if tail:
+        yield tail
+    # Sirf poora (bina error / disconnect) jawab cache me — template hi, naam nahi
+    await rec_cache.store(key, "".join(parts))
+
+
+def stream_ai_recommendation(name, age, weight, height, gender, goal, activity, latest_calories):
+    """Same prompt, tokens as they arrive (async generator)."""
+    if rec_cache.enabled():
+        bucket = rec_cache.profile_bucket(age, weight, height, gender, goal, activity, latest_calories)
+        return _cached_stream(rec_cache.signature(bucket), name, bucket)
 
-    return response.choices[0].message.content
+    prompt = build_prompt(name, age, weight, height, gender, goal, activity, latest_calories)
+    return stream_chat_completion(_messages(prompt), max_tokens=300, temperature=0.7)
@@ -0,0 +1,230 @@
+# utils/analytics.py
+"""
+MongoDB aggregation pipelines for calorie analytics (/history/range).
+
+Bucketing, sums, averages aur streaks sab server par hote hain — API ko
+sirf O(buckets) rows milti hain, raw daily_logs nahi.
+
+Pipelines ko MongoDB 5.0+ chahiye ($dateTrunc, $setWindowFields,
+$dateSubtract). Purana server ya mongomock (dev / tests) → same output
+Python me: buckets_from_logs() + streaks_from_logs() (range ke daily_logs,
+max ek doc per din).
+"""
+
+from datetime import date, datetime, timedelta
+
+GRANULARITIES = ("day", "week", "month")
+
+MIN_SERVER_VERSION = (5, 0)
+
+# Python fallback ke liye daily_logs fields
+LOG_FIELDS = {
+    "_id": 0, "date": 1, "total_calories": 1, "total_protein": 1,
+    "total_carbs": 1, "total_fat": 1, "food_items.calories": 1,
+}
+
+# Default window agar start na diya ho
+DEFAULT_SPAN_DAYS = {"day": 29, "week": 7 * 12 - 1, "month": 365}
+
+# daily_logs.date "YYYY-MM-DD" string hai → proper Date
+_DAY_EXPR = {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d"}}
+
+
+def _match(user_id, start, end, extra=None):
+    match = {"user_id": user_id, "date": {"$gte": str(start), "$lte": str(end)}}
+    if extra:
+        match.update(extra)
+    return {"$match": match}
+
+
+def _bucket_expr(granularity):
+    if granularity == "day":
+        return "$day"
+    trunc = {"date": "$day", "unit": granularity}
+    if granularity == "week":
+        trunc["startOfWeek"] = "monday"
+    return {"$dateTrunc": trunc}
+
+
+def buckets_pipeline(user_id, start, end, granularity):
+    """One row per day / week / month: totals, averages, macros."""
+    return [
+        _match(user_id, start, end),
+        {"$addFields": {"day": _DAY_EXPR}},
+        {"$group": {
+            "_id": _bucket_expr(granularity),
+            "total_calories": {"$sum": "$total_calories"},
+            "avg_calories": {"$avg": "$total_calories"},
+            "max_calories": {"$max": "$total_calories"},
+            "days_logged": {"$sum": 1},
+            "meals": {"$sum": {"$size": {"$ifNull": ["$food_items", []]}}},
+            "protein": {"$sum": {"$ifNull": ["$total_protein", 0]}},
+            "carbs": {"$sum": {"$ifNull": ["$total_carbs", 0]}},
+            "fat": {"$sum": {"$ifNull": ["$total_fat", 0]}},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "bucket": {"$dateToString": {"date": "$_id", "format": "%Y-%m-%d"}},
+            "total_calories": 1,
+            "avg_calories": {"$round": ["$avg_calories", 1]},
+            "max_calories": 1,
+            "days_logged": 1,
+            "meals": 1,
+            "protein": 1,
+            "carbs": 1,
+            "fat": 1,
+        }},
+    ]
+
+
+def streaks_pipeline(user_id, start, end):
+    """
+    Consecutive logged days. Trick: (day - row_number) har continuous run ke
+    liye same rehta hai, to us par group karne se har run ek row ban jata hai.
+    """
+    return [
+        _match(user_id, start, end, {"total_calories": {"$gt": 0}}),
+        {"$project": {"day": _DAY_EXPR}},
+        {"$setWindowFields": {
+            "sortBy": {"day": 1},
+            "output": {"rank": {"$documentNumber": {}}},
+        }},
+        {"$group": {
+            "_id": {"$dateSubtract": {"startDate": "$day", "unit": "day", "amount": "$rank"}},
+            "length": {"$sum": 1},
+            "start": {"$min": "$day"},
+            "end": {"$max": "$day"},
+        }},
+        {"$facet": {
+            "longest": [{"$sort": {"length": -1, "end": -1}}, {"$limit": 1}],
+            "latest": [{"$sort": {"end": -1}}, {"$limit": 1}],
+        }},
+    ]
+
+
+def pipelines_supported(server_version):
+    """server_version: (major, minor) ya None (mongomock / pata nahi)."""
+    return server_version is not None and tuple(server_version) >= MIN_SERVER_VERSION
+
+
+def logs_query(user_id, start, end):
+    return _match(user_id, start, end)["$match"]
+
+
+# ---------------------------------------------------
+# PYTHON FALLBACK (same rows as the pipelines)
+# ---------------------------------------------------
+def bucket_key(day, granularity):
+    """date → bucket ka pehla din (week = Monday)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def buckets_from_logs(logs, granularity):
+    """daily_logs docs → buckets_pipeline() jaisi rows (sorted)."""
+    groups = {}
+    for log in logs:
+        key = bucket_key(date.fromisoformat(log["date"]), granularity)
+        groups.setdefault(key, []).append(log)
+
+    rows = []
+    for key in sorted(groups):
+        calories = [log.get("total_calories") or 0 for log in groups[key]]
+        rows.append({
+            "bucket": str(key),
+            "total_calories": sum(calories),
+            "avg_calories": round(sum(calories) / len(calories), 1),
+            "max_calories": max(calories),
+            "days_logged": len(calories),
+            "meals": sum(len(log.get("food_items") or []) for log in groups[key]),
+            "protein": sum(log.get("total_protein") or 0 for log in groups[key]),
+            "carbs": sum(log.get("total_carbs") or 0 for log in groups[key]),
+            "fat": sum(log.get("total_fat") or 0 for log in groups[key]),
+        })
+    return rows
+
+
+def streaks_from_logs(logs):
+    """daily_logs docs → streaks_pipeline() jaisa $facet output."""
+    days = sorted({
+        date.fromisoformat(log["date"]) for log in logs if (log.get("total_calories") or 0) > 0
+    })
+
+    runs = []
+    for day in days:
+        if runs and runs[-1]["end"] == day - timedelta(days=1):
+            runs[-1]["end"] = day
+            runs[-1]["length"] += 1
+        else:
+            runs.append({"start": day, "end": day, "length": 1})
+
+    # Pipeline Date deta hai (datetime) — summarize_streaks wahi expect karta hai
+    runs = [
+        {"length": r["length"],
+         "start": datetime.combine(r["start"], datetime.min.time()),
+         "end": datetime.combine(r["end"], datetime.min.time())}
+        for r in runs
+    ]
+    if not runs:
+        return [{"longest": [], "latest": []}]
+    return [{
+        "longest": [max(runs, key=lambda r: (r["length"], r["end"]))],
+        "latest": [runs[-1]],
+    }]
+
+
+def bucket_starts(start, end, granularity):
+    """Range ke saare bucket keys (khaali buckets 0 se bharne ke liye)."""
+    if granularity == "day":
+        cur = start
+    elif granularity == "week":
+        cur = start - timedelta(days=start.weekday())
+    else:
+        cur = start.replace(day=1)
+
+    keys = []
+    while cur <= end:
+        keys.append(str(cur))
+        if granularity == "day":
+            cur += timedelta(days=1)
+        elif granularity == "week":
+            cur += timedelta(days=7)
+        else:
+            cur = date(cur.year + (cur.month == 12), cur.month % 12 + 1, 1)
+    return keys
+
+
+def fill_buckets(rows, start, end, granularity):
+    by_key = {r["bucket"]: r for r in rows}
+    empty = {
+        "total_calories": 0, "avg_calories": 0, "max_calories": 0, "days_logged": 0,
+        "meals": 0, "protein": 0, "carbs": 0, "fat": 0,
+    }
+    return [
+        by_key.get(key, dict(empty, bucket=key))
+        for key in bucket_starts(start, end, granularity)
+    ]
+
+
+def summarize_streaks(facet_result, end):
+    """$facet output → {"current": n, "longest": n, ...}"""
+    result = facet_result[0] if facet_result else {}
+    longest = (result.get("longest") or [{}])[0]
+    latest = (result.get("latest") or [{}])[0]
+
+    current = 0
+    if latest.get("end") is not None:
+        # Aaj ya kal tak chal raha run hi "current" streak hai
+        if latest["end"].date() >= end - timedelta(days=1):
+            current = latest["length"]
+
+    return {
+        "current": current,
+        "longest": longest.get("length", 0),
+        "longest_start": str(longest["start"].date()) if longest.get("start") else None,
+        "longest_end": str(longest["end"].date()) if longest.get("end") else None,
+    }
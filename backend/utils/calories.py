@@ -1,95 +1,140 @@
 # ---------------------------
 # ADVANCED FOOD DATABASE
 # ---------------------------
-FOOD_DB = {
-    # Indian staples
-    "chapati": {"cal": 80, "protein": 3, "carbs": 15, "fat": 2},
-    "roti": {"cal": 80, "protein": 3, "carbs": 15, "fat": 2},
-    "paratha": {"cal": 180, "protein": 4, "carbs": 22, "fat": 8},
-    "dal": {"cal": 150, "protein": 9, "carbs": 18, "fat": 2},
-    "rajma": {"cal": 210, "protein": 12, "carbs": 30, "fat": 1},
-    "chole": {"cal": 220, "protein": 11, "carbs": 30, "fat": 5},
-    "khichdi": {"cal": 160, "protein": 6, "carbs": 26, "fat": 3},
-    "poha": {"cal": 180, "protein": 3, "carbs": 30, "fat": 5},
-    "upma": {"cal": 200, "protein": 5, "carbs": 32, "fat": 6},
-    "idli": {"cal": 60, "protein": 2, "carbs": 12, "fat": 0},
-    "dosa": {"cal": 120, "protein": 2, "carbs": 20, "fat": 4},
-    "sambar": {"cal": 90, "protein": 3, "carbs": 12, "fat" :2},
-    "curd": {"cal": 100, "protein": 4, "carbs": 7, "fat": 4},
-
-    # Rice varieties
-    "rice": {"cal": 200, "protein": 4, "carbs": 45, "fat": 0},
-    "fried rice": {"cal": 300, "protein": 6, "carbs": 50, "fat": 8},
-    "biriyani": {"cal": 400, "protein": 12, "carbs": 50, "fat": 15},
-
-    # Proteins
-    "egg": {"cal": 70, "protein": 6, "carbs": 1, "fat": 5},
-    "egg omelette": {"cal": 150, "protein": 10, "carbs": 2, "fat": 12},
-    "chicken": {"cal": 165, "protein": 31, "carbs": 0, "fat": 4},
-    "grilled chicken": {"cal": 200, "protein": 35, "carbs": 2, "fat": 5},
-    "fish": {"cal": 140, "protein": 26, "carbs": 0, "fat": 3},
-    "paneer": {"cal": 265, "protein": 18, "carbs": 6, "fat": 20},
-    "tofu": {"cal": 120, "protein": 10, "carbs": 3, "fat": 7},
-
-    # Fruits
-    "apple": {"cal": 80, "protein": 0, "carbs": 22, "fat": 0},
-    "banana": {"cal": 100, "protein": 1, "carbs": 27, "fat": 0},
-    "orange": {"cal": 60, "protein": 1, "carbs": 15, "fat": 0},
-    "mango": {"cal": 150, "protein": 1, "carbs": 35, "fat": 1},
-
-    # Snacks
-    "nuts": {"cal": 180, "protein": 6, "carbs": 6, "fat": 15},
-    "chips": {"cal": 160, "protein": 2, "carbs": 16, "fat": 10},
-    "biscuits": {"cal": 80, "protein": 1, "carbs": 12, "fat": 3},
-
-    # Beverages
-    "milk": {"cal": 120, "protein": 8, "carbs": 11, "fat": 5},
-    "coffee": {"cal": 40, "protein": 1, "carbs": 5, "fat": 1},
-    "tea": {"cal": 30, "protein": 0, "carbs": 5, "fat": 1},
-}
-
-import re
+# Food catalogue ab disk se aata hai (utils/nutrition_db.py).
+# Default file: data/foods.csv  (NUTRITION_DB_PATH se badal sakte ho)
+import numpy as np
+
+from utils.nutrition_db import get_table
+
+
+def _num(value):
+    """NumPy float → plain int/float (JSON + Mongo friendly)."""
+    value = round(float(value), 1)
+    return int(value) if value.is_integer() else value
 
 
 # -------------------------------------
-# ADVANCED CALORIE ESTIMATOR
+# MEAL ESTIMATOR (structured)
 # -------------------------------------
-def estimate_calories(food_text):
-    text = food_text.lower()
-    total_cal = 0
-    total_protein = 0
-    total_carbs = 0
-    total_fat = 0
+def estimate_meal(food_text):
+    """
+    Returns {"calories", "protein", "carbs", "fat", "items"} for a meal text.
+    Har matched token ke liye table lookup O(1) hai.
+    """
+    table = get_table()
+    hits = table.scan(str(food_text).lower())
+
+    items = []
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for name, row, qty in hits:
+        cal, prot, carbs, fat = (table.values[row] * qty).tolist()
+        totals[0] += cal
+        totals[1] += prot
+        totals[2] += carbs
+        totals[3] += fat
+        items.append({
+            "item": name,
+            "qty": qty,
+            "calories": _num(cal),
+            "protein": _num(prot),
+            "carbs": _num(carbs),
+            "fat": _num(fat),
+        })
+
+    return {
+        "calories": _num(totals[0]),
+        "protein": _num(totals[1]),
+        "carbs": _num(totals[2]),
+        "fat": _num(totals[3]),
+        "items": items,
+    }
+
+
+def format_meal_details(meal):
     details = ""
+    for it in meal["items"]:
+        details += (
+            f"{it['qty']} x {it['item']} → {it['calories']} kcal "
+            f"(Protein:{it['protein']}g Carbs:{it['carbs']}g Fat:{it['fat']}g)\n"
+        )
 
-    for item, data in FOOD_DB.items():
-        pattern = rf"(\d+)?\s*{item}"
-        match = re.search(pattern, text)
-
-        if match:
-            qty = int(match.group(1)) if match.group(1) else 1
-
-            cal = data["cal"] * qty
-            prot = data["protein"] * qty
-            carbs = data["carbs"] * qty
-            fat = data["fat"] * qty
+    summary = f"""
+Total Calories: {meal['calories']} kcal
+Protein: {meal['protein']} g
+Carbs: {meal['carbs']} g
+Fat: {meal['fat']} g
+"""
 
-            total_cal += cal
-            total_protein += prot
-            total_carbs += carbs
-            total_fat += fat
+    return details + "\n" + summary
 
-            details += (
-                f"{qty} x {item} → {cal} kcal "
-                f"(Protein:{prot}g Carbs:{carbs}g Fat:{fat}g)\n"
-            )
 
-    summary = f"""
-Total Calories: {total_cal} kcal
-Protein: {total_protein} g
-Carbs: {total_carbs} g
-Fat: {total_fat} g
-"""
+# -------------------------------------
+# ADVANCED CALORIE ESTIMATOR
+# -------------------------------------
+def estimate_calories(food_text):
+    meal = estimate_meal(food_text)
+    return meal["calories"], format_meal_details(meal)
 
-    return total_cal, details + "\n" + summary
 
+# -------------------------------------
+# BATCH ESTIMATOR (offline sync ke liye)
+# -------------------------------------
+_MEAL_SEP = "\x00"
+
+
+def estimate_meals_batch(food_texts):
+    """
+    Estimates many meals in one go.
+    Saare texts ek string me jod kar EK scan hota hai, fir macros NumPy se
+    vectorised sum hote hain. Returns list of dicts shaped like estimate_meal().
+    """
+    table = get_table()
+    texts = [str(t or "").lower().replace(_MEAL_SEP, " ") for t in food_texts]
+    if not texts:
+        return []
+
+    # Har meal ka start offset (joined string me) → match ka meal index
+    starts = np.cumsum([0] + [len(t) + 1 for t in texts[:-1]])
+    joined = _MEAL_SEP.join(texts)
+
+    meal_idx, rows, qtys, names = [], [], [], []
+    seen = set()
+    if table.matcher is not None:
+        for match in table.matcher.finditer(joined):
+            meal = int(np.searchsorted(starts, match.start(2), side="right")) - 1
+            name = match.group(2)
+            if (meal, name) in seen:
+                continue
+            seen.add((meal, name))
+            meal_idx.append(meal)
+            rows.append(table.index[name])
+            qtys.append(int(match.group(1)) if match.group(1) else 1)
+            names.append(name)
+
+    # (hits x 4) macros → per meal totals
+    hit_values = table.values[np.asarray(rows, dtype=np.intp)] * np.asarray(qtys, dtype=np.float32)[:, None]
+    totals = np.zeros((len(texts), hit_values.shape[1]), dtype=np.float64)
+    np.add.at(totals, np.asarray(meal_idx, dtype=np.intp), hit_values)
+
+    meals = [
+        {
+            "calories": _num(t[0]),
+            "protein": _num(t[1]),
+            "carbs": _num(t[2]),
+            "fat": _num(t[3]),
+            "items": [],
+        }
+        for t in totals.tolist()
+    ]
+    for meal, name, qty, vals in zip(meal_idx, names, qtys, hit_values.tolist()):
+        meals[meal]["items"].append({
+            "item": name,
+            "qty": qty,
+            "calories": _num(vals[0]),
+            "protein": _num(vals[1]),
+            "carbs": _num(vals[2]),
+            "fat": _num(vals[3]),
+        })
+
+    return meals
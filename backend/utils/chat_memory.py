@@ -0,0 +1,273 @@
+# utils/chat_memory.py
+"""
+Token-budgeted conversation memory for the chat coach.
+
+Pehle sirf history[-5:] jaata tha: purani baatein bhool jaata tha, aur 5
+lambe messages phir bhi 413 de dete the. Ab:
+    1. Har message ke tokens local tokenizer se gine jaate hain (tiktoken ho
+       to wahi, warna regex estimate) — memoised.
+    2. Sabse naye turns CHAT_HISTORY_TOKEN_BUDGET me pack hote hain.
+    3. Window se bahar gire purane turns ek rolling summary me fold hote hain,
+       jo system message ban kar sabse aage jaata hai.
+
+Summary cache key = gire hue turns ka rolling hash (prefix hash). Summary
+sirf tab dobara banti hai jab naye turns window se bahar girte hain — aur
+wo bhi pichli summary + sirf naye gire turns se. Turns CHAT_SUMMARY_CHUNK_TURNS
+ke chunks me girte hain, to har message par summary call nahi hoti.
+
+Summary background me banti hai: request ko kabhi summary LLM call ka wait
+nahi karna padta (latency bounded) — tab tak sabse nayi cached summary use hoti hai.
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+from collections import deque
+
+from config import (
+    CHAT_HISTORY_TOKEN_BUDGET, CHAT_SUMMARY_MAX_TOKENS, CHAT_SUMMARY_CHUNK_TURNS,
+    CHAT_SUMMARY_CACHE_SIZE, CHAT_SUMMARY_TTL_SECONDS,
+)
+from utils.cache import TTLCache
+from utils.llm_client import chat_completion
+
+MESSAGE_OVERHEAD_TOKENS = 4     # role + separators per message (OpenAI-style format)
+
+# ---------------------------------------------------
+# 1. TOKEN COUNTING
+# ---------------------------------------------------
+# Regex estimate: words, numbers, har punctuation / emoji alag; lambe words
+# ~4 chars per token. Llama / GPT BPE ke kaafi paas (thoda upar) aata hai.
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_encoding = None
+_tokenizer_name = None
+
+
+def _load_tokenizer():
+    global _encoding, _tokenizer_name
+    try:
+        import tiktoken    # optional — na ho to estimate
+        _encoding = tiktoken.get_encoding("cl100k_base")
+        _tokenizer_name = "tiktoken:cl100k_base"
+    except Exception:
+        _encoding = None
+        _tokenizer_name = "regex-estimate"
+
+
+def _count(text):
+    if _tokenizer_name is None:
+        _load_tokenizer()
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+
+    total = 0
+    for piece in _PIECES.findall(text):
+        total += 1 if len(piece) <= 4 else (len(piece) + 3) // 4
+    return total
+
+
+# Key = (hash, length), text nahi — entries bounded hain aur bytes bhi
+# (pehle lru_cache poora message text pakad kar rakhta tha)
+_token_counts = TTLCache(maxsize=65536, ttl=CHAT_SUMMARY_TTL_SECONDS)
+
+
+def count_tokens(text):
+    """Memoised per message. Truncation probes ke liye _count() (cache nahi)."""
+    key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), len(text))
+    count = _token_counts.get(key)
+    if count is None:
+        count = _count(text)
+        _token_counts.set(key, count)
+    return count
+
+
+def message_tokens(msg):
+    return count_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text, budget):
+    """Ek hi message budget se bada ho → shuru ka hissa rakho."""
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return text
+    cut = max(1, int(len(text) * budget / tokens))
+    while cut > 1 and _count(text[:cut]) > budget:
+        cut = int(cut * 0.9)
+    return text[:cut]
+
+
+# ---------------------------------------------------
+# 2. PACK RECENT TURNS INTO THE BUDGET
+# ---------------------------------------------------
+def _normalise(history):
+    out = []
+    for msg in history or []:
+        content = msg.get("content")
+        if msg.get("role") in ("user", "assistant") and isinstance(content, str) and content.strip():
+            out.append({"role": msg["role"], "content": content})
+    return out
+
+
+def split_window(history, budget):
+    """
+    Returns (older, recent): recent = naye se purane ki taraf jitne turns
+    budget me aate hain; older = baaki (summary me jayenge). Cut chunk ke
+    multiple par hota hai, taaki summary har turn par na badle.
+    """
+    used = 0
+    keep = 0
+    for msg in reversed(history):
+        cost = message_tokens(msg)
+        if keep and used + cost > budget:
+            break
+        used += cost
+        keep += 1
+
+    cut = len(history) - keep
+    if cut and CHAT_SUMMARY_CHUNK_TURNS > 1:
+        cut = min(len(history) - 1, -(-cut // CHAT_SUMMARY_CHUNK_TURNS) * CHAT_SUMMARY_CHUNK_TURNS)
+    return history[:cut], history[cut:]
+
+
+# ---------------------------------------------------
+# 3. ROLLING SUMMARY (cached by prefix hash)
+# ---------------------------------------------------
+_summaries = TTLCache(maxsize=CHAT_SUMMARY_CACHE_SIZE, ttl=CHAT_SUMMARY_TTL_SECONDS)
+_inflight = {}          # prefix hash → background summary task
+_lock = threading.Lock()
+_stats = {"requests": 0, "summarised_requests": 0, "summary_calls": 0, "summary_failures": 0, "truncated": 0}
+_packed_tokens = deque(maxlen=500)
+
+SUMMARY_PROMPT = (
+    "You maintain the memory of a fitness coach chat. Update the summary with the new "
+    "messages. Keep the user's goals, body stats, diet preferences, injuries, plans "
+    "already suggested and anything they asked to remember. Plain bullet points, "
+    "at most {words} words."
+)
+
+
+def prefix_hashes(history):
+    """hashes[i] = pehle i messages ka hash (hashes[0] = khaali conversation)."""
+    h = hashlib.sha1()
+    hashes = [h.hexdigest()]
+    for msg in history:
+        h.update(msg["role"].encode())
+        h.update(b"\x00")
+        h.update(msg["content"].encode())
+        h.update(b"\x01")
+        hashes.append(h.hexdigest())
+    return hashes
+
+
+def _latest_summary(hashes, upto):
+    """Sabse lamba cached prefix (<= upto) → (index, summary). Nahi mila → (0, "")."""
+    for i in range(upto, 0, -1):
+        summary = _summaries.get(hashes[i])
+        if summary is not None:
+            return i, summary
+    return 0, ""
+
+
+async def _summarise(previous, turns):
+    lines = [f"{m['role']}: {m['content']}" for m in turns]
+    prompt = "\n".join(lines)
+    if previous:
+        prompt = f"Current summary:\n{previous}\n\nNew messages:\n{prompt}"
+    messages = [
+        {"role": "system", "content": SUMMARY_PROMPT.format(words=int(CHAT_SUMMARY_MAX_TOKENS * 0.6))},
+        {"role": "user", "content": truncate_to_tokens(prompt, CHAT_HISTORY_TOKEN_BUDGET * 2)},
+    ]
+    return await chat_completion(messages, max_tokens=CHAT_SUMMARY_MAX_TOKENS, temperature=0.2)
+
+
+async def _refresh(older, hashes, start, previous):
+    key = hashes[len(older)]
+    try:
+        with _lock:
+            _stats["summary_calls"] += 1
+        summary = await _summarise(previous, older[start:])
+        _summaries.set(key, truncate_to_tokens(summary.strip(), CHAT_SUMMARY_MAX_TOKENS))
+    except Exception as e:
+        # Summary na bani to bhi chat chale — agli baar phir try
+        with _lock:
+            _stats["summary_failures"] += 1
+        print(f"⚠️ Chat summary failed: {e}")
+    finally:
+        _inflight.pop(key, None)
+
+
+def _schedule(older, hashes, start, previous):
+    key = hashes[len(older)]
+    if key in _inflight:
+        return
+    task = asyncio.create_task(_refresh(older, hashes, start, previous))
+    _inflight[key] = task
+
+
+async def build_messages(history, wait=False):
+    """
+    Client history → LLM messages: [summary system msg] + budget me naye turns.
+    wait=True → summary stale ho to ban'ne ka wait (CLI / batch ke liye).
+    """
+    history = _normalise(history)
+    budget = CHAT_HISTORY_TOKEN_BUDGET
+    with _lock:
+        _stats["requests"] += 1
+
+    older, recent = split_window(history, budget - CHAT_SUMMARY_MAX_TOKENS)
+
+    # Sirf naya message hi budget se bada → uska shuru ka hissa
+    if recent and message_tokens(recent[-1]) > budget - CHAT_SUMMARY_MAX_TOKENS:
+        last = recent[-1]
+        recent[-1] = {"role": last["role"], "content": truncate_to_tokens(
+            last["content"], budget - CHAT_SUMMARY_MAX_TOKENS - MESSAGE_OVERHEAD_TOKENS)}
+        with _lock:
+            _stats["truncated"] += 1
+
+    summary = ""
+    if older:
+        hashes = prefix_hashes(older)
+        start, summary = _latest_summary(hashes, len(older))
+        if start < len(older):
+            # Naye turns window se gire → pichli summary + sirf ye turns
+            _schedule(older, hashes, start, summary)
+            task = _inflight.get(hashes[len(older)])
+            if wait and task is not None:
+                await asyncio.shield(task)
+                start, summary = _latest_summary(hashes, len(older))
+
+    messages = []
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+    messages.extend(recent)
+
+    with _lock:
+        if summary:
+            _stats["summarised_requests"] += 1
+        _packed_tokens.append(sum(message_tokens(m) for m in messages))
+    return messages
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def metrics():
+    if _tokenizer_name is None:
+        _load_tokenizer()
+    with _lock:
+        stats = dict(_stats)
+        samples = list(_packed_tokens)
+    stats.update({
+        "tokenizer": _tokenizer_name,
+        "token_budget": CHAT_HISTORY_TOKEN_BUDGET,
+        "packed_tokens_p50": _percentile(samples, 0.5),
+        "packed_tokens_max": max(samples) if samples else 0,
+        "summaries_pending": len(_inflight),
+        "summary_cache": _summaries.stats(),
+    })
+    return stats
@@ -0,0 +1,87 @@
+# utils/export_stream.py
+"""
+Mongo documents → NDJSON / CSV text, ek document at a time.
+GET /history/export inhe cursor se seedha StreamingResponse me bhejta hai,
+isliye memory user ke records ki ginti par depend nahi karti.
+
+iter_bytes: already-in-memory payload (e.g. streamed PDF) ko chunks me.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+
+# CSV me dono collections ke columns (nested values JSON string ban jaate hain)
+CSV_COLUMNS = [
+    "collection", "_id", "date", "title", "calories", "total_calories",
+    "ai_advice", "diet_plan", "workout_plan", "chat_history", "food_items",
+]
+
+# Chunks itne bade hone par hi flush (chhote writes ka overhead kam)
+FLUSH_BYTES = 64 * 1024
+
+
+def to_jsonable(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def ndjson_line(doc):
+    return json.dumps(to_jsonable(doc), ensure_ascii=False) + "\n"
+
+
+def csv_header():
+    return csv_row({c: c for c in CSV_COLUMNS}, raw=True)
+
+
+def csv_row(doc, raw=False):
+    buf = io.StringIO()
+    row = []
+    for col in CSV_COLUMNS:
+        value = doc.get(col, "")
+        if not raw:
+            value = to_jsonable(value)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False)
+        row.append(value)
+    csv.writer(buf).writerow(row)
+    return buf.getvalue()
+
+
+async def stream_documents(cursors, fmt="ndjson"):
+    """
+    cursors: [(collection_name, async cursor)]
+    Yields text chunks (~FLUSH_BYTES) in NDJSON or CSV.
+    """
+    encode = csv_row if fmt == "csv" else ndjson_line
+    chunk = [csv_header()] if fmt == "csv" else []
+    size = sum(len(c) for c in chunk)
+
+    for name, cursor in cursors:
+        async for doc in cursor:
+            doc["collection"] = name
+            line = encode(doc)
+            chunk.append(line)
+            size += len(line)
+            if size >= FLUSH_BYTES:
+                yield "".join(chunk)
+                chunk, size = [], 0
+
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_bytes(data, chunk_size=FLUSH_BYTES):
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
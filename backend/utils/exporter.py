@@ -1,26 +1,23 @@
+import io
 import os
-import textwrap
 import json
 import ast
 import re
 import time
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
 from reportlab.lib import colors
+from reportlab import rl_config
+
+from utils.pdf_layout import layout_markdown, split_lines, lines_height, draw_lines, wrap_text
+from utils import font_registry
+
+from config import EXPORTS_DIR
 
 # ---------------------------------------------------
 # 1. FONTS & COLORS
 # ---------------------------------------------------
-FONT_PATH = "utils/fonts/NotoSans-Regular.ttf"
-try:
-    pdfmetrics.registerFont(TTFont("Noto", FONT_PATH))
-    DEFAULT_FONT = "Noto"
-    BOLD_FONT = "Noto" 
-except Exception:
-    DEFAULT_FONT = "Helvetica"
-    BOLD_FONT = "Helvetica-Bold"
+# Fonts utils/font_registry.py se (lazy, pehli export / warm-up par load)
 
 # Professional Theme
 COL_PRIMARY = colors.HexColor("#1565C0")   # Deep Blue
@@ -29,6 +26,12 @@ COL_TABLE_HEAD = colors.HexColor("#1976D2")# Table Header Blue
 COL_ROW_EVEN = colors.HexColor("#F1F8FF")  # Very Light Blue Stripe
 COL_TEXT = colors.HexColor("#212121")      # Dark Grey Text
 
+TEXT_COLORS = {"body": COL_TEXT, "heading": COL_PRIMARY}
+
+# Page streams sirf zlib (ASCII85 text encoding nahi) — pure-python encoder
+# lambe reports me save() ka sabse bada hissa tha, aur file bhi chhoti
+rl_config.useA85 = 0
+
 # ---------------------------------------------------
 # 2. SMART DATA PARSER
 # ---------------------------------------------------
@@ -59,79 +62,61 @@ def extract_day_number(key):
 def make_bold(text):
     return f"<<BOLD>>{text}<<END>>"
 
-def format_chat_message(text):
-    """
-    Converts AI/User message into structured printable lines:
-    - Bold formatting
-    - Bullet lists
-    - Numbered lists
-    - Paragraph spacing
-    """
-
-    lines = []
-    if not text:
-        return lines
-
-    t = str(text).strip()
-    bold_regex = r"\*\*(.*?)\*\*"
-
-    raw_lines = t.split("\n")
-
-    for line in raw_lines:
-        stripped = line.strip()
-
-        # Empty line → paragraph spacing
-        if stripped == "":
-            lines.append("")
-            continue
-
-        # Bullets
-        if stripped.startswith("* ") or stripped.startswith("- "):
-            clean = stripped[2:].strip()
-            lines.append({"type": "bullet", "text": clean})
-            continue
-
-        # Numbered list
-        num_match = re.match(r"^(\d+)\.\s+(.*)", stripped)
-        if num_match:
-            number, text_val = num_match.groups()
-            lines.append({"type": "number", "num": number, "text": text_val})
-            continue
-
-        # Normal paragraph line — parse inline bold **text**
-        parts = re.split(bold_regex, stripped)
-        formatted = []
-        for i, part in enumerate(parts):
-            if i % 2 == 1:
-                # captured group -> bold
-                formatted.append({"type": "bold", "text": part})
-            else:
-                if part:
-                    formatted.append({"type": "normal", "text": part})
-        lines.append({"type": "paragraph", "content": formatted})
-
-    return lines
-
 # ---------------------------------------------------
 # 3. PDF GENERATOR
 # ---------------------------------------------------
-def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, chat_history):
-    os.makedirs("exports", exist_ok=True)
+def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, chat_history, filename=None, directory=None):
+    # directory: default exports/ (/static); batch_reports.py apna folder deta hai
+    directory = directory or EXPORTS_DIR
+    os.makedirs(directory, exist_ok=True)
     
     # Unique Filename to prevent Caching
-    timestamp = int(time.time())
-    safe_name = str(username).replace(" ", "_")
-    filename = f"{safe_name}_Fitness_Report_{timestamp}.pdf"
-    filepath = os.path.join("exports", filename)
-
-    c = canvas.Canvas(filepath, pagesize=A4)
+    # (pdf_jobs content-hash wala naam deta hai, dekho utils/pdf_cache.py)
+    if filename is None:
+        timestamp = int(time.time())
+        safe_name = str(username).replace(" ", "_")
+        filename = f"{safe_name}_Fitness_Report_{timestamp}.pdf"
+    filepath = os.path.join(directory, filename)
+
+    # Pehle temp file me likho, phir rename — aadha likha PDF kabhi
+    # /static se serve (ya cache hit) nahi hoga
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        render_summary_pdf(tmp_path, username, calories, diet_plan, workout_plan, ai_advice, chat_history)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        # Render fail → aadhi temp file exports/ me na pade
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return filepath
+
+
+def create_summary_pdf_bytes(username, calories, diet_plan, workout_plan, ai_advice, chat_history):
+    """Disk ko touch kiye bina — PDF seedha memory buffer me (streaming response ke liye)."""
+    buf = io.BytesIO()
+    render_summary_pdf(buf, username, calories, diet_plan, workout_plan, ai_advice, chat_history)
+    return buf.getvalue()
+
+
+def render_summary_pdf(target, username, calories, diet_plan, workout_plan, ai_advice, chat_history):
+    """target = file path ya koi bhi binary file-like object (BytesIO)."""
+    DEFAULT_FONT, BOLD_FONT = font_registry.fonts()
+    c = canvas.Canvas(target, pagesize=A4)
     width, height = A4
     y = height - 50
 
+    # Banner 85pt ka hai — content uske neeche se (pehle naye page par
+    # content banner ke upar overlap hota tha)
+    top_y = height - 100
+    bottom_y = 50
+
     def reset_page():
         nonlocal y
         c.showPage()
-        y = height - 50
+        y = top_y
         draw_header()
 
     def draw_header():
@@ -148,7 +133,7 @@ def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, c
         c.setFillColor(colors.black)
 
     # Init Header
-    y = height - 100
+    y = top_y
     draw_header()
 
     def draw_section_title(title, icon=""):
@@ -189,7 +174,7 @@ def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, c
             max_lines = 1
             wrapped_row = []
             for i, cell in enumerate(row):
-                lines = textwrap.wrap(str(cell), width=int(col_widths[i] / 6))
+                lines = wrap_text(cell, DEFAULT_FONT, 10, col_widths[i] - 10)
                 wrapped_row.append(lines)
                 max_lines = max(max_lines, len(lines))
             
@@ -226,71 +211,16 @@ def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, c
     # -----------------------------
     def draw_markdown_block(raw_text, left_margin=40):
         """
-        Simple markdown style renderer:
-        - '### Heading' → blue sub-heading
-        - '- bullet'    → • bullets with indent
-        - normal text   → paragraphs
+        '### Heading', '- bullet', '1. list', '**bold**', paragraphs —
+        utils/pdf_layout se pehle se wrapped lines, page bharne par naya page.
         """
         nonlocal y
-        c.setFont(DEFAULT_FONT, 10)
-        c.setFillColor(COL_TEXT)
-
-        lines = str(raw_text).split("\n")
-
-        for line in lines:
-            line = line.rstrip()
-
-            # blank line → बस थोड़ा gap
-            if not line:
-                y -= 6
-                continue
-
-            # ----- HEADINGS:  ### Title -----
-            if line.lstrip().startswith("###"):
-                if y < 60:
-                    reset_page()
-                title = line.lstrip("#").strip()
-                c.setFont(BOLD_FONT, 11)
-                c.setFillColor(COL_PRIMARY)
-                c.drawString(left_margin, y, title)
-                y -= 18
-                c.setFont(DEFAULT_FONT, 10)
-                c.setFillColor(COL_TEXT)
-                continue
-
-            # ----- BULLETS:  - point -----
-            if line.lstrip().startswith("- "):
-                if y < 60:
-                    reset_page()
-                bullet_text = line.lstrip()[2:].strip()
-                wrapped = textwrap.wrap(bullet_text, 85)
-
-                # bullet dot
-                c.drawString(left_margin, y, u"•")
-                text_x = left_margin + 15
-                text_y = y
-
-                for i, w in enumerate(wrapped):
-                    if i == 0:
-                        c.drawString(text_x, text_y, w)
-                    else:
-                        text_y -= 14
-                        if text_y < 50:
-                            reset_page()
-                            text_y = y
-                        c.drawString(text_x, text_y, w)
-
-                y = text_y - 14
-                continue
-
-            # ----- NORMAL PARAGRAPH -----
-            if y < 60:
+        lines = layout_markdown(str(raw_text), width - left_margin - 40, DEFAULT_FONT, BOLD_FONT)
+        while lines:
+            if y - bottom_y < lines[0].height:
                 reset_page()
-            wrapped = textwrap.wrap(line, 90)
-            for w in wrapped:
-                c.drawString(left_margin, y, w)
-                y -= 14
-            y -= 4
+            fit, lines = split_lines(lines, y - bottom_y)
+            y = draw_lines(c, fit, left_margin, y, TEXT_COLORS)
 
     # ==========================
     # 1. WORKOUT SECTION
@@ -435,13 +365,20 @@ def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, c
     if chat_history:
         draw_section_title("Chat History", "💬")
 
+    # Bubble: label + text ke liye padding; text x=60, right padding 10
+    label_pad, cont_pad, bottom_pad = 40, 20, 10
+    text_x, text_width = 60, width - 40 - 10 - 60
+    min_lines = 3   # page par itni lines bhi na aayein to bubble naye page se shuru
+
     for msg in chat_history:
         role = msg.get("role", "")
         content = msg.get("content", "")
         if not content:
             continue
 
-        parsed = format_chat_message(content)
+        lines = layout_markdown(str(content), text_width, DEFAULT_FONT, BOLD_FONT)
+        if not lines:
+            continue
 
         # Bubble background
         if role == "user":
@@ -451,110 +388,37 @@ def create_summary_pdf(username, calories, diet_plan, workout_plan, ai_advice, c
             bubble_color = colors.HexColor("#F3E5F5")
             label = "Coach"
 
-        # Pre-calculate height: convert parsed items to plain strings first
-        bubble_lines = []
-        for item in parsed:
-            if isinstance(item, dict):
-                t = item.get("type", "")
-                if t == "bullet":
-                    bubble_lines.append("• " + str(item.get("text", "")))
-                elif t == "number":
-                    bubble_lines.append(f"{item.get('num', '')}. {item.get('text', '')}")
-                elif t == "paragraph":
-                    parts = item.get("content", [])
-                    txt = "".join([p.get("text", "") if isinstance(p, dict) else str(p) for p in parts])
-                    bubble_lines.append(txt)
-                else:
-                    # fallback - stringify
-                    bubble_lines.append(json.dumps(item))
-            else:
-                bubble_lines.append(str(item))
+        # Heights pehle se pata hain → pura bubble is page par, agle page par,
+        # ya (page se lamba ho to) kai pages me tukdon me
+        full = label_pad + lines_height(lines) + bottom_pad
+        page_room = top_y - bottom_y
+        if full > y - bottom_y and (full <= page_room or y - bottom_y < label_pad + 14 * min_lines + bottom_pad):
+            reset_page()
 
-        total_lines = sum([len(textwrap.wrap(x, 90)) for x in bubble_lines])
-        bubble_height = 35 + (total_lines * 14)
+        pad = label_pad
+        while lines:
+            fit, lines = split_lines(lines, y - bottom_y - pad - bottom_pad + lines[0].height)
+            if not fit:
+                fit, lines = lines[:1], lines[1:]
+            # last line ki height ke baad gap bubble me nahi — sirf bottom_pad
+            frag_height = pad + lines_height(fit) - fit[-1].height + bottom_pad
 
-        if y - bubble_height < 50:
-            reset_page()
+            c.setFillColor(bubble_color)
+            c.rect(40, y - frag_height, width - 80, frag_height, fill=1, stroke=0)
 
-        # Draw background
-        c.setFillColor(bubble_color)
-        c.rect(40, y - bubble_height, width - 80, bubble_height, fill=1, stroke=0)
+            if pad == label_pad:
+                c.setFillColor(colors.black)
+                c.setFont(BOLD_FONT, 11)
+                c.drawString(50, y - 20, f"{label}:")
 
-        # Label
-        c.setFillColor(colors.black)
-        c.setFont(BOLD_FONT, 11)
-        c.drawString(50, y - 20, f"{label}:")
+            draw_lines(c, fit, text_x, y - pad, TEXT_COLORS)
+            y -= frag_height
 
-        # Draw text
-        c.setFont(DEFAULT_FONT, 10)
-        text_y = y - 40
-
-        for item in parsed:
-            # BULLETS
-            if isinstance(item, dict) and item.get("type") == "bullet":
-                wrapped = textwrap.wrap(item["text"], 90)
-                for w in wrapped:
-                    if text_y < 50:
-                        reset_page()
-                        text_y = y - 40
-                    c.drawString(60, text_y, "• " + w)
-                    text_y -= 14
-                continue
-
-            # NUMBERED LISTS
-            if isinstance(item, dict) and item.get("type") == "number":
-                wrapped = textwrap.wrap(item["text"], 90)
-                for w in wrapped:
-                    if text_y < 50:
-                        reset_page()
-                        text_y = y - 40
-                    c.drawString(60, text_y, f"{item['num']}. {w}")
-                    text_y -= 14
-                continue
-
-            # PARAGRAPH (HAS NORMAL + BOLD MIX)
-            if isinstance(item, dict) and item.get("type") == "paragraph":
-                line = ""
-                for part in item["content"]:
-                    if part["type"] == "bold":
-                        if line.strip():
-                            if text_y < 50:
-                                reset_page()
-                                text_y = y - 40
-                            c.drawString(60, text_y, line)
-                            text_y -= 14
-                        if text_y < 50:
-                            reset_page()
-                            text_y = y - 40
-                        c.setFont(BOLD_FONT, 10)
-                        c.drawString(60, text_y, part["text"])
-                        text_y -= 14
-                        c.setFont(DEFAULT_FONT, 10)
-                        line = ""
-                    else:
-                        line += part["text"]
-
-                if line.strip():
-                    if text_y < 50:
-                        reset_page()
-                        text_y = y - 40
-                    c.drawString(60, text_y, line)
-                    text_y -= 14
-                continue
-
-            # SIMPLE STRING LINE
-            if isinstance(item, str):
-                wrapped = textwrap.wrap(item, 90)
-                for w in wrapped:
-                    if text_y < 50:
-                        reset_page()
-                        text_y = y - 40
-                    c.drawString(60, text_y, w)
-                    text_y -= 14
-                continue
+            if lines:
+                reset_page()
+                pad = cont_pad
 
         # Move y below the bubble for the next message
-        y = text_y - 14
+        y -= 14
 
     c.save()
-    return filepath
\ No newline at end of file
@@ -1,3 +1,6 @@
+from utils.calories import estimate_meal
+
+
 def generate_workout_plan(user):
     # ---------- 1) Read values safely with defaults ----------
     # Frontend currently sends only: experience, equipment
@@ -174,6 +177,14 @@ def generate_diet_plan(user):
 
     plan_meals = meals.get(food_pref, meals["veg"])
 
+    # --------- 4) MEAL CALORIES (nutrition table se) ---------
+    meal_calories = {
+        "Breakfast": estimate_meal(plan_meals["breakfast"][0])["calories"],
+        "Lunch": estimate_meal(plan_meals["lunch"][0])["calories"],
+        "Dinner": estimate_meal(plan_meals["dinner"][0])["calories"],
+        "Snacks": estimate_meal(" + ".join(plan_meals["snacks"]))["calories"],
+    }
+
     return {
         "Calories": round(target_calories),
         "Maintenance Calories": round(maintenance_calories),
@@ -188,6 +199,7 @@ def generate_diet_plan(user):
             "Dinner": plan_meals["dinner"][0],
             "Snacks": plan_meals["snacks"],
         },
+        "Meal Calories": meal_calories,
     }
 
 
@@ -208,6 +220,7 @@ def generate_advanced_fitness_plan(user):
             "Workout Notes": workout["Workout Notes"],
             "Diet Plan": diet["Diet Plan"],
             "Target Calories": diet["Calories"],
-            "Macros": diet["Macros"]
+            "Macros": diet["Macros"],
+            "Meal Calories": diet["Meal Calories"],
         }
     }
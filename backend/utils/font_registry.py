@@ -0,0 +1,92 @@
+# utils/font_registry.py
+"""
+PDF fonts ek jagah, ek baar.
+
+Pehle exporter import hote hi relative "utils/fonts/..." path se TTF parse
+karta tha — api import mehenga, aur kisi aur folder se process start ho to
+chup-chaap Helvetica. Ab:
+- paths backend/ folder ke relative resolve hote hain (cwd se farak nahi)
+- pehli export par lazy load, ya warm_up() se pehle hi (pool worker start par)
+- parsed TTFont process me registered rehta hai → har render wahi object
+  reuse karta hai (glyph tables dobara parse nahi)
+- fallback hua to reason log hota hai, fonts() batata hai kaun sa font chal raha hai
+"""
+
+import io
+import os
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from config import PDF_FONT_PATH, PDF_BOLD_FONT_PATH
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGULAR_NAME = "Noto"
+BOLD_NAME = "Noto-Bold"
+FALLBACK = ("Helvetica", "Helvetica-Bold")
+
+_lock = threading.Lock()
+_fonts = None            # (regular, bold) jab resolve ho jaye
+_info = {}
+
+
+def resolve_path(path):
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+
+
+def _register(name, path):
+    pdfmetrics.registerFont(TTFont(name, resolve_path(path)))
+    return name
+
+
+def _load():
+    try:
+        regular = _register(REGULAR_NAME, PDF_FONT_PATH)
+    except Exception as e:
+        print(f"⚠️ PDF font {resolve_path(PDF_FONT_PATH)} not loaded ({e}); using Helvetica")
+        _info.update(regular=FALLBACK[0], bold=FALLBACK[1], fallback=True, error=str(e))
+        return FALLBACK
+
+    # Bold file optional hai — na ho to regular hi (pehle jaisa)
+    bold = regular
+    if os.path.exists(resolve_path(PDF_BOLD_FONT_PATH)):
+        try:
+            bold = _register(BOLD_NAME, PDF_BOLD_FONT_PATH)
+        except Exception as e:
+            print(f"⚠️ PDF bold font not loaded ({e}); using regular")
+
+    pdfmetrics.registerFontFamily(REGULAR_NAME, normal=regular, bold=bold)
+    _info.update(regular=regular, bold=bold, fallback=False, path=resolve_path(PDF_FONT_PATH))
+    return regular, bold
+
+
+def fonts():
+    """(regular, bold) font names. Pehli call par load (thread-safe), phir cached."""
+    global _fonts
+    if _fonts is None:
+        with _lock:
+            if _fonts is None:
+                _fonts = _load()
+    return _fonts
+
+
+def font_info():
+    fonts()
+    return dict(_info)
+
+
+def warm_up():
+    """
+    Eager load + ek chhota render memory me: TTF parse, reportlab ke lazy
+    imports aur layout/width caches sab pehli asli export se pehle ho jaate hain.
+    Process pool ka initializer yahi chalata hai.
+    """
+    from utils.exporter import render_summary_pdf
+
+    fonts()
+    render_summary_pdf(
+        io.BytesIO(), "warmup", 0, {}, {},
+        "### Warm-up\n- **bold** text, 1. list", [{"role": "user", "content": "hi"}],
+    )
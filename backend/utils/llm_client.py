@@ -0,0 +1,278 @@
+# utils/llm_client.py
+"""
+Shared async LLM client (OpenAI-compatible /chat/completions — Groq default).
+
+Pehle ai_chat aur ai_recommender dono apna sync Groq client import par banate
+the, aur sync handlers har LLM call (1–5 s) ke liye threadpool worker pakde
+rakhte the. Ab ek hi async client:
+- httpx.AsyncClient: keep-alive connection pool (per event loop, lazy)
+- har call par timeout (connect / total)
+- 429 / 5xx / network error par retry — exponential backoff + full jitter,
+  Retry-After header ho to wahi (capped)
+- semaphore: ek process se LLM_MAX_CONCURRENCY se zyada calls nahi; slot
+  LLM_QUEUE_TIMEOUT_SECONDS me na mile to LLMBusy (→ 503)
+
+stream_chat_completion(): same limits, par tokens aate hi yield (SSE
+"stream": true). Retry sirf pehle token se pehle; consumer ruk jaye (client
+disconnect) to upstream response turant band.
+
+Local test: llm_stub_server.py chalao aur LLM_BASE_URL us par point karo.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from config import (
+    LLM_BASE_URL, LLM_API_KEY, LLM_MODEL,
+    LLM_TIMEOUT_SECONDS, LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS,
+    LLM_MAX_CONCURRENCY, LLM_QUEUE_TIMEOUT_SECONDS, LLM_MAX_CONNECTIONS,
+)
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 10.0
+
+
+class LLMError(Exception):
+    """Provider ne error diya / retries khatam (→ 502)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMBusy(LLMError):
+    """Concurrency limit bhari hai, slot time par nahi mila (→ 503)."""
+
+
+# ---------------------------------------------------
+# CLIENT + SEMAPHORE (per event loop)
+# ---------------------------------------------------
+# httpx.AsyncClient aur asyncio.Semaphore apne loop se bandhe hote hain —
+# uvicorn worker me ek hi loop hai, par CLI / scripts apna naya loop laate hain.
+_state = {}            # loop → (client, semaphore)
+_lock = threading.Lock()
+_stats = {
+    "calls": 0, "retries": 0, "failures": 0, "busy": 0, "in_flight": 0,
+    "streams": 0, "streams_cancelled": 0,
+}
+_latency_ms = deque(maxlen=1000)
+_ttft_ms = deque(maxlen=1000)     # stream: request → pehla token
+
+
+def _new_client():
+    return httpx.AsyncClient(
+        base_url=LLM_BASE_URL.rstrip("/") + "/",
+        headers={"Authorization": f"Bearer {LLM_API_KEY}"} if LLM_API_KEY else {},
+        timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def _get_state():
+    loop = asyncio.get_running_loop()
+    state = _state.get(loop)
+    if state is None:
+        state = _state[loop] = (_new_client(), asyncio.Semaphore(LLM_MAX_CONCURRENCY))
+    return state
+
+
+async def close():
+    """FastAPI shutdown / script end: is loop ka connection pool band karo."""
+    state = _state.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].aclose()
+
+
+def run_sync(coro):
+    """Sync code (e.g. purana Streamlit app) ke liye: naya loop, call, pool band."""
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await close()
+    return asyncio.run(_run())
+
+
+# ---------------------------------------------------
+# CALL
+# ---------------------------------------------------
+def _backoff(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+        except (TypeError, ValueError):
+            pass
+    # Full jitter: sab clients ek saath dobara hit na karein
+    return random.uniform(0, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+
+async def _acquire(semaphore):
+    try:
+        await asyncio.wait_for(semaphore.acquire(), LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        with _lock:
+            _stats["busy"] += 1
+        raise LLMBusy("Too many AI requests in progress", status=503)
+
+
+async def chat_completion(messages, max_tokens=300, temperature=None, model=None, timeout=None):
+    """
+    messages = [{"role": ..., "content": ...}] → assistant reply text.
+    Raises LLMBusy (limit) / LLMError (provider error, retries khatam).
+    """
+    if not LLM_API_KEY:
+        raise LLMError("LLM_API_KEY / GROQ_API_KEY is not configured")
+
+    client, semaphore = _get_state()
+    payload = {"model": model or LLM_MODEL, "messages": messages, "max_tokens": max_tokens}
+    if temperature is not None:
+        payload["temperature"] = temperature
+    request_timeout = httpx.Timeout(timeout or LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+    await _acquire(semaphore)
+    with _lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+    started = time.perf_counter()
+
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            response = None
+            try:
+                response = await client.post("chat/completions", json=payload, timeout=request_timeout)
+                if response.status_code < 400:
+                    data = response.json()
+                    return data["choices"][0]["message"]["content"]
+                error = LLMError(f"LLM provider returned {response.status_code}", status=response.status_code)
+                retryable = response.status_code in RETRY_STATUSES
+            except httpx.HTTPError as e:
+                error = LLMError(f"LLM request failed: {e.__class__.__name__}")
+                retryable = True
+            except (KeyError, IndexError, ValueError) as e:
+                error = LLMError(f"Unexpected LLM response: {e}")
+                retryable = False
+
+            if not retryable or attempt == LLM_MAX_RETRIES:
+                raise error
+            with _lock:
+                _stats["retries"] += 1
+            await asyncio.sleep(_backoff(attempt, response))
+    except LLMError:
+        with _lock:
+            _stats["failures"] += 1
+        raise
+    finally:
+        semaphore.release()
+        with _lock:
+            _stats["in_flight"] -= 1
+            _latency_ms.append((time.perf_counter() - started) * 1000)
+
+
+async def stream_chat_completion(messages, max_tokens=300, temperature=None, model=None, timeout=None):
+    """
+    Async generator: assistant reply ke text pieces, jaise model bhejta hai.
+    Pehla token aane se pehle ki failures retry hoti hain; uske baad error
+    seedha LLMError (aadha jawab dobara nahi bhej sakte).
+    """
+    if not LLM_API_KEY:
+        raise LLMError("LLM_API_KEY / GROQ_API_KEY is not configured")
+
+    client, semaphore = _get_state()
+    payload = {"model": model or LLM_MODEL, "messages": messages, "max_tokens": max_tokens, "stream": True}
+    if temperature is not None:
+        payload["temperature"] = temperature
+    request_timeout = httpx.Timeout(timeout or LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+    await _acquire(semaphore)
+    with _lock:
+        _stats["calls"] += 1
+        _stats["streams"] += 1
+        _stats["in_flight"] += 1
+    started = time.perf_counter()
+    first_token = False
+
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            response = None
+            try:
+                async with client.stream("POST", "chat/completions", json=payload, timeout=request_timeout) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        error = LLMError(f"LLM provider returned {response.status_code}", status=response.status_code)
+                        retryable = response.status_code in RETRY_STATUSES
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            try:
+                                delta = json.loads(data)["choices"][0].get("delta") or {}
+                            except (ValueError, KeyError, IndexError) as e:
+                                raise LLMError(f"Unexpected LLM stream chunk: {e}")
+                            text = delta.get("content")
+                            if text:
+                                if not first_token:
+                                    first_token = True
+                                    with _lock:
+                                        _ttft_ms.append((time.perf_counter() - started) * 1000)
+                                yield text
+                        return
+            except httpx.HTTPError as e:
+                error = LLMError(f"LLM request failed: {e.__class__.__name__}")
+                retryable = not first_token
+
+            if not retryable or first_token or attempt == LLM_MAX_RETRIES:
+                raise error
+            with _lock:
+                _stats["retries"] += 1
+            await asyncio.sleep(_backoff(attempt, response))
+    except LLMError:
+        with _lock:
+            _stats["failures"] += 1
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client chala gaya → `async with` upstream connection band kar chuka hai
+        with _lock:
+            _stats["streams_cancelled"] += 1
+        raise
+    finally:
+        semaphore.release()
+        with _lock:
+            _stats["in_flight"] -= 1
+            _latency_ms.append((time.perf_counter() - started) * 1000)
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+
+def metrics():
+    with _lock:
+        stats = dict(_stats)
+        samples = list(_latency_ms)
+        ttft = list(_ttft_ms)
+    stats.update({
+        "ttft_ms_p50": _percentile(ttft, 0.5),
+        "ttft_ms_p95": _percentile(ttft, 0.95),
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "model": LLM_MODEL,
+        "latency_ms_p50": _percentile(samples, 0.5),
+        "latency_ms_p95": _percentile(samples, 0.95),
+    })
+    return stats
@@ -0,0 +1,305 @@
+# utils/nutrition_db.py
+"""
+Nutrition table subsystem.
+
+Food catalogue disk se load hota hai (CSV / SQLite / Parquet) aur ek compact
+columnar form me rehta hai:
+- values  → NumPy float32 matrix (rows x [cal, protein, carbs, fat])
+- index   → interned name / alias → row number (O(1) lookup)
+- matcher → compiled single-pass regex (longest name wins)
+
+Source file ka mtime har NUTRITION_RELOAD_SECONDS pe check hota hai, to file
+replace karne par uvicorn restart kiye bina naya table aa jata hai.
+
+Pehla load (100k names par regex compile ~8 s) event loop par nahi hona
+chahiye: API startup par warm_up() thread me table bana deta hai, aur
+async callers bhi pehle warm_up() await karte hain.
+"""
+
+import asyncio
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from config import NUTRITION_DB_PATH, NUTRITION_RELOAD_SECONDS
+
+COLUMNS = ("cal", "protein", "carbs", "fat")
+
+
+# ---------------------------------------------------
+# 1. COMPILED MATCHER (trie → regex)
+# ---------------------------------------------------
+# Saare names ek trie me jaate hain aur us trie se EK regex banta hai, jo
+# meal text ko single pass me scan karta hai. Trie ke har node par lamba
+# continuation pehle try hota hai, isliye "grilled chicken" > "chicken" aur
+# "egg omelette" > "egg" (longest match) milta hai.
+def _trie_to_regex(node):
+    branches = [
+        re.escape(ch) + _trie_to_regex(child)
+        for ch, child in sorted(node.items())
+        if ch != ""
+    ]
+
+    if not branches:
+        return ""
+
+    if len(branches) == 1:
+        body = branches[0]
+    else:
+        body = "(?:" + "|".join(branches) + ")"
+
+    # Name yahin khatam ho sakta hai → aage ka part optional (greedy = longest)
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+def build_food_matcher(names):
+    """Compiles all food names into one regex: optional qty + longest name."""
+    trie = {}
+    for name in names:
+        node = trie
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    if not trie:
+        return None
+
+    return re.compile(r"(?:(\d+)\s*)?(" + _trie_to_regex(trie) + ")")
+
+
+# ---------------------------------------------------
+# 2. TABLE
+# ---------------------------------------------------
+def _norm(name):
+    return " ".join(str(name).lower().split())
+
+
+class NutritionTable:
+    def __init__(self, names, values, aliases=None, source=None):
+        self.names = [sys.intern(_norm(n)) for n in names]
+        self.values = np.ascontiguousarray(values, dtype=np.float32).reshape(-1, len(COLUMNS))
+        self.source = source
+
+        self.index = {name: row for row, name in enumerate(self.names)}
+        for alias, target in (aliases or []):
+            row = self.index.get(_norm(target))
+            if row is not None:
+                self.index.setdefault(sys.intern(_norm(alias)), row)
+
+        self.matcher = build_food_matcher(self.index.keys())
+
+    # Column views (no copy)
+    @property
+    def cal(self):
+        return self.values[:, 0]
+
+    @property
+    def protein(self):
+        return self.values[:, 1]
+
+    @property
+    def carbs(self):
+        return self.values[:, 2]
+
+    @property
+    def fat(self):
+        return self.values[:, 3]
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """Name or alias → row number (None if unknown)."""
+        return self.index.get(_norm(name))
+
+    def get(self, name):
+        row = self.lookup(name)
+        if row is None:
+            return None
+        return dict(zip(COLUMNS, self.values[row].tolist()))
+
+    def scan(self, text):
+        """
+        Scans lower-cased text once.
+        Returns [(matched_name, row, qty)] — first mention of every name only.
+        """
+        hits = []
+        if self.matcher is None:
+            return hits
+
+        seen = set()
+        for match in self.matcher.finditer(text):
+            name = match.group(2)
+            if name in seen:
+                continue
+            seen.add(name)
+            qty = int(match.group(1)) if match.group(1) else 1
+            hits.append((name, self.index[name], qty))
+
+        return hits
+
+
+# ---------------------------------------------------
+# 3. LOADERS
+# ---------------------------------------------------
+def _load_csv(path):
+    """CSV header: name,cal,protein,carbs,fat[,aliases]  (aliases 'a|b')"""
+    names, rows, aliases = [], [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for rec in csv.DictReader(f):
+            name = (rec.get("name") or "").strip()
+            if not name:
+                continue
+            names.append(name)
+            rows.append([float(rec.get(col) or 0) for col in COLUMNS])
+            for alias in (rec.get("aliases") or "").split("|"):
+                if alias.strip():
+                    aliases.append((alias, name))
+    return names, rows, aliases
+
+
+def _load_sqlite(path):
+    """Tables: foods(name, cal, protein, carbs, fat) + optional food_aliases(alias, name)"""
+    conn = sqlite3.connect(path)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name, cal, protein, carbs, fat FROM foods")
+        data = cur.fetchall()
+        names = [r[0] for r in data]
+        rows = [[float(v or 0) for v in r[1:]] for r in data]
+
+        aliases = []
+        has_aliases = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='food_aliases'"
+        ).fetchone()
+        if has_aliases:
+            aliases = cur.execute("SELECT alias, name FROM food_aliases").fetchall()
+    finally:
+        conn.close()
+    return names, rows, aliases
+
+
+def _load_parquet(path):
+    """Columns: name, cal, protein, carbs, fat[, aliases]  (needs pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required to load Parquet nutrition tables")
+
+    table = pq.read_table(path)
+    names = table.column("name").to_pylist()
+    rows = np.column_stack([
+        table.column(col).to_numpy(zero_copy_only=False) for col in COLUMNS
+    ])
+
+    aliases = []
+    if "aliases" in table.column_names:
+        for name, alias_str in zip(names, table.column("aliases").to_pylist()):
+            for alias in (alias_str or "").split("|"):
+                if alias.strip():
+                    aliases.append((alias, name))
+    return names, rows, aliases
+
+
+LOADERS = {
+    ".csv": _load_csv,
+    ".db": _load_sqlite,
+    ".sqlite": _load_sqlite,
+    ".sqlite3": _load_sqlite,
+    ".parquet": _load_parquet,
+}
+
+
+def load_table(path):
+    ext = os.path.splitext(path)[1].lower()
+    loader = LOADERS.get(ext)
+    if loader is None:
+        raise ValueError(f"Unsupported nutrition table format: {ext}")
+
+    names, rows, aliases = loader(path)
+    return NutritionTable(names, rows, aliases=aliases, source=path)
+
+
+# ---------------------------------------------------
+# 4. SHARED INSTANCE + HOT RELOAD
+# ---------------------------------------------------
+_lock = threading.Lock()
+_table = None
+_mtime = None
+_last_check = 0.0
+_reloading = False
+
+
+def _source_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _swap_in(path):
+    # _lock ke andar hi call karo
+    global _table, _mtime, _last_check
+    mtime = _source_mtime(path)
+    _table = load_table(path)
+    _mtime = mtime
+    _last_check = time.monotonic()
+    return _table
+
+
+def reload_table(path=None):
+    """Loads the table again and swaps it in (old readers keep their copy)."""
+    with _lock:
+        return _swap_in(path or NUTRITION_DB_PATH)
+
+
+def _reload_in_background(path):
+    global _reloading, _last_check
+    try:
+        reload_table(path)
+    except Exception as e:
+        # Kharab file: purana table chalta rahe, agli koshish NUTRITION_RELOAD_SECONDS baad
+        _last_check = time.monotonic()
+        print(f"⚠️ Nutrition table reload failed ({path}): {e}")
+    finally:
+        _reloading = False
+
+
+def get_table():
+    """
+    Current table. Source file badalne par naya table background thread me
+    banta hai (bade catalogue ka regex compile slow hai) — tab tak requests
+    purana table hi use karti hain.
+    """
+    global _last_check, _reloading
+    if _table is None:
+        with _lock:
+            if _table is None:
+                _swap_in(NUTRITION_DB_PATH)
+        return _table
+
+    now = time.monotonic()
+    if now - _last_check >= NUTRITION_RELOAD_SECONDS and not _reloading:
+        _last_check = now
+        if _source_mtime(_table.source) != _mtime:
+            _reloading = True
+            threading.Thread(
+                target=_reload_in_background, args=(_table.source,), daemon=True
+            ).start()
+
+    return _table
+
+
+async def warm_up():
+    """Table abhi tak load nahi hua → thread me load (event loop block nahi hota)."""
+    if _table is None:
+        await asyncio.to_thread(get_table)
+    return _table
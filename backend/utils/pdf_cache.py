@@ -0,0 +1,123 @@
+# utils/pdf_cache.py
+"""
+Content-addressed PDF exports.
+
+Same username + calories + plans + advice + chat → same file. Filename me
+inputs ka sha256 hota hai, to repeat export dobara render nahi hota, bas
+existing file reuse hoti hai. exports/ ko size + age limit ke andar rakhne
+ke liye evict() hai (sabse purane-use wale files pehle jaate hain). Crash
+hue render ki bachi "*.tmp" files bhi age limit ke baad wahi hatata hai.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from urllib.parse import quote
+
+from utils.exporter import smart_parse
+
+# Layout / renderer badle to ise badho — purane cached PDFs apne aap miss honge
+RENDER_VERSION = 2
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def _normalise_plan(plan):
+    # Frontend kabhi dict bhejta hai, kabhi uska JSON string — dono same render hote hain
+    parsed = smart_parse(plan)
+    if parsed:
+        return parsed
+    return str(plan).strip() if plan else ""
+
+
+def cache_key(username, calories, diet_plan, workout_plan, ai_advice, chat_history):
+    payload = {
+        "v": RENDER_VERSION,
+        "username": str(username),
+        "calories": calories,
+        "diet_plan": _normalise_plan(diet_plan),
+        "workout_plan": _normalise_plan(workout_plan),
+        "ai_advice": str(ai_advice or "").strip(),
+        "chat_history": chat_history or [],
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def filename_for(username, key):
+    safe_name = _SAFE_NAME.sub("_", str(username)) or "user"
+    return f"{safe_name}_Fitness_Report_{key}.pdf"
+
+
+def content_disposition(username):
+    """
+    Download header. Starlette headers latin-1 me encode karta hai, to
+    "राजन Kumar" jaisa naam seedha filename="..." me 500 deta tha.
+    filename = ASCII fallback, filename* (RFC 5987) = asli naam.
+    """
+    safe_name = _SAFE_NAME.sub("_", str(username)).strip("_") or "user"
+    real_name = f"{str(username).strip() or 'user'}_Fitness_Report.pdf".replace(" ", "_")
+    return (
+        f'attachment; filename="{safe_name}_Fitness_Report.pdf"; '
+        f"filename*=UTF-8''{quote(real_name, safe='')}"
+    )
+
+
+def lookup(directory, filename):
+    """Cached file hai to mtime touch karke True (eviction "last used" par chalta hai)."""
+    path = os.path.join(directory, filename)
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def evict(directory, max_bytes, max_age_seconds, now=None):
+    """
+    1) max_age_seconds se purani (last use) files delete
+    2) phir bhi max_bytes se zyada ho to oldest-first delete
+    3) max_age_seconds se purani *.tmp (adhure renders) delete — chal rahe
+       render ki tmp file taaza hoti hai, wo nahi chhuti
+    Returns {"removed": n, "freed_bytes": n, "kept": n, "bytes": n}
+    """
+    now = now or time.time()
+    files = []
+    removed = freed = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                if entry.name.endswith(".pdf"):
+                    files.append((st.st_mtime, st.st_size, entry.path))
+                elif entry.name.endswith(".tmp") and now - st.st_mtime > max_age_seconds:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                        freed += st.st_size
+                    except FileNotFoundError:
+                        pass
+    except FileNotFoundError:
+        return {"removed": 0, "freed_bytes": 0, "kept": 0, "bytes": 0}
+
+    files.sort()  # oldest first
+    total = sum(size for _, size, _ in files)
+    evicted = 0
+
+    for mtime, size, path in files:
+        too_old = now - mtime > max_age_seconds
+        if not too_old and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted += 1
+        freed += size
+
+    return {"removed": removed + evicted, "freed_bytes": freed, "kept": len(files) - evicted, "bytes": total}
@@ -0,0 +1,254 @@
+# utils/pdf_layout.py
+"""
+Chat / markdown text → ready-to-draw PDF lines.
+
+Pehle har export par har line ke liye split + regex + textwrap.wrap chalta
+tha, aur wrapping characters gin kar hoti thi (wide text page se bahar).
+Ab:
+    1. parse_markdown()  — text ek baar parse → compact blocks
+    2. layout_blocks()   — asli glyph width (stringWidth, per font/size
+                           memoised) se wrap → Line objects, fixed heights
+       (layout_markdown() = 1 + 2, per text/width memoised)
+    3. split_lines()     — height pehle se pata hai, to pagination draw se
+                           pehle ho jata hai (bubble page ke beech toot sake)
+    4. draw_lines()      — ek text object, font sirf badalne par set
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# ---------------------------------------------------
+# 1. PARSE (compiled once)
+# ---------------------------------------------------
+_HEADING = re.compile(r"^\s*#{1,6}\s+(.*)$")
+_BULLET = re.compile(r"^\s*[-*•]\s+(.*)$")
+_NUMBER = re.compile(r"^\s*(\d+)[.)]\s+(.*)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_TOKENS = re.compile(r"\S+|\s+")
+
+# kind: "gap" | "heading" | "bullet" | "number" | "para"
+# runs: ((text, is_bold), ...)   marker: "•" / "3." / ""
+Block = namedtuple("Block", "kind runs marker")
+
+# Ready-to-draw line. segments: ((dx, text, font), ...) — dx indent se relative
+Line = namedtuple("Line", "indent segments size height style")
+
+
+def _runs(text):
+    runs = []
+    pos = 0
+    for m in _BOLD.finditer(text):
+        if m.start() > pos:
+            runs.append((text[pos:m.start()], False))
+        runs.append((m.group(1), True))
+        pos = m.end()
+    if pos < len(text):
+        runs.append((text[pos:], False))
+    return tuple(runs)
+
+
+def parse_markdown(text):
+    """
+    '### Heading', '- / * bullet', '1. numbered', '**bold**', blank line → gap.
+    Returns tuple of Blocks.
+    """
+    blocks = []
+    for raw in str(text).split("\n"):
+        line = raw.strip()
+        if not line:
+            if blocks and blocks[-1].kind != "gap":
+                blocks.append(Block("gap", (), ""))
+            continue
+
+        m = _HEADING.match(line)
+        if m:
+            blocks.append(Block("heading", ((m.group(1).strip("# "), True),), ""))
+            continue
+        m = _BULLET.match(line)
+        if m:
+            blocks.append(Block("bullet", _runs(m.group(1)), "•"))
+            continue
+        m = _NUMBER.match(line)
+        if m:
+            blocks.append(Block("number", _runs(m.group(2)), f"{m.group(1)}."))
+            continue
+        blocks.append(Block("para", _runs(line), ""))
+
+    while blocks and blocks[-1].kind == "gap":
+        blocks.pop()
+    return tuple(blocks)
+
+
+# ---------------------------------------------------
+# 2. MEASURE + WRAP
+# ---------------------------------------------------
+@lru_cache(maxsize=65536)
+def text_width(text, font, size):
+    """reportlab stringWidth, memoised per (text, font, size).
+    Widths additive hain (kerning nahi), to word widths jod kar line width milti hai."""
+    return stringWidth(text, font, size)
+
+
+def _break_word(word, font, size, max_width):
+    """Ek word hi line se lamba ho (URL etc.) → characters par todo."""
+    pieces, cur = [], ""
+    for ch in word:
+        if cur and text_width(cur + ch, font, size) > max_width:
+            pieces.append(cur)
+            cur = ch
+        else:
+            cur += ch
+    if cur:
+        pieces.append(cur)
+    return pieces
+
+
+def wrap_runs(runs, max_width, font, bold_font, size):
+    """
+    runs = ((text, is_bold), ...) → list of lines, har line = ((dx, text, font), ...).
+    Same font wale lagataar words ek hi segment me (kam draw calls).
+    """
+    lines = []
+    segments = []                     # current line ke finished segments
+    seg_text, seg_font, seg_x = "", None, 0.0
+    x = 0.0
+    space = False
+
+    def new_line():
+        nonlocal segments, seg_text, x
+        if seg_text:
+            segments.append((seg_x, seg_text, seg_font))
+        if segments:
+            lines.append(tuple(segments))
+        segments, seg_text, x = [], "", 0.0
+
+    for text, bold in runs:
+        f = bold_font if bold else font
+        for token in _TOKENS.findall(text):
+            if token.isspace():
+                space = x > 0
+                continue
+
+            w = text_width(token, f, size)
+            space_w = text_width(" ", f, size) if space else 0.0
+            if x > 0 and x + space_w + w > max_width:
+                new_line()
+                space_w = 0.0
+
+            parts = [token] if w <= max_width else _break_word(token, f, size, max_width)
+            for i, part in enumerate(parts):
+                if i > 0:
+                    new_line()
+                    space_w = 0.0
+                pw = w if len(parts) == 1 else text_width(part, f, size)
+
+                if seg_text and f == seg_font:
+                    seg_text += (" " if space_w else "") + part
+                else:
+                    # Font badla → naya segment; beech ka space dx me
+                    if seg_text:
+                        segments.append((seg_x, seg_text, seg_font))
+                    seg_font, seg_x, seg_text = f, x + space_w, part
+                x += space_w + pw
+                space_w = 0.0
+            space = False
+
+    new_line()
+    return lines
+
+
+def wrap_text(text, font, size, max_width):
+    """Single-font plain text → list of strings (table cells ke liye)."""
+    out = []
+    for para in str(text).split("\n"):
+        wrapped = wrap_runs(((para, False),), max_width, font, font, size)
+        out.extend("".join(seg[1] for seg in line) for line in wrapped)
+    return out or [""]
+
+
+# ---------------------------------------------------
+# 3. BLOCKS → LINES
+# ---------------------------------------------------
+def layout_blocks(blocks, max_width, font, bold_font, size=10, heading_size=11,
+                  leading=14, heading_leading=18, gap=6, para_gap=4, list_indent=15):
+    lines = []
+    for block in blocks:
+        if block.kind == "gap":
+            lines.append(Line(0, (), size, gap, "gap"))
+            continue
+
+        if block.kind == "heading":
+            for segs in wrap_runs(block.runs, max_width, bold_font, bold_font, heading_size):
+                lines.append(Line(0, segs, heading_size, heading_leading, "heading"))
+            continue
+
+        if block.kind in ("bullet", "number"):
+            indent = max(list_indent, text_width(block.marker, font, size) + 5)
+            wrapped = wrap_runs(block.runs, max_width - indent, font, bold_font, size) or [()]
+            for i, segs in enumerate(wrapped):
+                segs = tuple((dx + indent, t, f) for dx, t, f in segs)
+                if i == 0:
+                    segs = ((0, block.marker, font),) + segs
+                lines.append(Line(0, segs, size, leading, "body"))
+            continue
+
+        wrapped = wrap_runs(block.runs, max_width, font, bold_font, size)
+        for segs in wrapped:
+            lines.append(Line(0, segs, size, leading, "body"))
+        if wrapped and para_gap:
+            last = lines[-1]
+            lines[-1] = last._replace(height=last.height + para_gap)
+
+    return lines
+
+
+@lru_cache(maxsize=4096)
+def layout_markdown(text, max_width, font, bold_font):
+    """
+    parse + layout, memoised. Users chat badhne ke saath baar-baar export
+    karte hain — purane messages ki lines (same pool worker me) dobara nahi banti.
+    """
+    return tuple(layout_blocks(parse_markdown(text), max_width, font, bold_font))
+
+
+# ---------------------------------------------------
+# 4. PAGINATE + DRAW
+# ---------------------------------------------------
+def lines_height(lines):
+    return sum(line.height for line in lines)
+
+
+def split_lines(lines, available):
+    """Jitni lines `available` height me aati hain → (fit, rest)."""
+    used = 0
+    for i, line in enumerate(lines):
+        if used + line.height > available:
+            return lines[:i], lines[i:]
+        used += line.height
+    return lines, []
+
+
+def draw_lines(c, lines, x, y, colors_by_style):
+    """
+    Baseline y se neeche lines draw karta hai; returns next y.
+    Ek hi text object; font/colour sirf badalne par set hote hain.
+    """
+    text = c.beginText()
+    cur_font = cur_color = None
+    for line in lines:
+        color = colors_by_style.get(line.style)
+        for dx, seg, font in line.segments:
+            if (font, line.size) != cur_font:
+                text.setFont(font, line.size)
+                cur_font = (font, line.size)
+            if color is not None and color != cur_color:
+                text.setFillColor(color)
+                cur_color = color
+            text.setTextOrigin(x + line.indent + dx, y)
+            text.textOut(seg)
+        y -= line.height
+    c.drawText(text)
+    return y
@@ -0,0 +1,431 @@
+# utils/rec_cache.py
+"""
+AI recommendation cache (get_ai_recommendation / stream_ai_recommendation).
+
+Zyada tar users kuch hi (goal, activity, BMI band, calorie band) buckets me
+aate hain, to har /recommendation par LLM call zaruri nahi. Profile ko
+normalise + bucket karke ek signature banta hai; usi bucket ka jawab cache
+se aata hai. Bucket prompt me user ka naam jaata hi nahi — model naam ki
+jagah literal "{{name}}" likhta hai, jo retrieval ke baad bhara jata hai.
+
+Backends (REC_CACHE_BACKEND):
+    memory  — process ke andar TTL + LRU (utils/cache.TTLCache)
+    sqlite  — local file, saare workers share karte hain; TTL + LRU (last_used)
+    redis   — Redis-compatible store (Redis / Valkey / KeyDB); TTL = EX,
+              LRU = server ki maxmemory-policy allkeys-lru
+    off     — cache band
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from config import (
+    REC_CACHE_BACKEND, REC_CACHE_SIZE, REC_CACHE_TTL_SECONDS,
+    REC_CACHE_SQLITE_PATH, REC_CACHE_REDIS_URL, LLM_MODEL,
+)
+from utils.cache import TTLCache
+
+# Prompt / bucketing badle to version badhao — purani entries apne aap miss
+# (v2: v1 entries me users ke naam ho sakte the)
+CACHE_VERSION = 2
+NAME_SLOT = "{{name}}"
+
+# ---------------------------------------------------
+# PROFILE → BUCKETED SIGNATURE
+# ---------------------------------------------------
+_SPACES = re.compile(r"\s+")
+
+_GOALS = (
+    ("weight loss", ("loss", "lose", "cut", "fat")),
+    ("muscle gain", ("gain", "bulk", "muscle")),
+    ("maintenance", ("maintain", "maintenance")),
+)
+
+_ACTIVITIES = (
+    ("very active", ("very", "extra", "athlete")),
+    ("moderately active", ("moderate",)),
+    ("lightly active", ("light",)),
+    ("sedentary", ("sedentary", "none", "little")),
+)
+
+# (upper bound, label)
+_AGE_BANDS = ((18, "under 18"), (30, "18–29"), (45, "30–44"), (60, "45–59"), (float("inf"), "60+"))
+_BMI_BANDS = (
+    (18.5, "underweight (BMI < 18.5)"),
+    (25, "normal (BMI 18.5–25)"),
+    (30, "overweight (BMI 25–30)"),
+    (float("inf"), "obese (BMI 30+)"),
+)
+CALORIE_BAND = 250
+
+
+def _clean(text):
+    return _SPACES.sub(" ", str(text or "").strip().lower())
+
+
+def _match(text, table, default):
+    for label, words in table:
+        if any(w in text for w in words):
+            return label
+    return default
+
+
+def _band(value, bands):
+    for upper, label in bands:
+        if value < upper:
+            return label
+    return bands[-1][1]
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def profile_bucket(age, weight, height, gender, goal, activity, latest_calories):
+    """
+    Raw profile → bucket dict (yahi prompt me jata hai, yahi cache key banta hai).
+    Missing / galat numbers "unknown" bucket me.
+    """
+    age, weight, height, calories = map(_number, (age, weight, height, latest_calories))
+
+    gender = _clean(gender)
+    if gender in ("m", "male", "man"):
+        gender = "male"
+    elif gender in ("f", "female", "woman"):
+        gender = "female"
+    else:
+        gender = "unspecified"
+
+    goal = _clean(goal)
+    goal = _match(goal, _GOALS, goal[:40] or "general fitness")
+    activity = _match(_clean(activity), _ACTIVITIES, "moderately active")
+
+    if weight > 0 and height > 0:
+        bmi_band = _band(weight / (height / 100) ** 2, _BMI_BANDS)
+    else:
+        bmi_band = "unknown"
+
+    if calories > 0:
+        low = int(calories // CALORIE_BAND) * CALORIE_BAND
+        calorie_band = f"{low}–{low + CALORIE_BAND} kcal"
+    else:
+        calorie_band = "unknown"
+
+    return {
+        "age": _band(age, _AGE_BANDS) if age > 0 else "unknown",
+        "gender": gender,
+        "bmi": bmi_band,
+        "goal": goal,
+        "activity": activity,
+        "calories": calorie_band,
+    }
+
+
+def signature(bucket):
+    # Model badla → naye jawab
+    raw = json.dumps({"model": LLM_MODEL, **bucket}, sort_keys=True, ensure_ascii=False)
+    return f"rec:v{CACHE_VERSION}:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def fill_template(text, name):
+    return text.replace(NAME_SLOT, name)
+
+
+class SlotFiller:
+    """
+    Streaming ke liye fill_template: "{{name}}" kai tokens me toot kar aa
+    sakta hai ("{{", "name", "}}"), to adhoora slot agle piece tak roka jata hai.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._pending = ""
+
+    def feed(self, piece):
+        text = fill_template(self._pending + piece, self.name)
+        hold = 0
+        for k in range(min(len(NAME_SLOT) - 1, len(text)), 0, -1):
+            if text.endswith(NAME_SLOT[:k]):
+                hold = k
+                break
+        self._pending = text[len(text) - hold:] if hold else ""
+        return text[:len(text) - hold]
+
+    def flush(self):
+        text, self._pending = self._pending, ""
+        return text
+
+
+# ---------------------------------------------------
+# BACKENDS (get / set / stats — sab sync)
+# ---------------------------------------------------
+class MemoryBackend:
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def stats(self):
+        s = self._cache.stats()
+        return {"size": s["size"], "maxsize": s["maxsize"], "evictions": s["evictions"]}
+
+
+class SQLiteBackend:
+    """
+    Ek table, saare worker processes share karte hain. Expired rows get() par
+    ignore aur set() par saaf; maxsize se upar → sabse purana last_used gaya.
+
+    Hit par last_used sirf tab likha jaata hai jab wo TOUCH_INTERVAL_SECONDS se
+    purana ho — har hit par UPDATE SQLite ka write lock leta tha aur saare
+    workers ke reads serialise ho jaate the. LRU order itna approximate chalega.
+    """
+    name = "sqlite"
+    blocking = True
+    TOUCH_INTERVAL_SECONDS = 60
+
+    def __init__(self, path, maxsize, ttl):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rec_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rec_cache_last_used ON rec_cache(last_used)")
+
+    def _conn(self):
+        # sqlite3 connection thread ke beech share nahi hota → per thread ek
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT value, last_used FROM rec_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now - self.TOUCH_INTERVAL_SECONDS:
+                conn.execute(
+                    "UPDATE rec_cache SET last_used = ? WHERE key = ? AND last_used < ?",
+                    (now, key, now - self.TOUCH_INTERVAL_SECONDS),
+                )
+        return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rec_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            expired = conn.execute("DELETE FROM rec_cache WHERE expires_at <= ?", (now,)).rowcount
+            over = conn.execute(
+                "DELETE FROM rec_cache WHERE key IN ("
+                " SELECT key FROM rec_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            ).rowcount
+        self.evictions += expired + over
+
+    def stats(self):
+        with self._conn() as conn:
+            size = conn.execute("SELECT COUNT(*) FROM rec_cache").fetchone()[0]
+        return {"size": size, "maxsize": self.maxsize, "evictions": self.evictions, "path": self.path}
+
+
+class RedisBackend:
+    name = "redis"
+    blocking = True
+
+    def __init__(self, url, ttl):
+        import redis    # optional dependency — sirf is backend ke liye
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value):
+        self._client.set(key, value, ex=int(self.ttl))
+
+    def stats(self):
+        return {"size": self._client.dbsize()}
+
+
+def _create_backend():
+    kind = REC_CACHE_BACKEND
+    if kind in ("", "off", "none"):
+        return None
+    try:
+        if kind == "sqlite":
+            return SQLiteBackend(REC_CACHE_SQLITE_PATH, REC_CACHE_SIZE, REC_CACHE_TTL_SECONDS)
+        if kind == "redis":
+            return RedisBackend(REC_CACHE_REDIS_URL, REC_CACHE_TTL_SECONDS)
+    except Exception as e:
+        # Store na mile to bhi recommendations chalein — memory cache se
+        print(f"⚠️ Recommendation cache backend '{kind}' unavailable ({e}), using memory")
+    return MemoryBackend(REC_CACHE_SIZE, REC_CACHE_TTL_SECONDS)
+
+
+# ---------------------------------------------------
+# LOOKUP / STORE (async, metrics ke saath)
+# ---------------------------------------------------
+_backend = None
+_backend_pid = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0, "coalesced": 0}
+_hit_ms = deque(maxlen=500)
+_inflight = {}      # key → future (same bucket ke parallel misses, ek LLM call)
+
+
+def get_backend():
+    global _backend, _backend_pid
+    if _backend_pid != os.getpid():
+        _backend = _create_backend()
+        _backend_pid = os.getpid()
+    return _backend
+
+
+def enabled():
+    return get_backend() is not None
+
+
+def _count(field, n=1):
+    with _lock:
+        _stats[field] += n
+
+
+async def _call(fn, *args):
+    backend = get_backend()
+    if backend.blocking:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    return fn(*args)
+
+
+async def lookup(key, name):
+    """Hit → naam bhara hua text, miss → None. Store down ho to miss (error count)."""
+    backend = get_backend()
+    if backend is None:
+        return None
+    started = time.perf_counter()
+    try:
+        template = await _call(backend.get, key)
+    except Exception as e:
+        _count("errors")
+        print(f"⚠️ Recommendation cache read failed: {e}")
+        template = None
+
+    if template is None:
+        _count("misses")
+        return None
+    with _lock:
+        _stats["hits"] += 1
+        _hit_ms.append((time.perf_counter() - started) * 1000)
+    return fill_template(template, name)
+
+
+async def store(key, template):
+    """template = bucket prompt ka jawab (naam nahi, sirf NAME_SLOT)."""
+    backend = get_backend()
+    if backend is None or not template:
+        return
+    try:
+        await _call(backend.set, key, template)
+        _count("stores")
+    except Exception as e:
+        _count("errors")
+        print(f"⚠️ Recommendation cache write failed: {e}")
+
+
+async def get_or_create(key, name, create):
+    """
+    create() → bucket prompt ka LLM jawab (template, NAME_SLOT ke saath). Same
+    key ka miss pehle se chal raha ho to usi ka result reuse — LLM call ek hi.
+    """
+    cached = await lookup(key, name)
+    if cached is not None:
+        return cached
+
+    future = _inflight.get(key)
+    if future is not None:
+        _count("coalesced")
+        try:
+            template = await asyncio.shield(future)
+            return fill_template(template, name)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # Pehla request (client) chala gaya → khud LLM call karo
+            return fill_template(await create(), name)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        template = await create()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()     # waiters na hon to "never retrieved" warning nahi
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+    future.set_result(template)
+    await store(key, template)
+    return fill_template(template, name)
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2)
+
+
+def metrics():
+    backend = get_backend()
+    with _lock:
+        stats = dict(_stats)
+        samples = list(_hit_ms)
+    lookups = stats["hits"] + stats["misses"]
+    stats.update({
+        "backend": backend.name if backend else "off",
+        "ttl_seconds": REC_CACHE_TTL_SECONDS,
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "hit_ms_p50": _percentile(samples, 0.5),
+        "hit_ms_p95": _percentile(samples, 0.95),
+    })
+    if backend is not None:
+        try:
+            stats.update(backend.stats())
+        except Exception as e:
+            stats["backend_error"] = str(e)
+    return stats
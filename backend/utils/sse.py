@@ -0,0 +1,80 @@
+# utils/sse.py
+"""
+LLM token stream → Server-Sent Events (/chat/stream, /recommendation/stream).
+
+Events:
+    event: token   data: {"text": "<piece>"}
+    event: done    data: {"text": "<poora jawab>"}     ← /save-summary ke liye yahi
+    event: error   data: {"status": 502|503, "detail": "...", "partial": "..."}
+
+Client disconnect hote hi LLM stream cancel hota hai (semaphore slot aur
+upstream connection turant free), agle token ka wait nahi.
+"""
+
+import asyncio
+import json
+
+from utils.llm_client import LLMError, LLMBusy
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",      # nginx response buffer na kare
+}
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _wait_disconnect(request):
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def llm_event_stream(request, pieces):
+    """pieces = stream_chat_completion(...) jaisa async generator."""
+    # Headers + pehla byte turant — proxy / browser connection khula rakhte hain
+    yield ": stream open\n\n"
+
+    parts = []
+    watcher = asyncio.create_task(_wait_disconnect(request))
+    iterator = pieces.__aiter__()
+    next_piece = None
+    try:
+        while True:
+            next_piece = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({next_piece, watcher}, return_when=asyncio.FIRST_COMPLETED)
+
+            if next_piece not in done:
+                # Client chala gaya → LLM stream cancel (finally me)
+                return
+
+            try:
+                piece = next_piece.result()
+            except StopAsyncIteration:
+                break
+            parts.append(piece)
+            yield sse_event("token", {"text": piece})
+
+        yield sse_event("done", {"text": "".join(parts)})
+    except LLMError as e:
+        status = 503 if isinstance(e, LLMBusy) else 502
+        detail = "AI coach is busy, please retry" if status == 503 else "AI service unavailable, please retry"
+        yield sse_event("error", {"status": status, "detail": detail, "partial": "".join(parts)})
+    finally:
+        # Disconnect (humara watcher ya Starlette ka cancel) → beech me atka
+        # token-read cancel karo, tab generator band (slot + upstream free)
+        watcher.cancel()
+        if next_piece is not None and not next_piece.done():
+            next_piece.cancel()
+            try:
+                await next_piece
+            except BaseException:
+                pass
+        try:
+            await pieces.aclose()
+        except RuntimeError:
+            # Cancelled read abhi khatam ho raha hai — generator khud band hoga
+            pass